@@ -0,0 +1,38 @@
+// Import complete hadith editions into the content library
+// Usage: npm run import-hadith                        -> all books (local files in HADITH_EDITIONS_DIR, else download)
+//        npm run import-hadith -- bukhari muslim      -> selected books
+//        npm run import-hadith -- --dir ./editions    -> read edition JSON files from a directory
+//        npm run import-hadith -- --save              -> keep downloaded files for later offline imports
+const { migrate } = require('../src/database/db');
+const HadithService = require('../src/services/HadithService');
+const HadithImportService = require('../src/services/HadithImportService');
+
+(async () => {
+    try {
+        const args = process.argv.slice(2);
+        const dirIndex = args.indexOf('--dir');
+        const dir = dirIndex !== -1 ? args[dirIndex + 1] : HadithImportService.EDITIONS_DIR;
+        const books = args.filter((a, i) => !a.startsWith('--') && (dirIndex === -1 || i !== dirIndex + 1));
+        const unknown = books.filter(b => !HadithService.books[b]);
+        if (unknown.length) {
+            console.error(`❌ Unknown books: ${unknown.join(', ')} (available: ${Object.keys(HadithService.books).join(', ')})`);
+            process.exit(1);
+        }
+
+        await migrate();
+        const results = await HadithImportService.importAll(books.length ? books : undefined, {
+            dir,
+            save: args.includes('--save')
+        });
+
+        for (const r of results) {
+            console.log(r.error
+                ? `   ❌ ${r.book}: ${r.error}`
+                : `   ✅ ${r.book}: ${r.inserted} new, ${r.duplicates} duplicates, ${r.skipped} skipped (${r.ms}ms)`);
+        }
+        process.exit(results.some(r => r.error) ? 1 : 0);
+    } catch (error) {
+        console.error('❌ Hadith import failed:', error.message);
+        process.exit(1);
+    }
+})();
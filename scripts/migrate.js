@@ -0,0 +1,25 @@
+// Apply pending schema migrations (same runner used on server startup)
+// Usage: npm run migrate            -> apply pending migrations
+//        npm run migrate -- --status -> print current/latest version only
+const { db, migrate } = require('../src/database/db');
+const { ensureVersionTable, getSchemaVersion, getLatestVersion, listMigrations } = require('../src/database/migrator');
+
+(async () => {
+    try {
+        if (process.argv.includes('--status')) {
+            await ensureVersionTable(db);
+            const current = await getSchemaVersion(db);
+            console.log(`📋 Schema version: ${current} (latest: ${getLatestVersion()})`);
+            for (const m of listMigrations()) {
+                console.log(`   ${m.version > current ? '⏳' : '✅'} ${String(m.version).padStart(3, '0')}_${m.name}`);
+            }
+        } else {
+            const result = await migrate();
+            console.log(`🏁 Migrations done: ${result.from} -> ${result.to} (${result.applied.length} applied)`);
+        }
+        process.exit(0);
+    } catch (error) {
+        console.error('❌ Migration failed:', error.message);
+        process.exit(1);
+    }
+})();
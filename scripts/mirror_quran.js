@@ -0,0 +1,37 @@
+// Mirror the 604 Madani Quran page images into QURAN_PAGES_DIR (resumable)
+// Usage: npm run mirror-quran                          -> download missing or corrupted pages
+//        npm run mirror-quran -- --optimize            -> also write a send-ready <page>.opt.png
+//                                                         (downscaled to QURAN_PAGE_MAX_WIDTH, recompressed)
+//        npm run mirror-quran -- --max-width 1280      -> width limit for the optimized pages
+//        npm run mirror-quran -- --force               -> download every page again
+//        npm run mirror-quran -- --dir ./quran-pages   -> mirror into another directory
+//        npm run mirror-quran -- --concurrency 8       -> parallel downloads
+const QuranService = require('../src/services/QuranService');
+const QuranMirrorService = require('../src/services/QuranMirrorService');
+
+(async () => {
+    try {
+        const args = process.argv.slice(2);
+        const option = (name, fallback) => {
+            const index = args.indexOf(name);
+            return index !== -1 ? args[index + 1] : fallback;
+        };
+
+        const stats = await QuranMirrorService.mirror({
+            dir: option('--dir', QuranService.pagesDir),
+            concurrency: parseInt(option('--concurrency', QuranMirrorService.CONCURRENCY), 10),
+            optimize: args.includes('--optimize'),
+            maxWidth: parseInt(option('--max-width', QuranMirrorService.MAX_WIDTH), 10),
+            force: args.includes('--force')
+        });
+
+        console.log(`   ✅ ${stats.downloaded} downloaded (${Math.round(stats.bytes / 1024 / 1024)}MB), ${stats.verified} already verified, ${stats.optimized} optimized`);
+        if (stats.failed.length) {
+            console.error(`   ❌ Failed pages (run again to resume): ${stats.failed.join(', ')}`);
+        }
+        process.exit(stats.failed.length ? 1 : 0);
+    } catch (error) {
+        console.error('❌ Quran mirror failed:', error.message);
+        process.exit(1);
+    }
+})();
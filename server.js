@@ -45,6 +45,7 @@ const AuthService = require('./src/services/auth');
 const SessionManager = require('./src/services/baileys/SessionManager');
 const { authenticateToken, generateToken } = require('./src/middleware/auth');
 const adminRoutes = require('./src/routes/admin');
+const httpClient = require('./src/services/httpClient');
 
 // Initialize with enhanced error handling
 app.init = async () => {
@@ -56,6 +57,14 @@ app.init = async () => {
         const SchedulerService = require('./src/services/SchedulerService');
         SchedulerService.init();
 
+        // Prayer times: load precomputed months, refresh ahead in the background
+        const PrayerTimesService = require('./src/services/PrayerTimesService');
+        await PrayerTimesService.init();
+
+        // Log retention, rollups and compaction (daily, off-peak)
+        const RetentionService = require('./src/services/RetentionService');
+        RetentionService.init();
+
         // Seed Content Library
         const ContentService = require('./src/services/ContentService');
         await ContentService.seedInitialContent();
@@ -64,6 +73,14 @@ app.init = async () => {
         const HadithService = require('./src/services/HadithService');
         await HadithService.init();
 
+        // Fill the external hadith/video pools in the background so sends never wait on those APIs
+        const ExternalContentService = require('./src/services/ExternalContentService');
+        ExternalContentService.warm();
+
+        // Check the background image catalog off the send path (startup + every 6h)
+        const IslamicBackgroundService = require('./src/services/IslamicBackgroundService');
+        IslamicBackgroundService.init();
+
         // Ensure Admin exists on every startup (Cloud Fix)
         const bcrypt = require('bcrypt');
         const adminEmail = 'aman01125062943@gmail.com';
@@ -136,7 +153,9 @@ app.get('/api/health', (req, res) => {
         environment: process.env.NODE_ENV || 'development',
         memory: process.memoryUsage(),
         uptime: process.uptime(),
-        initialized: app.isInitialized || false
+        initialized: app.isInitialized || false,
+        // Circuit breaker per upstream host (closed / open / half_open)
+        upstreams: httpClient.getBreakers()
     };
     
     if (app.initializationError) {
@@ -515,7 +534,25 @@ app.use('/api', (error, req, res, next) => {
     res.status(500).json({ error: error.message || 'Internal server error' });
 });
 
+// Commit buffered writes (audit rows, status flags) before the process stops
+const writeBuffer = require('./src/database/writeBuffer');
+const shutdown = async (signal) => {
+    console.log(`🛑 ${signal} received, flushing buffered writes...`);
+    try {
+        await writeBuffer.flush();
+        // Closing the writer checkpoints the WAL into the main file
+        await require('./src/database/db').close();
+    } catch (error) {
+        console.error('Failed to flush buffered writes:', error);
+    }
+    process.exit(0);
+};
+
 if (require.main === module) {
+    process.once('SIGTERM', () => shutdown('SIGTERM'));
+    process.once('SIGINT', () => shutdown('SIGINT'));
+    process.on('beforeExit', () => writeBuffer.flush());
+
     app.listen(PORT, '0.0.0.0', () => {
         console.log(`🚀 Server is running on http://0.0.0.0:${PORT}`);
         console.log('📦 Starting background initialization...');
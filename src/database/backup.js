@@ -0,0 +1,60 @@
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+
+// Pages copied per step; the event loop (and the writer) get a turn between steps
+const PAGES_PER_STEP = parseInt(process.env.SQLITE_BACKUP_PAGES_PER_STEP || '1000', 10);
+const RETRY_DELAY = 50;
+
+const pause = (ms) => new Promise(resolve => (ms ? setTimeout(resolve, ms) : setImmediate(resolve)));
+
+const tempBackupPath = () => path.join(os.tmpdir(), `wasel-backup-${process.pid}-${Date.now()}.sqlite`);
+
+/**
+ * Consistent online copy of a live connection using SQLite's backup API.
+ * Writes made through the same connection during the copy are applied to
+ * the destination, so the result is a snapshot without the -wal file.
+ */
+async function backupTo(conn, destPath, { pagesPerStep = PAGES_PER_STEP, onProgress } = {}) {
+    const started = Date.now();
+
+    const backup = await new Promise((resolve, reject) => {
+        const handle = conn.backup(destPath, (err) => {
+            if (err) reject(err);
+            else resolve(handle);
+        });
+    });
+
+    let steps = 0;
+    try {
+        while (!backup.completed) {
+            const stepError = await new Promise((resolve) => backup.step(pagesPerStep, resolve));
+            steps++;
+
+            if (backup.failed) {
+                throw stepError || new Error('Backup failed');
+            }
+            if (stepError) {
+                // SQLITE_BUSY / SQLITE_LOCKED: wait a little and retry the same step
+                await pause(RETRY_DELAY);
+                continue;
+            }
+
+            if (onProgress) {
+                onProgress({ remaining: backup.remaining, pageCount: backup.pageCount });
+            }
+            await pause(0);
+        }
+    } finally {
+        await new Promise((resolve) => backup.finish(() => resolve()));
+    }
+
+    const { size } = await fs.promises.stat(destPath);
+    return { path: destPath, pages: backup.pageCount, steps, bytes: size, ms: Date.now() - started };
+}
+
+module.exports = {
+    PAGES_PER_STEP,
+    backupTo,
+    tempBackupPath
+};
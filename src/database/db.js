@@ -1,5 +1,10 @@
 const sqlite3 = require('sqlite3').verbose();
+const { LRUCache } = require('lru-cache');
+const fs = require('fs');
 const path = require('path');
+const { runMigrations } = require('./migrator');
+const { backupTo } = require('./backup');
+const profiler = require('./profiler');
 
 // Enhanced database path for cloud environments
 const getDbPath = () => {
@@ -34,582 +39,429 @@ const getDbPath = () => {
 };
 
 const dbPath = getDbPath();
-const db = new sqlite3.Database(dbPath, (err) => {
-    if (err) {
-        console.error('❌ Database connection failed:', err.message);
-    } else {
+const isMemoryDb = dbPath === ':memory:';
+
+// Read-only connections for get/all (WAL lets them run while the writer commits).
+// An in-memory database is private to its connection, so it never gets a pool.
+const READ_POOL_SIZE = isMemoryDb ? 0 : parseInt(process.env.SQLITE_READ_POOL_SIZE || '3', 10);
+const BUSY_TIMEOUT = parseInt(process.env.SQLITE_BUSY_TIMEOUT || '5000', 10);
+
+const sharedPragmas = `
+    PRAGMA cache_size = ${process.env.SQLITE_CACHE_SIZE || '10000'};
+    PRAGMA temp_store = MEMORY;
+    PRAGMA mmap_size = 268435456;
+`;
+
+let readers = [];
+
+function openReaders(count = READ_POOL_SIZE) {
+    for (let i = 0; i < count; i++) {
+        const reader = { conn: null, inflight: 0, served: 0 };
+        reader.conn = new sqlite3.Database(dbPath, sqlite3.OPEN_READONLY, (err) => {
+            if (err) {
+                console.warn(`⚠️ Read connection ${i + 1} failed:`, err.message);
+                return;
+            }
+            reader.conn.configure('busyTimeout', BUSY_TIMEOUT);
+            reader.conn.exec(sharedPragmas, (pragmaErr) => {
+                if (pragmaErr) console.warn('⚠️ Read connection tuning failed:', pragmaErr.message);
+                readers.push(reader);
+                if (readers.length === READ_POOL_SIZE) {
+                    console.log(`📚 SQLite read pool ready (${READ_POOL_SIZE} connections)`);
+                }
+            });
+        });
+    }
+}
+
+function openWriter() {
+    const conn = new sqlite3.Database(dbPath, (err) => {
+        if (err) {
+            console.error('❌ Database connection failed:', err.message);
+            return;
+        }
         console.log(`✅ Database connected: ${dbPath}`);
-        
+        conn.configure('busyTimeout', BUSY_TIMEOUT);
+
         // Optimize SQLite for cloud environments
-        db.exec(`
+        // auto_vacuum only takes effect on a new database (or after a full VACUUM);
+        // RetentionService returns free pages with incremental_vacuum when it is on
+        conn.exec(`
+            PRAGMA auto_vacuum = INCREMENTAL;
             PRAGMA journal_mode = ${process.env.SQLITE_JOURNAL_MODE || 'WAL'};
             PRAGMA synchronous = NORMAL;
-            PRAGMA cache_size = ${process.env.SQLITE_CACHE_SIZE || '10000'};
-            PRAGMA temp_store = MEMORY;
-            PRAGMA mmap_size = 268435456;
+            ${sharedPragmas}
             PRAGMA optimize;
         `, (err) => {
             if (err) {
                 console.warn('⚠️ SQLite optimization failed:', err.message);
-            } else {
-                console.log('⚡ SQLite optimized for cloud environment');
+                return;
             }
+            console.log('⚡ SQLite optimized for cloud environment');
+
+            if (READ_POOL_SIZE <= 0) return;
+            conn.get('PRAGMA journal_mode', (modeErr, row) => {
+                // Without WAL, readers would block the writer; keep everything on one connection
+                if (!modeErr && row && String(row.journal_mode).toLowerCase() === 'wal') {
+                    openReaders();
+                } else {
+                    console.log('ℹ️ Journal mode is not WAL, read pool disabled');
+                }
+            });
         });
-    }
-});
+    });
+    return conn;
+}
 
-// Async Wrapper
-const dbAsync = {
-    get: (sql, params = []) => new Promise((resolve, reject) => {
-        db.get(sql, params, (err, row) => {
-            if (err) reject(err);
-            else resolve(row);
-        });
-    }),
-    all: (sql, params = []) => new Promise((resolve, reject) => {
-        db.all(sql, params, (err, rows) => {
-            if (err) reject(err);
-            else resolve(rows);
-        });
-    }),
-    run: (sql, params = []) => new Promise((resolve, reject) => {
-        db.run(sql, params, function (err) {
-            if (err) reject(err);
-            else resolve({ id: this.lastID, changes: this.changes });
-        });
-    }),
-    exec: (sql) => new Promise((resolve, reject) => {
-        db.exec(sql, (err) => {
-            if (err) reject(err);
-            else resolve();
-        });
-    })
-};
+// Single writer connection: every run/exec/transaction goes through it
+let db = openWriter();
 
-async function init() {
-    console.log('Initializing Database Schema...');
+// Least-busy reader, or null while the pool is not ready (falls back to the writer)
+const pickReader = () => {
+    let best = null;
+    for (const reader of readers) {
+        if (!best || reader.inflight < best.inflight) best = reader;
+    }
+    return best;
+};
 
-    const schema = `
-    CREATE TABLE IF NOT EXISTS users (
-        id TEXT PRIMARY KEY,
-        name TEXT NOT NULL,
-        phone TEXT UNIQUE NOT NULL,
-        email TEXT,
-        password_hash TEXT NOT NULL,
-        role TEXT DEFAULT 'user',
-        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-    );
+// Compiled statement cache (LRU), finalized on eviction
+const statementCache = new LRUCache({
+    max: parseInt(process.env.SQLITE_STATEMENT_CACHE_SIZE || '100', 10),
+    dispose: (statement) => statement.finalize()
+});
 
-    CREATE TABLE IF NOT EXISTS plans (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        duration_days INTEGER NOT NULL,
-        price REAL NOT NULL,
-        is_trial BOOLEAN DEFAULT 0,
-        features TEXT
-    );
+// Writes issued outside a transaction wait until running transactions finish,
+// so they never get committed or rolled back as part of someone else's BEGIN.
+let transactionChain = Promise.resolve();
+let pendingTransactions = 0;
 
-    CREATE TABLE IF NOT EXISTS notifications (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id TEXT NOT NULL,
-        title TEXT NOT NULL,
-        message TEXT NOT NULL,
-        type TEXT DEFAULT 'info',
-        is_read INTEGER DEFAULT 0,
-        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY(user_id) REFERENCES users(id)
-    );
+const waitForTransactions = async () => {
+    while (pendingTransactions > 0) {
+        await transactionChain;
+    }
+};
 
-    -- Islamic Reminders System Tables --
-    
-    CREATE TABLE IF NOT EXISTS islamic_reminders_config (
-        id TEXT PRIMARY KEY,
-        user_id TEXT NOT NULL,
-        session_id TEXT,
-        location_country TEXT,
-        location_city TEXT,
-        latitude REAL,
-        longitude REAL,
-        timezone TEXT DEFAULT 'Africa/Cairo',
-        prayer_calculation_method TEXT DEFAULT 'MWL',
-        hijri_adjustment INTEGER DEFAULT 0,
-        friday_kahf INTEGER DEFAULT 1,
-        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY(user_id) REFERENCES users(id),
-        FOREIGN KEY(session_id) REFERENCES whatsapp_sessions(session_id)
-    );
+const preparingStatements = new Map();
 
-    CREATE TABLE IF NOT EXISTS prayer_settings (
-        id TEXT PRIMARY KEY,
-        config_id TEXT NOT NULL,
-        prayer_name TEXT NOT NULL,
-        enabled INTEGER DEFAULT 1,
-        reminder_before_minutes INTEGER DEFAULT 10,
-        send_adhan INTEGER DEFAULT 1,
-        send_after_reminder INTEGER DEFAULT 0,
-        post_prayer_adhkar_enabled INTEGER DEFAULT 1,
-        post_prayer_adhkar_delay INTEGER DEFAULT 5,
-        adhan_sound TEXT,
-        FOREIGN KEY(config_id) REFERENCES islamic_reminders_config(id)
-    );
+const getStatement = (sql) => {
+    const cached = statementCache.get(sql);
+    if (cached) return Promise.resolve(cached);
+    // Concurrent callers share one compile instead of evicting each other
+    if (preparingStatements.has(sql)) return preparingStatements.get(sql);
 
-    CREATE TABLE IF NOT EXISTS fasting_settings (
-        id TEXT PRIMARY KEY,
-        config_id TEXT NOT NULL,
-        monday_thursday INTEGER DEFAULT 0,
-        white_days INTEGER DEFAULT 0,
-        ashura INTEGER DEFAULT 0,
-        dhul_hijjah_first_10 INTEGER DEFAULT 0,
-        ramadan_alerts INTEGER DEFAULT 1,
-        monday INTEGER DEFAULT 0,
-        thursday INTEGER DEFAULT 0,
-        reminder_time TEXT DEFAULT '20:00',
-        FOREIGN KEY(config_id) REFERENCES islamic_reminders_config(id)
-    );
+    const pending = new Promise((resolve, reject) => {
+        const statement = db.prepare(sql, (err) => {
+            if (err) return reject(err);
+            statementCache.set(sql, statement);
+            resolve(statement);
+        });
+    }).finally(() => preparingStatements.delete(sql));
 
-    CREATE TABLE IF NOT EXISTS content_library (
-        id TEXT PRIMARY KEY,
-        type TEXT NOT NULL,
-        category TEXT,
-        content_ar TEXT NOT NULL,
-        source TEXT,
-        media_url TEXT,
-        active INTEGER DEFAULT 1,
-        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-    );
+    preparingStatements.set(sql, pending);
+    return pending;
+};
 
-    CREATE TABLE IF NOT EXISTS reminder_recipients (
-        id TEXT PRIMARY KEY,
-        config_id TEXT NOT NULL,
-        type TEXT NOT NULL,
-        whatsapp_id TEXT NOT NULL,
-        name TEXT,
-        enabled INTEGER DEFAULT 1,
-        FOREIGN KEY(config_id) REFERENCES islamic_reminders_config(id)
-    );
+const wrapStatement = (statement, sql, gated) => ({
+    get: (params = []) => profiler.track(sql, params, () => new Promise((resolve, reject) => {
+        statement.get(params, (err, row) => {
+            // Reset so the statement does not keep a read cursor open
+            statement.reset(() => {
+                if (err) reject(err);
+                else resolve(row);
+            });
+        });
+    })),
+    all: (params = []) => profiler.track(sql, params, () => new Promise((resolve, reject) => {
+        statement.all(params, (err, rows) => {
+            if (err) reject(err);
+            else resolve(rows);
+        });
+    })),
+    run: async (params = []) => {
+        if (gated) await waitForTransactions();
+        return profiler.track(sql, params, () => new Promise((resolve, reject) => {
+            statement.run(params, function (err) {
+                if (err) reject(err);
+                else resolve({ id: this.lastID, changes: this.changes });
+            });
+        }));
+    }
+});
 
-    CREATE TABLE IF NOT EXISTS scheduled_reminders (
-        id TEXT PRIMARY KEY,
-        config_id TEXT NOT NULL,
-        reminder_type TEXT NOT NULL,
-        scheduled_time DATETIME NOT NULL,
-        content_id TEXT,
-        custom_message TEXT,
-        status TEXT DEFAULT 'pending',
-        sent_at DATETIME,
-        FOREIGN KEY(config_id) REFERENCES islamic_reminders_config(id),
-        FOREIGN KEY(content_id) REFERENCES content_library(id)
-    );
+// Promisified call on a given connection (untimed)
+const query = (conn, method, sql, params = []) => new Promise((resolve, reject) => {
+    conn[method](sql, params, function (err, result) {
+        if (err) reject(err);
+        else if (method === 'run') resolve({ id: this.lastID, changes: this.changes });
+        else resolve(result);
+    });
+});
 
-    CREATE TABLE IF NOT EXISTS prayer_times_cache (
-        id TEXT PRIMARY KEY,
-        location_key TEXT NOT NULL,
-        prayer_date DATE NOT NULL,
-        fajr TIME,
-        sunrise TIME,
-        dhuhr TIME,
-        asr TIME,
-        maghrib TIME,
-        isha TIME,
-        hijri_date TEXT,
-        cached_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-        UNIQUE(location_key, prayer_date)
-    );
+// Writer connection access (used directly inside transactions)
+const connection = {
+    get: (sql, params = []) => profiler.track(sql, params, () => query(db, 'get', sql, params)),
+    all: (sql, params = []) => profiler.track(sql, params, () => query(db, 'all', sql, params)),
+    run: (sql, params = []) => profiler.track(sql, params, () => query(db, 'run', sql, params)),
+    exec: (sql) => profiler.track(sql, null, () => new Promise((resolve, reject) => {
+        db.exec(sql, (err) => {
+            if (err) reject(err);
+            else resolve();
+        });
+    }))
+};
 
-    -- End Islamic Reminders Tables --
-
-    CREATE TABLE IF NOT EXISTS subscriptions (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id TEXT NOT NULL,
-        plan_id INTEGER NOT NULL,
-        status TEXT DEFAULT 'pending',
-        start_date DATETIME,
-        end_date DATETIME,
-        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY(user_id) REFERENCES users(id),
-        FOREIGN KEY(plan_id) REFERENCES plans(id)
-    );
+const IDENTIFIER = /^[A-Za-z_][A-Za-z0-9_]*$/;
 
-    CREATE TABLE IF NOT EXISTS system_settings (
-        key TEXT PRIMARY KEY,
-        value TEXT
-    );
+/**
+ * Insert rows (array of objects sharing the same keys) with one cached statement.
+ * options.conflict: 'IGNORE' | 'REPLACE' to emit INSERT OR IGNORE / INSERT OR REPLACE
+ */
+async function insertRows(executor, table, rows, options = {}) {
+    if (!rows || rows.length === 0) return 0;
 
-    CREATE TABLE IF NOT EXISTS whatsapp_sessions (
-        session_id TEXT PRIMARY KEY,
-        user_id TEXT,
-        device_type TEXT,
-        name TEXT,
-        connected BOOLEAN DEFAULT 0,
-        webhook_url TEXT,
-        phone_number TEXT,
-        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY(user_id) REFERENCES users(id)
-    );
+    const columns = Object.keys(rows[0]);
+    if (!IDENTIFIER.test(table) || !columns.every(c => IDENTIFIER.test(c))) {
+        throw new Error(`insertMany: invalid table or column name for ${table}`);
+    }
 
-    CREATE TABLE IF NOT EXISTS payments (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id TEXT NOT NULL,
-        subscription_id INTEGER,
-        amount REAL NOT NULL,
-        method TEXT NOT NULL,
-        transaction_ref TEXT,
-        receipt_path TEXT,
-        status TEXT DEFAULT 'pending',
-        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY(user_id) REFERENCES users(id),
-        FOREIGN KEY(subscription_id) REFERENCES subscriptions(id)
+    const conflict = options.conflict ? ` OR ${String(options.conflict).toUpperCase()}` : '';
+    const placeholders = columns.map(() => '?').join(', ');
+    const statement = await executor.prepare(
+        `INSERT${conflict} INTO ${table} (${columns.join(', ')}) VALUES (${placeholders})`
     );
 
-    CREATE TABLE IF NOT EXISTS admin_tabs (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL UNIQUE,
-        label TEXT NOT NULL,
-        icon TEXT DEFAULT 'fas fa-cog',
-        tab_order INTEGER DEFAULT 999,
-        active BOOLEAN DEFAULT 1,
-        description TEXT,
-        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-    );
-    `;
-
-    // Adhkar Settings Table
-    await dbAsync.run(`
-    CREATE TABLE IF NOT EXISTS adhkar_settings (
-        id TEXT PRIMARY KEY,
-        config_id TEXT NOT NULL,
-        morning_enabled INTEGER DEFAULT 1,
-        morning_time TEXT DEFAULT '07:00',
-        morning_source TEXT DEFAULT 'mixed',
-        evening_enabled INTEGER DEFAULT 1,
-        evening_time TEXT DEFAULT '17:00',
-        evening_source TEXT DEFAULT 'mixed',
-        hadith_enabled INTEGER DEFAULT 1,
-        hadith_time TEXT DEFAULT '12:00',
-        hadith_source TEXT DEFAULT 'mixed',
-        media_preference TEXT DEFAULT 'mixed',
-        content_enabled INTEGER DEFAULT 1,
-        content_time TEXT DEFAULT '21:00',
-        content_type TEXT DEFAULT 'mixed',
-        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY(config_id) REFERENCES islamic_reminders_config(id)
-    )`);
-
-    // Migration: Add media_preference if not exists
-    try {
-        await dbAsync.run(`ALTER TABLE adhkar_settings ADD COLUMN media_preference TEXT DEFAULT 'mixed'`);
-    } catch (e) { /* Ignore if exists */ }
-    try { await dbAsync.run(`ALTER TABLE adhkar_settings ADD COLUMN content_enabled INTEGER DEFAULT 1`); } catch (e) { }
-    try { await dbAsync.run(`ALTER TABLE adhkar_settings ADD COLUMN content_time TEXT DEFAULT '21:00'`); } catch (e) { }
-    try { await dbAsync.run(`ALTER TABLE adhkar_settings ADD COLUMN content_type TEXT DEFAULT 'mixed'`); } catch (e) { }
-    try { await dbAsync.run(`ALTER TABLE adhkar_settings ADD COLUMN quran_enabled INTEGER DEFAULT 0`); } catch (e) { }
-    try { await dbAsync.run(`ALTER TABLE adhkar_settings ADD COLUMN quran_time TEXT DEFAULT '09:00'`); } catch (e) { }
-    try { await dbAsync.run(`ALTER TABLE adhkar_settings ADD COLUMN quran_pages_per_day INTEGER DEFAULT 5`); } catch (e) { }
-    try { await dbAsync.run(`ALTER TABLE adhkar_settings ADD COLUMN text_length TEXT DEFAULT 'full'`); } catch (e) { }
-    try { await dbAsync.run(`ALTER TABLE prayer_settings ADD COLUMN post_prayer_adhkar_enabled INTEGER DEFAULT 1`); } catch (e) { }
-    try { await dbAsync.run(`ALTER TABLE prayer_settings ADD COLUMN post_prayer_adhkar_delay INTEGER DEFAULT 5`); } catch (e) { }
-    try { await dbAsync.run(`ALTER TABLE prayer_settings ADD COLUMN post_prayer_adhkar_show_link INTEGER DEFAULT 1`); } catch (e) { }
-    try { await dbAsync.run(`ALTER TABLE adhkar_settings ADD COLUMN before_after_prayer INTEGER DEFAULT 0`); } catch (e) { }
-    try { await dbAsync.run(`ALTER TABLE adhkar_settings ADD COLUMN hadith_media_mode TEXT DEFAULT 'text'`); } catch (e) { }
-    try { await dbAsync.run(`ALTER TABLE adhkar_settings ADD COLUMN hadith_show_source_text INTEGER DEFAULT 1`); } catch (e) { }
-    try { await dbAsync.run(`ALTER TABLE adhkar_settings ADD COLUMN hadith_show_image_source_text INTEGER DEFAULT 0`); } catch (e) { }
-    try { await dbAsync.run(`ALTER TABLE adhkar_settings ADD COLUMN hadith_image_source TEXT DEFAULT 'auto'`); } catch (e) { }
-    try { await dbAsync.run(`ALTER TABLE adhkar_settings ADD COLUMN hadith_image_theme TEXT DEFAULT 'mosques'`); } catch (e) { }
-    try { await dbAsync.run(`ALTER TABLE adhkar_settings ADD COLUMN selected_enabled INTEGER DEFAULT 0`); } catch (e) { }
-    try { await dbAsync.run(`ALTER TABLE adhkar_settings ADD COLUMN selected_category TEXT DEFAULT 'general'`); } catch (e) { }
-    try { await dbAsync.run(`ALTER TABLE adhkar_settings ADD COLUMN selected_media_mode TEXT DEFAULT 'text'`); } catch (e) { }
-    try { await dbAsync.run(`ALTER TABLE adhkar_settings ADD COLUMN selected_show_source_text INTEGER DEFAULT 1`); } catch (e) { }
-    try { await dbAsync.run(`ALTER TABLE adhkar_settings ADD COLUMN selected_show_link INTEGER DEFAULT 1`); } catch (e) { }
-    try { await dbAsync.run(`ALTER TABLE adhkar_settings ADD COLUMN selected_image_theme TEXT DEFAULT 'mosques'`); } catch (e) { }
-    try { await dbAsync.run(`ALTER TABLE adhkar_settings ADD COLUMN selected_times_count INTEGER DEFAULT 1`); } catch (e) { }
-    try { await dbAsync.run(`ALTER TABLE adhkar_settings ADD COLUMN selected_times_json TEXT DEFAULT '["21:00"]'`); } catch (e) { }
-    try { await dbAsync.run(`ALTER TABLE adhkar_settings ADD COLUMN show_source_link INTEGER DEFAULT 1`); } catch (e) { }
-
-
-    await dbAsync.exec(schema);
-
-    // Seed Adhkar Settings for existing configs if missing
-    try {
-        const configs = await dbAsync.all('SELECT id FROM islamic_reminders_config');
-        const insertAdhkar = `INSERT INTO adhkar_settings (id, config_id) VALUES (?, ?)`;
-
-        for (const config of configs) {
-            const check = await dbAsync.get('SELECT id FROM adhkar_settings WHERE config_id = ?', [config.id]);
-            if (!check) {
-                // Generate a UUID (requires uuid import inside init? or use simple random for DB seeding inside db.js if uuid not available scope)
-                // db.js usually does not import uuid. But IslamicRemindersService does.
-                // We'll use a random string or placeholder since it's TEXT PRIMARY KEY.
-                // Actually, let's use a simple distinct string generator or rely on Service to create it on demand?
-                // Ideally, migrate existing.
-                // I will use Date.now() + random for ID in this migration script context.
-                const newId = 'adhkar-' + Math.random().toString(36).substr(2, 9);
-                await dbAsync.run(insertAdhkar, [newId, config.id]);
-                console.log(`Seeded adhkar_settings for config ${config.id}`);
-            }
-        }
-    } catch (error) {
-        console.error('Error seeding adhkar settings:', error);
+    let inserted = 0;
+    for (const row of rows) {
+        const result = await statement.run(columns.map(c => (row[c] === undefined ? null : row[c])));
+        inserted += result.changes;
     }
+    return inserted;
+}
 
-    // Add missing columns if they don't exist
-    try {
-        await dbAsync.run('ALTER TABLE whatsapp_sessions ADD COLUMN phone_number TEXT');
-    } catch (e) { }
-
-    try {
-        await dbAsync.run('ALTER TABLE islamic_reminders_config ADD COLUMN hijri_adjustment INTEGER DEFAULT 0');
-    } catch (e) { }
-
-    try {
-        await dbAsync.run('ALTER TABLE islamic_reminders_config ADD COLUMN friday_kahf INTEGER DEFAULT 1');
-    } catch (e) { }
+// Executor handed to transaction callbacks: same API, no write gating
+const tx = {
+    ...connection,
+    prepare: async (sql) => wrapStatement(await getStatement(sql), sql, false),
+    insertMany: (table, rows, options) => insertRows(tx, table, rows, options)
+};
 
-    try {
-        await dbAsync.run("ALTER TABLE fasting_settings ADD COLUMN reminder_time TEXT DEFAULT '20:00'");
-    } catch (e) { }
+/**
+ * Queue fn behind running transactions; writes outside it wait until it settles.
+ */
+function exclusive(fn) {
+    pendingTransactions++;
+    const result = transactionChain.then(fn);
+    transactionChain = result.catch(() => { }).then(() => { pendingTransactions--; });
+    return result;
+}
 
-    // Add enabled column to islamic_reminders_config
-    try {
-        await dbAsync.run('ALTER TABLE islamic_reminders_config ADD COLUMN enabled INTEGER DEFAULT 1');
-        console.log('Added enabled column to islamic_reminders_config table');
-    } catch (error) {
-        if (!error.message.includes('duplicate column name')) {
-            console.error('Error adding enabled column:', error.message);
+/**
+ * Run fn(tx) inside BEGIN IMMEDIATE ... COMMIT (ROLLBACK on throw).
+ * Transactions are queued, so only one is open on the connection at a time.
+ * Inside fn, write through tx (not db): db.run would wait for this very transaction.
+ */
+function transaction(fn) {
+    return exclusive(async () => {
+        await connection.exec('BEGIN IMMEDIATE');
+        try {
+            const value = await fn(tx);
+            await connection.exec('COMMIT');
+            return value;
+        } catch (error) {
+            try { await connection.exec('ROLLBACK'); } catch (e) { }
+            throw error;
         }
-    }
-
-    // Add last_sent_at to content_library
-    try {
-        await dbAsync.run('ALTER TABLE content_library ADD COLUMN last_sent_at DATETIME');
-    } catch (e) { }
-
-    // Add source settings to adhkar_settings
-    try {
-        await dbAsync.run("ALTER TABLE adhkar_settings ADD COLUMN morning_source TEXT DEFAULT 'mixed'");
-        await dbAsync.run("ALTER TABLE adhkar_settings ADD COLUMN evening_source TEXT DEFAULT 'mixed'");
-        await dbAsync.run("ALTER TABLE adhkar_settings ADD COLUMN hadith_source TEXT DEFAULT 'mixed'");
-    } catch (e) { }
+    });
+}
 
-    try {
-        await dbAsync.run("ALTER TABLE adhkar_settings ADD COLUMN show_source_link INTEGER DEFAULT 1");
-    } catch (e) { }
-
-    try { await dbAsync.run("ALTER TABLE adhkar_settings ADD COLUMN hadith_media_mode TEXT DEFAULT 'text'"); } catch (e) { }
-    try { await dbAsync.run("ALTER TABLE adhkar_settings ADD COLUMN hadith_show_source_text INTEGER DEFAULT 1"); } catch (e) { }
-    try { await dbAsync.run("ALTER TABLE adhkar_settings ADD COLUMN hadith_image_source TEXT DEFAULT 'quran_pages'"); } catch (e) { }
-    try { await dbAsync.run("ALTER TABLE adhkar_settings ADD COLUMN hadith_show_image_source_text INTEGER DEFAULT 1"); } catch (e) { }
-    try { await dbAsync.run("ALTER TABLE adhkar_settings ADD COLUMN hadith_image_theme TEXT DEFAULT 'mixed'"); } catch (e) { }
-    try { await dbAsync.run("ALTER TABLE adhkar_settings ADD COLUMN hadith_times_count INTEGER DEFAULT 1"); } catch (e) { }
-    try { await dbAsync.run("ALTER TABLE adhkar_settings ADD COLUMN hadith_times_json TEXT"); } catch (e) { }
-    try { await dbAsync.run("ALTER TABLE adhkar_settings ADD COLUMN selected_enabled INTEGER DEFAULT 0"); } catch (e) { }
-    try { await dbAsync.run("ALTER TABLE adhkar_settings ADD COLUMN selected_category TEXT DEFAULT 'general'"); } catch (e) { }
-    try { await dbAsync.run("ALTER TABLE adhkar_settings ADD COLUMN selected_media_mode TEXT DEFAULT 'text'"); } catch (e) { }
-    try { await dbAsync.run("ALTER TABLE adhkar_settings ADD COLUMN selected_show_source_text INTEGER DEFAULT 1"); } catch (e) { }
-    try { await dbAsync.run("ALTER TABLE adhkar_settings ADD COLUMN selected_show_link INTEGER DEFAULT 1"); } catch (e) { }
-    try { await dbAsync.run("ALTER TABLE adhkar_settings ADD COLUMN selected_image_theme TEXT DEFAULT 'mosques'"); } catch (e) { }
-    try { await dbAsync.run("ALTER TABLE adhkar_settings ADD COLUMN selected_times_count INTEGER DEFAULT 1"); } catch (e) { }
-    try { await dbAsync.run("ALTER TABLE adhkar_settings ADD COLUMN selected_times_json TEXT"); } catch (e) { }
-
-    await dbAsync.run(`
-        CREATE TABLE IF NOT EXISTS hadith_schedule_log (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            config_id TEXT NOT NULL,
-            date TEXT NOT NULL,
-            send_time TEXT NOT NULL,
-            hadith_id TEXT,
-            hadith_hash TEXT,
-            image_url TEXT,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(config_id, date, send_time),
-            UNIQUE(config_id, date, hadith_id),
-            UNIQUE(config_id, date, hadith_hash),
-            UNIQUE(config_id, date, image_url)
-        )
-    `);
-
-    await dbAsync.run(`
-        CREATE TABLE IF NOT EXISTS selected_adhkar_schedule_log (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            config_id TEXT NOT NULL,
-            date TEXT NOT NULL,
-            send_time TEXT NOT NULL,
-            content_hash TEXT,
-            image_url TEXT,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(config_id, date, send_time)
-        )
-    `);
-
-    await dbAsync.run(`
-        CREATE TABLE IF NOT EXISTS custom_schedule_jobs (
-            id TEXT PRIMARY KEY,
-            config_id TEXT NOT NULL,
-            title TEXT,
-            enabled INTEGER DEFAULT 1,
-            payload_json TEXT NOT NULL,
-            schedule_json TEXT NOT NULL,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY(config_id) REFERENCES islamic_reminders_config(id)
-        )
-    `);
-
-    await dbAsync.run(`
-        CREATE TABLE IF NOT EXISTS custom_schedule_log (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            job_id TEXT NOT NULL,
-            config_id TEXT NOT NULL,
-            date TEXT NOT NULL,
-            send_time TEXT NOT NULL,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(job_id, date, send_time),
-            FOREIGN KEY(job_id) REFERENCES custom_schedule_jobs(id),
-            FOREIGN KEY(config_id) REFERENCES islamic_reminders_config(id)
-        )
-    `);
+const openSnapshotConnection = () => new Promise((resolve, reject) => {
+    const conn = new sqlite3.Database(dbPath, sqlite3.OPEN_READONLY, (err) => {
+        if (err) return reject(err);
+        conn.configure('busyTimeout', BUSY_TIMEOUT);
+        resolve(conn);
+    });
+});
 
-    try {
-        await dbAsync.run('ALTER TABLE whatsapp_sessions ADD COLUMN last_connected DATETIME');
-        console.log('Added last_connected column to whatsapp_sessions table');
-    } catch (error) {
-        if (!error.message.includes('duplicate column name')) {
-            console.error('Error adding last_connected column:', error.message);
-        }
+/**
+ * Online backup of the live database into destPath (see backup.js).
+ * In WAL mode the copy runs on its own connection inside one read transaction:
+ * every step sees the same snapshot and the writer is never blocked.
+ * Otherwise (no WAL, or in-memory) it runs on the writer between transactions.
+ */
+async function backup(destPath, options = {}) {
+    if (readers.length === 0) {
+        return exclusive(() => backupTo(db, destPath, options));
     }
 
+    const source = await openSnapshotConnection();
     try {
-        await dbAsync.run('ALTER TABLE whatsapp_sessions ADD COLUMN last_disconnected DATETIME');
-        console.log('Added last_disconnected column to whatsapp_sessions table');
-    } catch (error) {
-        if (!error.message.includes('duplicate column name')) {
-            console.error('Error adding last_disconnected column:', error.message);
-        }
+        await new Promise((resolve, reject) => source.exec('BEGIN', err => (err ? reject(err) : resolve())));
+        // The read transaction only starts (and pins the snapshot) on the first read
+        await query(source, 'get', 'SELECT COUNT(*) AS count FROM sqlite_master');
+        return await backupTo(source, destPath, options);
+    } finally {
+        // Closing ends the read transaction
+        source.close();
     }
+}
 
-    // Add max_sessions column if it doesn't exist
-    try {
-        await dbAsync.run('ALTER TABLE plans ADD COLUMN max_sessions INTEGER DEFAULT 1');
-        console.log('Added max_sessions column to plans table');
-    } catch (error) {
-        if (!error.message.includes('duplicate column name')) {
-            console.error('Error adding max_sessions column:', error.message);
+// Set while the database file is being swapped; reads and prepares wait on it
+let swapGate = null;
+
+// Rejects when the handle stays open (e.g. SQLITE_BUSY with a statement still running)
+const closeConnection = (conn) => new Promise((resolve, reject) => {
+    conn.close((err) => {
+        if (err) {
+            console.warn('⚠️ Closing database connection failed:', err.message);
+            reject(err);
+        } else {
+            resolve();
         }
-    }
+    });
+});
 
-    // Add last_login column to users for onboarding detection
-    try {
-        await dbAsync.run('ALTER TABLE users ADD COLUMN last_login DATETIME');
-        console.log('Added last_login column to users table');
-    } catch (error) {
-        if (!error.message.includes('duplicate column name')) {
-            console.error('Error adding last_login column:', error.message);
-        }
+/**
+ * Close every connection before the files are touched. If any handle stays
+ * open, nothing is renamed: the pool is put back together and the error thrown.
+ */
+async function closeAll() {
+    const oldReaders = readers;
+    readers = [];
+    statementCache.clear();
+    preparingStatements.clear();
+
+    const results = await Promise.allSettled(oldReaders.map(r => closeConnection(r.conn)));
+    const stillOpen = oldReaders.filter((r, i) => results[i].status === 'rejected');
+    if (stillOpen.length) {
+        readers = stillOpen;
+        openReaders(oldReaders.length - stillOpen.length);
+        throw results.find(r => r.status === 'rejected').reason;
     }
 
-    // Add phone_verified_at column to users
     try {
-        await dbAsync.run('ALTER TABLE users ADD COLUMN phone_verified_at DATETIME');
-        console.log('Added phone_verified_at column to users table');
+        await closeConnection(db);
     } catch (error) {
-        if (!error.message.includes('duplicate column name')) {
-            console.error('Error adding phone_verified_at column:', error.message);
-        }
+        openReaders(oldReaders.length);
+        throw error;
     }
+}
 
-    // Add monday and thursday columns to fasting_settings
+const renameIfExists = async (from, to) => {
     try {
-        await dbAsync.run('ALTER TABLE fasting_settings ADD COLUMN monday INTEGER DEFAULT 0');
-        console.log('Added monday column to fasting_settings table');
+        await fs.promises.rename(from, to);
     } catch (error) {
-        if (!error.message.includes('duplicate column name')) {
-            console.error('Error adding monday column:', error.message);
-        }
+        if (error.code !== 'ENOENT') throw error;
     }
+};
 
-    try {
-        await dbAsync.run('ALTER TABLE fasting_settings ADD COLUMN thursday INTEGER DEFAULT 0');
-        console.log('Added thursday column to fasting_settings table');
-    } catch (error) {
-        if (!error.message.includes('duplicate column name')) {
-            console.error('Error adding thursday column:', error.message);
-        }
+/**
+ * Replace the live database with sourcePath (validated, on the same filesystem as dbPath).
+ * Writers are held by the transaction queue and readers by swapGate while every
+ * connection is closed, the files are renamed and the connections reopened.
+ * The previous database is kept as <db>.bak.
+ */
+function swapDatabase(sourcePath) {
+    if (isMemoryDb) {
+        return Promise.reject(new Error('Cannot swap an in-memory database'));
     }
 
-    // Add hijri_adjustment to islamic_reminders_config
-    try {
-        await dbAsync.run('ALTER TABLE islamic_reminders_config ADD COLUMN hijri_adjustment INTEGER DEFAULT 0');
-        console.log('Added hijri_adjustment column to islamic_reminders_config table');
-    } catch (error) {
-        if (!error.message.includes('duplicate column name')) {
-            console.error('Error adding hijri_adjustment column:', error.message);
-        }
-    }
+    return exclusive(async () => {
+        const started = Date.now();
+        let releaseGate;
+        swapGate = new Promise(resolve => { releaseGate = resolve; });
 
-    // Add friday_kahf to islamic_reminders_config
-    try {
-        await dbAsync.run('ALTER TABLE islamic_reminders_config ADD COLUMN friday_kahf INTEGER DEFAULT 1');
-        console.log('Added friday_kahf column to islamic_reminders_config table');
-    } catch (error) {
-        if (!error.message.includes('duplicate column name')) {
-            console.error('Error adding friday_kahf column:', error.message);
-        }
-    }
+        try {
+            while (readers.some(r => r.inflight > 0)) {
+                await new Promise(resolve => setTimeout(resolve, 10));
+            }
 
-    // Add manual prayer times columns to islamic_reminders_config
-    try {
-        await dbAsync.run('ALTER TABLE islamic_reminders_config ADD COLUMN prayer_time_mode TEXT DEFAULT \'auto\'');
-        console.log('Added prayer_time_mode column to islamic_reminders_config table');
-    } catch (error) {
-        if (!error.message.includes('duplicate column name')) {
-            console.error('Error adding prayer_time_mode column:', error.message);
-        }
-    }
+            // Aborts the swap before any rename if a handle would stay open on the old inode
+            await closeAll();
 
-    try {
-        await dbAsync.run('ALTER TABLE islamic_reminders_config ADD COLUMN manual_fajr TEXT');
-        console.log('Added manual_fajr column to islamic_reminders_config table');
-    } catch (error) {
-        if (!error.message.includes('duplicate column name')) {
-            console.error('Error adding manual_fajr column:', error.message);
-        }
-    }
+            try {
+                for (const suffix of ['-wal', '-shm']) {
+                    await fs.promises.rm(`${dbPath}.bak${suffix}`, { force: true });
+                }
+                for (const suffix of ['', '-wal', '-shm']) {
+                    await renameIfExists(`${dbPath}${suffix}`, `${dbPath}.bak${suffix}`);
+                }
+                try {
+                    await fs.promises.rename(sourcePath, dbPath);
+                } catch (error) {
+                    for (const suffix of ['', '-wal', '-shm']) {
+                        await renameIfExists(`${dbPath}.bak${suffix}`, `${dbPath}${suffix}`);
+                    }
+                    throw error;
+                }
+            } finally {
+                db = openWriter();
+            }
 
-    try {
-        await dbAsync.run('ALTER TABLE islamic_reminders_config ADD COLUMN manual_dhuhr TEXT');
-        console.log('Added manual_dhuhr column to islamic_reminders_config table');
-    } catch (error) {
-        if (!error.message.includes('duplicate column name')) {
-            console.error('Error adding manual_dhuhr column:', error.message);
+            return { ms: Date.now() - started };
+        } finally {
+            swapGate = null;
+            releaseGate();
         }
-    }
+    });
+}
 
-    try {
-        await dbAsync.run('ALTER TABLE islamic_reminders_config ADD COLUMN manual_asr TEXT');
-        console.log('Added manual_asr column to islamic_reminders_config table');
-    } catch (error) {
-        if (!error.message.includes('duplicate column name')) {
-            console.error('Error adding manual_asr column:', error.message);
-        }
-    }
+const readFrom = (method) => async (sql, params = []) => {
+    if (swapGate) await swapGate;
+    const reader = pickReader();
+    if (!reader) return connection[method](sql, params);
 
-    try {
-        await dbAsync.run('ALTER TABLE islamic_reminders_config ADD COLUMN manual_maghrib TEXT');
-        console.log('Added manual_maghrib column to islamic_reminders_config table');
-    } catch (error) {
-        if (!error.message.includes('duplicate column name')) {
-            console.error('Error adding manual_maghrib column:', error.message);
-        }
-    }
+    reader.inflight++;
+    reader.served++;
+    return profiler.track(sql, params, () => query(reader.conn, method, sql, params))
+        .finally(() => { reader.inflight--; });
+};
 
-    try {
-        await dbAsync.run('ALTER TABLE islamic_reminders_config ADD COLUMN manual_isha TEXT');
-        console.log('Added manual_isha column to islamic_reminders_config table');
-    } catch (error) {
-        if (!error.message.includes('duplicate column name')) {
-            console.error('Error adding manual_isha column:', error.message);
-        }
-    }
+/**
+ * Close the read pool and the writer once running transactions have finished
+ */
+function close() {
+    return exclusive(closeAll);
+}
+
+// Per-reader load (empty while the pool is not open)
+const readPoolStats = () => readers.map(r => ({ inflight: r.inflight, served: r.served }));
+
+// Slow statements get their plan captured on a reader (or the writer), outside the profiler
+profiler.setExplainer((sql, params) => {
+    const reader = pickReader();
+    return query(reader ? reader.conn : db, 'all', `EXPLAIN QUERY PLAN ${sql}`, params || []);
+});
+
+// Async Wrapper (reads from the pool, writes through the single writer)
+const dbAsync = {
+    get: readFrom('get'),
+    all: readFrom('all'),
+    run: async (sql, params = []) => {
+        await waitForTransactions();
+        return connection.run(sql, params);
+    },
+    exec: async (sql) => {
+        await waitForTransactions();
+        return connection.exec(sql);
+    },
+    prepare: async (sql) => {
+        if (swapGate) await swapGate;
+        return wrapStatement(await getStatement(sql), sql, true);
+    },
+    transaction,
+    insertMany: (table, rows, options) => transaction(t => t.insertMany(table, rows, options)),
+    backup
+};
+
+// Migrations manage their own BEGIN/COMMIT and must read their own uncommitted DDL,
+// so they run entirely on the writer connection
+const migrate = () => runMigrations(tx);
+
+async function init() {
+    console.log('Initializing Database Schema...');
+
+    await migrate();
 
     // Seed Default Plans
     const checkPlans = await dbAsync.get('SELECT count(*) as count FROM plans');
@@ -672,82 +524,16 @@ async function init() {
         }
     }
 
-    // Create Activity Logs Table
-    try {
-        await dbAsync.run(`
-            CREATE TABLE IF NOT EXISTS activity_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT,
-                action TEXT NOT NULL,
-                details TEXT,
-                ip_address TEXT,
-                user_agent TEXT,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY(user_id) REFERENCES users(id)
-            )
-        `);
-        console.log('✅ Activity logs table check/create done');
-    } catch (e) {
-        console.error('Error creating activity_logs table:', e.message);
-    }
-
-    // Add verified_phone columns to whatsapp_sessions
-    try {
-        await dbAsync.run('ALTER TABLE whatsapp_sessions ADD COLUMN verified_phone TEXT');
-        console.log('Added verified_phone column to whatsapp_sessions');
-    } catch (error) {
-        if (!error.message.includes('duplicate column name')) {
-            console.error('Error adding verified_phone column:', error.message);
-        }
-    }
-
-    try {
-        await dbAsync.run('ALTER TABLE whatsapp_sessions ADD COLUMN phone_verified_at DATETIME');
-        console.log('Added phone_verified_at column to whatsapp_sessions');
-    } catch (error) {
-        if (!error.message.includes('duplicate column name')) {
-            console.error('Error adding phone_verified_at column:', error.message);
-        }
-    }
-
-    // Create Verification Codes Table
-    try {
-        await dbAsync.run(`
-            CREATE TABLE IF NOT EXISTS verification_codes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id TEXT NOT NULL,
-                phone_number TEXT NOT NULL,
-                code_hash TEXT NOT NULL,
-                verified INTEGER DEFAULT 0,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                expires_at DATETIME NOT NULL,
-                FOREIGN KEY(session_id) REFERENCES whatsapp_sessions(session_id)
-            )
-        `);
-        console.log('✅ Verification codes table created');
-    } catch (e) {
-        if (!e.message.includes('already exists')) {
-            console.error('Error creating verification_codes table:', e.message);
-        }
-    }
-
-    // Add missing show_link columns to adhkar_settings
-    const showLinkColumns = ['morning_show_link', 'evening_show_link', 'hadith_show_link', 'content_show_link'];
-    for (const column of showLinkColumns) {
-        try {
-            await dbAsync.run(`ALTER TABLE adhkar_settings ADD COLUMN ${column} INTEGER DEFAULT 1`);
-            console.log(`Added ${column} column to adhkar_settings table`);
-        } catch (error) {
-            if (!error.message.includes('duplicate column name')) {
-                console.error(`Error adding ${column} column:`, error.message);
-            }
-        }
-    }
-
     console.log('Database Schema Initialized.');
 }
 
 module.exports = {
     db: dbAsync,
-    init
+    init,
+    migrate,
+    swapDatabase,
+    close,
+    readPoolStats,
+    dbPath,
+    profiler
 };
@@ -0,0 +1,373 @@
+// Baseline schema: every table and column that the old startup ALTER TABLE
+// cascade in db.js produced. Safe to run against databases created by that code.
+
+const TABLES = `
+    CREATE TABLE IF NOT EXISTS users (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        phone TEXT UNIQUE NOT NULL,
+        email TEXT,
+        password_hash TEXT NOT NULL,
+        role TEXT DEFAULT 'user',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS plans (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        duration_days INTEGER NOT NULL,
+        price REAL NOT NULL,
+        is_trial BOOLEAN DEFAULT 0,
+        features TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS notifications (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        title TEXT NOT NULL,
+        message TEXT NOT NULL,
+        type TEXT DEFAULT 'info',
+        is_read INTEGER DEFAULT 0,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id)
+    );
+
+    -- Islamic Reminders System Tables --
+
+    CREATE TABLE IF NOT EXISTS islamic_reminders_config (
+        id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        session_id TEXT,
+        location_country TEXT,
+        location_city TEXT,
+        latitude REAL,
+        longitude REAL,
+        timezone TEXT DEFAULT 'Africa/Cairo',
+        prayer_calculation_method TEXT DEFAULT 'MWL',
+        hijri_adjustment INTEGER DEFAULT 0,
+        friday_kahf INTEGER DEFAULT 1,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id),
+        FOREIGN KEY(session_id) REFERENCES whatsapp_sessions(session_id)
+    );
+
+    CREATE TABLE IF NOT EXISTS prayer_settings (
+        id TEXT PRIMARY KEY,
+        config_id TEXT NOT NULL,
+        prayer_name TEXT NOT NULL,
+        enabled INTEGER DEFAULT 1,
+        reminder_before_minutes INTEGER DEFAULT 10,
+        send_adhan INTEGER DEFAULT 1,
+        send_after_reminder INTEGER DEFAULT 0,
+        post_prayer_adhkar_enabled INTEGER DEFAULT 1,
+        post_prayer_adhkar_delay INTEGER DEFAULT 5,
+        adhan_sound TEXT,
+        FOREIGN KEY(config_id) REFERENCES islamic_reminders_config(id)
+    );
+
+    CREATE TABLE IF NOT EXISTS fasting_settings (
+        id TEXT PRIMARY KEY,
+        config_id TEXT NOT NULL,
+        monday_thursday INTEGER DEFAULT 0,
+        white_days INTEGER DEFAULT 0,
+        ashura INTEGER DEFAULT 0,
+        dhul_hijjah_first_10 INTEGER DEFAULT 0,
+        ramadan_alerts INTEGER DEFAULT 1,
+        monday INTEGER DEFAULT 0,
+        thursday INTEGER DEFAULT 0,
+        reminder_time TEXT DEFAULT '20:00',
+        FOREIGN KEY(config_id) REFERENCES islamic_reminders_config(id)
+    );
+
+    CREATE TABLE IF NOT EXISTS content_library (
+        id TEXT PRIMARY KEY,
+        type TEXT NOT NULL,
+        category TEXT,
+        content_ar TEXT NOT NULL,
+        source TEXT,
+        media_url TEXT,
+        active INTEGER DEFAULT 1,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS reminder_recipients (
+        id TEXT PRIMARY KEY,
+        config_id TEXT NOT NULL,
+        type TEXT NOT NULL,
+        whatsapp_id TEXT NOT NULL,
+        name TEXT,
+        enabled INTEGER DEFAULT 1,
+        FOREIGN KEY(config_id) REFERENCES islamic_reminders_config(id)
+    );
+
+    CREATE TABLE IF NOT EXISTS scheduled_reminders (
+        id TEXT PRIMARY KEY,
+        config_id TEXT NOT NULL,
+        reminder_type TEXT NOT NULL,
+        scheduled_time DATETIME NOT NULL,
+        content_id TEXT,
+        custom_message TEXT,
+        status TEXT DEFAULT 'pending',
+        sent_at DATETIME,
+        FOREIGN KEY(config_id) REFERENCES islamic_reminders_config(id),
+        FOREIGN KEY(content_id) REFERENCES content_library(id)
+    );
+
+    CREATE TABLE IF NOT EXISTS prayer_times_cache (
+        id TEXT PRIMARY KEY,
+        location_key TEXT NOT NULL,
+        prayer_date DATE NOT NULL,
+        fajr TIME,
+        sunrise TIME,
+        dhuhr TIME,
+        asr TIME,
+        maghrib TIME,
+        isha TIME,
+        hijri_date TEXT,
+        cached_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(location_key, prayer_date)
+    );
+
+    -- End Islamic Reminders Tables --
+
+    CREATE TABLE IF NOT EXISTS subscriptions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        plan_id INTEGER NOT NULL,
+        status TEXT DEFAULT 'pending',
+        start_date DATETIME,
+        end_date DATETIME,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id),
+        FOREIGN KEY(plan_id) REFERENCES plans(id)
+    );
+
+    CREATE TABLE IF NOT EXISTS system_settings (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS whatsapp_sessions (
+        session_id TEXT PRIMARY KEY,
+        user_id TEXT,
+        device_type TEXT,
+        name TEXT,
+        connected BOOLEAN DEFAULT 0,
+        webhook_url TEXT,
+        phone_number TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id)
+    );
+
+    CREATE TABLE IF NOT EXISTS payments (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        subscription_id INTEGER,
+        amount REAL NOT NULL,
+        method TEXT NOT NULL,
+        transaction_ref TEXT,
+        receipt_path TEXT,
+        status TEXT DEFAULT 'pending',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id),
+        FOREIGN KEY(subscription_id) REFERENCES subscriptions(id)
+    );
+
+    CREATE TABLE IF NOT EXISTS admin_tabs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        label TEXT NOT NULL,
+        icon TEXT DEFAULT 'fas fa-cog',
+        tab_order INTEGER DEFAULT 999,
+        active BOOLEAN DEFAULT 1,
+        description TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS adhkar_settings (
+        id TEXT PRIMARY KEY,
+        config_id TEXT NOT NULL,
+        morning_enabled INTEGER DEFAULT 1,
+        morning_time TEXT DEFAULT '07:00',
+        morning_source TEXT DEFAULT 'mixed',
+        evening_enabled INTEGER DEFAULT 1,
+        evening_time TEXT DEFAULT '17:00',
+        evening_source TEXT DEFAULT 'mixed',
+        hadith_enabled INTEGER DEFAULT 1,
+        hadith_time TEXT DEFAULT '12:00',
+        hadith_source TEXT DEFAULT 'mixed',
+        media_preference TEXT DEFAULT 'mixed',
+        content_enabled INTEGER DEFAULT 1,
+        content_time TEXT DEFAULT '21:00',
+        content_type TEXT DEFAULT 'mixed',
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(config_id) REFERENCES islamic_reminders_config(id)
+    );
+
+    CREATE TABLE IF NOT EXISTS hadith_schedule_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        config_id TEXT NOT NULL,
+        date TEXT NOT NULL,
+        send_time TEXT NOT NULL,
+        hadith_id TEXT,
+        hadith_hash TEXT,
+        image_url TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(config_id, date, send_time),
+        UNIQUE(config_id, date, hadith_id),
+        UNIQUE(config_id, date, hadith_hash),
+        UNIQUE(config_id, date, image_url)
+    );
+
+    CREATE TABLE IF NOT EXISTS selected_adhkar_schedule_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        config_id TEXT NOT NULL,
+        date TEXT NOT NULL,
+        send_time TEXT NOT NULL,
+        content_hash TEXT,
+        image_url TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(config_id, date, send_time)
+    );
+
+    CREATE TABLE IF NOT EXISTS custom_schedule_jobs (
+        id TEXT PRIMARY KEY,
+        config_id TEXT NOT NULL,
+        title TEXT,
+        enabled INTEGER DEFAULT 1,
+        payload_json TEXT NOT NULL,
+        schedule_json TEXT NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(config_id) REFERENCES islamic_reminders_config(id)
+    );
+
+    CREATE TABLE IF NOT EXISTS custom_schedule_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id TEXT NOT NULL,
+        config_id TEXT NOT NULL,
+        date TEXT NOT NULL,
+        send_time TEXT NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(job_id, date, send_time),
+        FOREIGN KEY(job_id) REFERENCES custom_schedule_jobs(id),
+        FOREIGN KEY(config_id) REFERENCES islamic_reminders_config(id)
+    );
+
+    CREATE TABLE IF NOT EXISTS activity_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT,
+        action TEXT NOT NULL,
+        details TEXT,
+        ip_address TEXT,
+        user_agent TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id)
+    );
+
+    CREATE TABLE IF NOT EXISTS verification_codes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id TEXT NOT NULL,
+        phone_number TEXT NOT NULL,
+        code_hash TEXT NOT NULL,
+        verified INTEGER DEFAULT 0,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        expires_at DATETIME NOT NULL,
+        FOREIGN KEY(session_id) REFERENCES whatsapp_sessions(session_id)
+    );
+`;
+
+// Columns added over time with ALTER TABLE (first definition wins, as before)
+const COLUMNS = {
+    users: {
+        last_login: 'DATETIME',
+        phone_verified_at: 'DATETIME'
+    },
+    plans: {
+        max_sessions: 'INTEGER DEFAULT 1'
+    },
+    islamic_reminders_config: {
+        hijri_adjustment: 'INTEGER DEFAULT 0',
+        friday_kahf: 'INTEGER DEFAULT 1',
+        enabled: 'INTEGER DEFAULT 1',
+        prayer_time_mode: "TEXT DEFAULT 'auto'",
+        manual_fajr: 'TEXT',
+        manual_dhuhr: 'TEXT',
+        manual_asr: 'TEXT',
+        manual_maghrib: 'TEXT',
+        manual_isha: 'TEXT'
+    },
+    prayer_settings: {
+        post_prayer_adhkar_enabled: 'INTEGER DEFAULT 1',
+        post_prayer_adhkar_delay: 'INTEGER DEFAULT 5',
+        post_prayer_adhkar_show_link: 'INTEGER DEFAULT 1'
+    },
+    fasting_settings: {
+        reminder_time: "TEXT DEFAULT '20:00'",
+        monday: 'INTEGER DEFAULT 0',
+        thursday: 'INTEGER DEFAULT 0'
+    },
+    content_library: {
+        last_sent_at: 'DATETIME'
+    },
+    whatsapp_sessions: {
+        phone_number: 'TEXT',
+        last_connected: 'DATETIME',
+        last_disconnected: 'DATETIME',
+        verified_phone: 'TEXT',
+        phone_verified_at: 'DATETIME'
+    },
+    adhkar_settings: {
+        media_preference: "TEXT DEFAULT 'mixed'",
+        content_enabled: 'INTEGER DEFAULT 1',
+        content_time: "TEXT DEFAULT '21:00'",
+        content_type: "TEXT DEFAULT 'mixed'",
+        quran_enabled: 'INTEGER DEFAULT 0',
+        quran_time: "TEXT DEFAULT '09:00'",
+        quran_pages_per_day: 'INTEGER DEFAULT 5',
+        text_length: "TEXT DEFAULT 'full'",
+        morning_source: "TEXT DEFAULT 'mixed'",
+        evening_source: "TEXT DEFAULT 'mixed'",
+        hadith_source: "TEXT DEFAULT 'mixed'",
+        before_after_prayer: 'INTEGER DEFAULT 0',
+        hadith_media_mode: "TEXT DEFAULT 'text'",
+        hadith_show_source_text: 'INTEGER DEFAULT 1',
+        hadith_show_image_source_text: 'INTEGER DEFAULT 0',
+        hadith_image_source: "TEXT DEFAULT 'auto'",
+        hadith_image_theme: "TEXT DEFAULT 'mosques'",
+        hadith_times_count: 'INTEGER DEFAULT 1',
+        hadith_times_json: 'TEXT',
+        selected_enabled: 'INTEGER DEFAULT 0',
+        selected_category: "TEXT DEFAULT 'general'",
+        selected_media_mode: "TEXT DEFAULT 'text'",
+        selected_show_source_text: 'INTEGER DEFAULT 1',
+        selected_show_link: 'INTEGER DEFAULT 1',
+        selected_image_theme: "TEXT DEFAULT 'mosques'",
+        selected_times_count: 'INTEGER DEFAULT 1',
+        selected_times_json: `TEXT DEFAULT '["21:00"]'`,
+        show_source_link: 'INTEGER DEFAULT 1',
+        morning_show_link: 'INTEGER DEFAULT 1',
+        evening_show_link: 'INTEGER DEFAULT 1',
+        hadith_show_link: 'INTEGER DEFAULT 1',
+        content_show_link: 'INTEGER DEFAULT 1'
+    }
+};
+
+module.exports = {
+    async up(db, schema) {
+        await db.exec(TABLES);
+
+        for (const [table, columns] of Object.entries(COLUMNS)) {
+            await schema.addColumns(table, columns);
+        }
+
+        // Seed adhkar_settings for configs created before the table existed
+        await db.run(`
+            INSERT INTO adhkar_settings (id, config_id)
+            SELECT 'adhkar-' || lower(hex(randomblob(5))), c.id
+            FROM islamic_reminders_config c
+            WHERE NOT EXISTS (SELECT 1 FROM adhkar_settings a WHERE a.config_id = c.id)
+        `);
+    }
+};
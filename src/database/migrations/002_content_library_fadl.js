@@ -0,0 +1,6 @@
+// Virtue (fadl) text for library items, previously added by a standalone script
+module.exports = {
+    async up(db, schema) {
+        await schema.addColumn('content_library', 'fadl', 'TEXT');
+    }
+};
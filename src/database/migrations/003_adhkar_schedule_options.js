@@ -0,0 +1,10 @@
+// Expanded adhkar scheduling options, previously added by migrate_adhkar_expanded.js
+module.exports = {
+    async up(db, schema) {
+        await schema.addColumns('adhkar_settings', {
+            frequency: "TEXT DEFAULT 'daily'",
+            parts_per_day: 'INTEGER DEFAULT 1',
+            randomize_schedule: 'INTEGER DEFAULT 0'
+        });
+    }
+};
@@ -0,0 +1,25 @@
+// Secondary indexes for the scheduler tick, dashboard and admin listings.
+// prayer_times_cache(location_key, prayer_date) and the *_schedule_log lookups
+// are already served by their UNIQUE constraints.
+const INDEXES = `
+    CREATE INDEX IF NOT EXISTS idx_reminders_config_enabled_session ON islamic_reminders_config(enabled, session_id);
+    CREATE INDEX IF NOT EXISTS idx_reminders_config_user ON islamic_reminders_config(user_id);
+    CREATE INDEX IF NOT EXISTS idx_prayer_settings_config ON prayer_settings(config_id);
+    CREATE INDEX IF NOT EXISTS idx_reminder_recipients_config ON reminder_recipients(config_id);
+    CREATE INDEX IF NOT EXISTS idx_adhkar_settings_config ON adhkar_settings(config_id);
+    CREATE INDEX IF NOT EXISTS idx_fasting_settings_config ON fasting_settings(config_id);
+    CREATE INDEX IF NOT EXISTS idx_custom_jobs_config_enabled ON custom_schedule_jobs(config_id, enabled);
+    CREATE INDEX IF NOT EXISTS idx_content_type_category ON content_library(type, category, active, last_sent_at);
+    CREATE INDEX IF NOT EXISTS idx_subscriptions_status_end ON subscriptions(status, end_date);
+    CREATE INDEX IF NOT EXISTS idx_subscriptions_user ON subscriptions(user_id, created_at);
+    CREATE INDEX IF NOT EXISTS idx_activity_logs_created ON activity_logs(created_at);
+    CREATE INDEX IF NOT EXISTS idx_notifications_user ON notifications(user_id, created_at);
+    CREATE INDEX IF NOT EXISTS idx_whatsapp_sessions_user ON whatsapp_sessions(user_id);
+    CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
+`;
+
+module.exports = {
+    async up(db) {
+        await db.exec(INDEXES);
+    }
+};
@@ -0,0 +1,23 @@
+// Support for RetentionService: date indexes so old rows can be found and
+// deleted in small batches, and daily aggregates kept after detail rows expire.
+const SCHEMA = `
+    CREATE TABLE IF NOT EXISTS log_daily_rollups (
+        source TEXT NOT NULL,
+        day TEXT NOT NULL,
+        dimension TEXT NOT NULL DEFAULT '',
+        total INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (source, day, dimension)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_hadith_log_date ON hadith_schedule_log(date);
+    CREATE INDEX IF NOT EXISTS idx_selected_log_date ON selected_adhkar_schedule_log(date);
+    CREATE INDEX IF NOT EXISTS idx_custom_log_date ON custom_schedule_log(date);
+    CREATE INDEX IF NOT EXISTS idx_prayer_cache_date ON prayer_times_cache(prayer_date);
+    CREATE INDEX IF NOT EXISTS idx_notifications_read_created ON notifications(is_read, created_at);
+`;
+
+module.exports = {
+    async up(db) {
+        await db.exec(SCHEMA);
+    }
+};
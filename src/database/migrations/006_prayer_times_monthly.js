@@ -0,0 +1,19 @@
+// Month-at-a-time prayer times per location: times is a packed Int16 array of
+// minutes after local midnight, six per day (fajr, sunrise, dhuhr, asr, maghrib, isha).
+const SCHEMA = `
+    CREATE TABLE IF NOT EXISTS prayer_times_monthly (
+        location_key TEXT NOT NULL,
+        month TEXT NOT NULL,
+        times BLOB NOT NULL,
+        computed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (location_key, month)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_prayer_monthly_month ON prayer_times_monthly(month);
+`;
+
+module.exports = {
+    async up(db) {
+        await db.exec(SCHEMA);
+    }
+};
@@ -0,0 +1,20 @@
+// Shuffled no-repeat decks: one stored permutation of a content pool per config,
+// drawn from in order and reshuffled when the cursor reaches the end.
+const SCHEMA = `
+    CREATE TABLE IF NOT EXISTS content_decks (
+        deck_key TEXT PRIMARY KEY,
+        config_id TEXT NOT NULL,
+        pool TEXT NOT NULL,
+        ids TEXT NOT NULL,
+        cursor INTEGER NOT NULL DEFAULT 0,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_content_decks_config ON content_decks(config_id);
+`;
+
+module.exports = {
+    async up(db) {
+        await db.exec(SCHEMA);
+    }
+};
@@ -0,0 +1,51 @@
+// Normalized-text hash on library items so imports and refills skip duplicates
+// (INSERT OR IGNORE against the partial unique index). Existing cached hadiths
+// are backfilled; later copies of the same text keep a NULL hash.
+const crypto = require('crypto');
+
+// Frozen copy of ArabicTextService.normalize/hash as of this migration: later changes
+// to the service must not change what this migration writes on a fresh database
+const DIACRITICS = /[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED]/g;
+const TATWEEL = /\u0640/g;
+const NON_LETTERS = /[^\u0621-\u064A\u0660-\u0669a-zA-Z0-9\s]/g;
+
+const normalize = (text) => {
+    if (!text) return '';
+    return String(text)
+        .replace(DIACRITICS, '')
+        .replace(TATWEEL, '')
+        .replace(/[آأإٱ]/g, 'ا')
+        .replace(/ى/g, 'ي')
+        .replace(/ة/g, 'ه')
+        .replace(NON_LETTERS, ' ')
+        .replace(/\s+/g, ' ')
+        .trim();
+};
+
+const hash = (text) => {
+    const normalized = normalize(text);
+    if (!normalized) return null;
+    return crypto.createHash('sha1').update(normalized).digest('hex');
+};
+
+module.exports = {
+    async up(db, schema) {
+        await schema.addColumn('content_library', 'content_hash', 'TEXT');
+
+        const rows = await db.all(
+            "SELECT id, content_ar FROM content_library WHERE type = 'hadith_cached' ORDER BY created_at, id"
+        );
+        const seen = new Set();
+        for (const row of rows) {
+            const rowHash = hash(row.content_ar);
+            if (!rowHash || seen.has(rowHash)) continue;
+            seen.add(rowHash);
+            await db.run('UPDATE content_library SET content_hash = ? WHERE id = ?', [rowHash, row.id]);
+        }
+
+        await db.exec(`
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_content_library_hash
+            ON content_library(content_hash) WHERE content_hash IS NOT NULL;
+        `);
+    }
+};
@@ -0,0 +1,47 @@
+// Full-text search over the content library. content_fts holds an Arabic-normalized
+// copy (no tashkeel, unified alef/ya/ta marbuta) of each item's text and source,
+// kept in sync by triggers; content_id links back to content_library.id.
+
+// Frozen copy of ArabicTextService.sqlNormalize as of this migration (see 012 for the
+// full mark list): a later change to the service must not change what this migration does
+const SQL_MARKS = [
+    '\u064B', '\u064C', '\u064D', '\u064E', '\u064F', '\u0650', '\u0651', '\u0652',
+    '\u0653', '\u0654', '\u0655', '\u0670', '\u0640'
+];
+const SQL_FOLDS = [['\u0623', '\u0627'], ['\u0625', '\u0627'], ['\u0622', '\u0627'], ['\u0671', '\u0627'], ['\u0649', '\u064A'], ['\u0629', '\u0647']];
+
+const norm = (expression) => {
+    let sql = `COALESCE(${expression}, '')`;
+    for (const mark of SQL_MARKS) sql = `replace(${sql}, '${mark}', '')`;
+    for (const [from, to] of SQL_FOLDS) sql = `replace(${sql}, '${from}', '${to}')`;
+    return sql;
+};
+
+module.exports = {
+    async up(db) {
+        await db.exec(`
+            CREATE VIRTUAL TABLE IF NOT EXISTS content_fts USING fts5(
+                content, source, content_id UNINDEXED,
+                tokenize = 'unicode61'
+            );
+
+            CREATE TRIGGER IF NOT EXISTS content_library_fts_insert AFTER INSERT ON content_library BEGIN
+                INSERT INTO content_fts (content, source, content_id)
+                VALUES (${norm('new.content_ar')}, ${norm('new.source')}, new.id);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS content_library_fts_delete AFTER DELETE ON content_library BEGIN
+                DELETE FROM content_fts WHERE content_id = old.id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS content_library_fts_update AFTER UPDATE OF id, content_ar, source ON content_library BEGIN
+                DELETE FROM content_fts WHERE content_id = old.id;
+                INSERT INTO content_fts (content, source, content_id)
+                VALUES (${norm('new.content_ar')}, ${norm('new.source')}, new.id);
+            END;
+
+            INSERT INTO content_fts (content, source, content_id)
+            SELECT ${norm('content_ar')}, ${norm('source')}, id FROM content_library;
+        `);
+    }
+};
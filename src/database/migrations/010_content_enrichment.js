@@ -0,0 +1,52 @@
+// Derived fields stored with each library item (see ContentEnrichmentService):
+// cleaned matn, search snippet, source link and a length class. Existing rows are backfilled.
+
+// Frozen copy of ContentEnrichmentService.derive as of this migration: a later change
+// to the service must not change what this migration writes on a fresh database
+const HADITH_TYPES = ['hadith', 'hadith_cached'];
+const MATN_PREFIX = 'قال رسول الله ﷺ:';
+const SNIPPET_LENGTH = 100;
+const LENGTH_CLASSES = [[200, 'short'], [600, 'medium']];
+
+const lengthClass = (text) => {
+    const length = String(text || '').length;
+    for (const [max, name] of LENGTH_CLASSES) {
+        if (length <= max) return name;
+    }
+    return 'long';
+};
+
+const derive = ({ type, content_ar }) => {
+    const text = String(content_ar || '');
+    const fields = { matn: null, snippet: null, source_url: null, length_class: lengthClass(text) };
+    if (!HADITH_TYPES.includes(type) || !text) return fields;
+
+    const prefixAt = text.indexOf(MATN_PREFIX);
+    const matn = (prefixAt === -1 ? text : text.slice(prefixAt + MATN_PREFIX.length))
+        .trim()
+        .replace(/^"(.*)"$/s, '$1');
+    const snippet = matn.substring(0, SNIPPET_LENGTH).replace(/[^\u0621-\u064A\s]/g, '').trim();
+
+    fields.matn = matn;
+    fields.snippet = snippet;
+    fields.source_url = snippet ? `https://dorar.net/hadith/search?q=${encodeURIComponent(snippet)}` : null;
+    return fields;
+};
+
+module.exports = {
+    async up(db, schema) {
+        await schema.addColumn('content_library', 'matn', 'TEXT');
+        await schema.addColumn('content_library', 'snippet', 'TEXT');
+        await schema.addColumn('content_library', 'source_url', 'TEXT');
+        await schema.addColumn('content_library', 'length_class', 'TEXT');
+
+        const rows = await db.all('SELECT id, type, content_ar FROM content_library');
+        for (const row of rows) {
+            const { matn, snippet, source_url: sourceUrl, length_class: lengthClass } = derive(row);
+            await db.run(
+                'UPDATE content_library SET matn = ?, snippet = ?, source_url = ?, length_class = ? WHERE id = ?',
+                [matn, snippet, sourceUrl, lengthClass, row.id]
+            );
+        }
+    }
+};
@@ -0,0 +1,24 @@
+// Index of the on-disk media cache: one row per remote URL, pointing at a
+// content-addressed file (sha256 of the bytes) plus the validators needed to
+// revalidate it. Several URLs can share one file.
+const SCHEMA = `
+    CREATE TABLE IF NOT EXISTS media_cache (
+        url TEXT PRIMARY KEY,
+        hash TEXT NOT NULL,
+        content_type TEXT,
+        size INTEGER NOT NULL DEFAULT 0,
+        etag TEXT,
+        last_modified TEXT,
+        fetched_at INTEGER NOT NULL,
+        used_at INTEGER NOT NULL
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_media_cache_hash ON media_cache(hash);
+    CREATE INDEX IF NOT EXISTS idx_media_cache_used ON media_cache(used_at);
+`;
+
+module.exports = {
+    async up(db) {
+        await db.exec(SCHEMA);
+    }
+};
@@ -0,0 +1,60 @@
+// content_fts rows are keyed by content_library.rowid instead of an UNINDEXED
+// content_id column: the triggers used to find the row to remove with a full scan
+// of the index on every delete or edit. The rowids stay stable because the
+// database is never VACUUMed (backups copy pages).
+
+// Frozen copy of ArabicTextService.sqlNormalize as of this migration
+const MARK_RANGES = [[0x0610, 0x061A], [0x064B, 0x065F], [0x0670, 0x0670], [0x06D6, 0x06ED]];
+const SQL_MARKS = [
+    ...MARK_RANGES.flatMap(([from, to]) => Array.from({ length: to - from + 1 }, (_, i) => String.fromCharCode(from + i))),
+    '\u0640'
+].join('');
+const SQL_FOLDS = [['\u0623', '\u0627'], ['\u0625', '\u0627'], ['\u0622', '\u0627'], ['\u0671', '\u0627'], ['\u0649', '\u064A'], ['\u0629', '\u0647']];
+
+// One mark per step of a recursive CTE: nesting a replace() per mark overflows the
+// parser stack of SQLite < 3.46
+const norm = (expression) => {
+    let sql = `(WITH RECURSIVE stripped(i, s) AS (
+        SELECT 0, COALESCE(${expression}, '')
+        UNION ALL
+        SELECT i + 1, replace(s, substr('${SQL_MARKS}', i + 1, 1), '') FROM stripped WHERE i < ${SQL_MARKS.length}
+    ) SELECT s FROM stripped WHERE i = ${SQL_MARKS.length})`;
+    for (const [from, to] of SQL_FOLDS) sql = `replace(${sql}, '${from}', '${to}')`;
+    return sql;
+};
+
+module.exports = {
+    async up(db) {
+        await db.exec(`
+            DROP TRIGGER IF EXISTS content_library_fts_insert;
+            DROP TRIGGER IF EXISTS content_library_fts_delete;
+            DROP TRIGGER IF EXISTS content_library_fts_update;
+            DROP TABLE IF EXISTS content_fts;
+
+            CREATE VIRTUAL TABLE content_fts USING fts5(
+                content, source,
+                tokenize = 'unicode61'
+            );
+
+            -- The delete first: a row replaced by INSERT OR REPLACE can come back with the same rowid
+            CREATE TRIGGER content_library_fts_insert AFTER INSERT ON content_library BEGIN
+                DELETE FROM content_fts WHERE rowid = new.rowid;
+                INSERT INTO content_fts (rowid, content, source)
+                VALUES (new.rowid, ${norm('new.content_ar')}, ${norm('new.source')});
+            END;
+
+            CREATE TRIGGER content_library_fts_delete AFTER DELETE ON content_library BEGIN
+                DELETE FROM content_fts WHERE rowid = old.rowid;
+            END;
+
+            CREATE TRIGGER content_library_fts_update AFTER UPDATE OF content_ar, source ON content_library BEGIN
+                DELETE FROM content_fts WHERE rowid = old.rowid;
+                INSERT INTO content_fts (rowid, content, source)
+                VALUES (new.rowid, ${norm('new.content_ar')}, ${norm('new.source')});
+            END;
+
+            INSERT INTO content_fts (rowid, content, source)
+            SELECT rowid, ${norm('content_ar')}, ${norm('source')} FROM content_library;
+        `);
+    }
+};
@@ -0,0 +1,30 @@
+// Compact content decks. 007 kept the permutation as a JSON array of UUIDs in the
+// same row as the cursor, so every draw rewrote the whole (multi-MB) record. The
+// order is now packed content_library rowids (4 bytes each, written once per pass)
+// and the cursor lives in its own small row. Existing decks are dropped: each one
+// is reshuffled on its next draw.
+const SCHEMA = `
+    DROP TABLE IF EXISTS content_decks;
+
+    CREATE TABLE content_decks (
+        deck_key TEXT PRIMARY KEY,
+        config_id TEXT NOT NULL,
+        pool TEXT NOT NULL,
+        rowids BLOB NOT NULL,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_content_decks_config ON content_decks(config_id);
+
+    CREATE TABLE IF NOT EXISTS content_deck_cursors (
+        deck_key TEXT PRIMARY KEY,
+        cursor INTEGER NOT NULL DEFAULT 0,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+`;
+
+module.exports = {
+    async up(db) {
+        await db.exec(SCHEMA);
+    }
+};
@@ -0,0 +1,152 @@
+const fs = require('fs');
+const path = require('path');
+
+const MIGRATIONS_DIR = path.join(__dirname, 'migrations');
+const MIGRATION_FILE = /^(\d+)_([\w-]+)\.js$/;
+
+/**
+ * List migration files ordered by their numeric prefix (001_name.js, 002_name.js, ...)
+ * Only file names are read here, modules are required lazily when pending.
+ */
+function listMigrations(dir = MIGRATIONS_DIR) {
+    if (!fs.existsSync(dir)) return [];
+
+    const seen = new Set();
+    return fs.readdirSync(dir)
+        .map(file => {
+            const match = MIGRATION_FILE.exec(file);
+            if (!match) return null;
+            return { version: parseInt(match[1], 10), name: match[2], file: path.join(dir, file) };
+        })
+        .filter(Boolean)
+        .sort((a, b) => a.version - b.version)
+        .map(migration => {
+            if (seen.has(migration.version)) {
+                throw new Error(`Duplicate migration version ${migration.version} (${migration.name})`);
+            }
+            seen.add(migration.version);
+            return migration;
+        });
+}
+
+function getLatestVersion(dir = MIGRATIONS_DIR) {
+    const migrations = listMigrations(dir);
+    return migrations.length ? migrations[migrations.length - 1].version : 0;
+}
+
+async function ensureVersionTable(db) {
+    await db.run(`
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    `);
+}
+
+async function getSchemaVersion(db) {
+    const row = await db.get('SELECT MAX(version) AS version FROM schema_version');
+    return row && row.version ? row.version : 0;
+}
+
+/**
+ * Schema helpers passed to every migration so they can stay idempotent
+ * without relying on "duplicate column name" errors.
+ */
+function createSchemaHelpers(db) {
+    const columnsCache = new Map();
+
+    const getColumns = async (table) => {
+        if (!columnsCache.has(table)) {
+            const rows = await db.all(`PRAGMA table_info(${table})`);
+            columnsCache.set(table, new Set((rows || []).map(r => r.name)));
+        }
+        return columnsCache.get(table);
+    };
+
+    return {
+        async hasTable(table) {
+            const row = await db.get("SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?", [table]);
+            return !!row;
+        },
+
+        async hasColumn(table, column) {
+            return (await getColumns(table)).has(column);
+        },
+
+        async addColumn(table, column, definition) {
+            const columns = await getColumns(table);
+            if (columns.has(column)) return false;
+            await db.run(`ALTER TABLE ${table} ADD COLUMN ${column} ${definition}`);
+            columns.add(column);
+            return true;
+        },
+
+        async addColumns(table, definitions) {
+            let added = 0;
+            for (const [column, definition] of Object.entries(definitions)) {
+                if (await this.addColumn(table, column, definition)) added++;
+            }
+            return added;
+        }
+    };
+}
+
+/**
+ * Apply pending migrations in order, one transaction per migration.
+ * Returns { from, to, applied: [{ version, name, ms }] }
+ */
+async function runMigrations(db, { dir = MIGRATIONS_DIR } = {}) {
+    await ensureVersionTable(db);
+
+    const current = await getSchemaVersion(db);
+    const migrations = listMigrations(dir);
+    const latest = migrations.length ? migrations[migrations.length - 1].version : 0;
+
+    // Fast path: schema is current, nothing to load or execute
+    if (current >= latest) {
+        console.log(`✅ Database schema is up to date (version ${current})`);
+        return { from: current, to: current, applied: [] };
+    }
+
+    const pending = migrations.filter(m => m.version > current);
+    console.log(`🔄 Applying ${pending.length} migration(s): ${current} -> ${latest}`);
+
+    const applied = [];
+    for (const migration of pending) {
+        const started = Date.now();
+        const mod = require(migration.file);
+        if (!mod || typeof mod.up !== 'function') {
+            throw new Error(`Migration ${path.basename(migration.file)} does not export up()`);
+        }
+
+        await db.exec('BEGIN IMMEDIATE');
+        try {
+            await mod.up(db, createSchemaHelpers(db));
+            await db.run(
+                'INSERT INTO schema_version (version, name) VALUES (?, ?)',
+                [migration.version, migration.name]
+            );
+            await db.exec('COMMIT');
+        } catch (error) {
+            try { await db.exec('ROLLBACK'); } catch (e) { }
+            console.error(`❌ Migration ${migration.version}_${migration.name} failed:`, error.message);
+            throw error;
+        }
+
+        const ms = Date.now() - started;
+        applied.push({ version: migration.version, name: migration.name, ms });
+        console.log(`✅ Migration ${migration.version}_${migration.name} applied (${ms}ms)`);
+    }
+
+    return { from: current, to: latest, applied };
+}
+
+module.exports = {
+    MIGRATIONS_DIR,
+    listMigrations,
+    getLatestVersion,
+    ensureVersionTable,
+    getSchemaVersion,
+    runMigrations
+};
@@ -0,0 +1,171 @@
+const { LRUCache } = require('lru-cache');
+
+const SAMPLE_SIZE = 256;          // durations kept per statement for p95
+const SLOW_LOG_SIZE = 50;         // recent slow statements kept for the admin endpoint
+const EXPLAIN_INTERVAL = 10 * 60 * 1000; // capture a plan at most once per statement per 10 min
+const EXPLAINABLE = /^\s*(SELECT|WITH|INSERT|UPDATE|DELETE|REPLACE)\b/i;
+
+/**
+ * Opt-in statement profiler for the dbAsync wrapper.
+ * Enable with SQLITE_PROFILE=true (or at runtime from the admin API).
+ */
+class QueryProfiler {
+    constructor() {
+        this.enabled = ['1', 'true'].includes(String(process.env.SQLITE_PROFILE || '').toLowerCase());
+        this.thresholdMs = parseInt(process.env.SQLITE_SLOW_QUERY_MS || '100', 10);
+        this.stats = new LRUCache({ max: 500 });
+        this.slow = [];
+        this.explainer = null;
+        this.since = new Date().toISOString();
+    }
+
+    configure({ enabled, thresholdMs } = {}) {
+        if (enabled !== undefined) this.enabled = !!enabled;
+        if (thresholdMs !== undefined && Number.isFinite(Number(thresholdMs))) {
+            this.thresholdMs = Math.max(0, Number(thresholdMs));
+        }
+    }
+
+    /**
+     * Function (sql, params) => Promise<rows> used to capture EXPLAIN QUERY PLAN.
+     * Must not go through the profiled wrapper.
+     */
+    setExplainer(fn) {
+        this.explainer = fn;
+    }
+
+    /**
+     * Collapse literals and whitespace so the same query with different values shares one entry
+     */
+    static normalize(sql) {
+        return String(sql)
+            .replace(/'(?:[^']|'')*'/g, '?')
+            .replace(/\b\d+(\.\d+)?\b/g, '?')
+            .replace(/\(\s*\?(\s*,\s*\?)+\s*\)/g, '(?+)')
+            .replace(/\s+/g, ' ')
+            .trim()
+            .slice(0, 500);
+    }
+
+    static paramShape(params) {
+        if (params === undefined || params === null) return [];
+        if (Array.isArray(params)) {
+            return params.map(p => (p === null ? 'null' : Buffer.isBuffer(p) ? 'blob' : typeof p));
+        }
+        if (typeof params === 'object') {
+            return Object.keys(params).map(k => `${k}:${params[k] === null ? 'null' : typeof params[k]}`);
+        }
+        return [typeof params];
+    }
+
+    /**
+     * Time a promise-returning database call
+     */
+    async track(sql, params, fn) {
+        if (!this.enabled) return fn();
+
+        const started = process.hrtime.bigint();
+        try {
+            return await fn();
+        } finally {
+            const ms = Number(process.hrtime.bigint() - started) / 1e6;
+            this.record(sql, params, ms);
+        }
+    }
+
+    record(sql, params, ms) {
+        const key = QueryProfiler.normalize(sql);
+        let entry = this.stats.get(key);
+        if (!entry) {
+            entry = { sql: key, calls: 0, totalMs: 0, maxMs: 0, samples: [], next: 0, lastExplainAt: 0, plan: null };
+            this.stats.set(key, entry);
+        }
+
+        entry.calls++;
+        entry.totalMs += ms;
+        if (ms > entry.maxMs) entry.maxMs = ms;
+        if (entry.samples.length < SAMPLE_SIZE) {
+            entry.samples.push(ms);
+        } else {
+            entry.samples[entry.next] = ms;
+            entry.next = (entry.next + 1) % SAMPLE_SIZE;
+        }
+
+        if (ms >= this.thresholdMs) {
+            this.onSlow(entry, sql, params, ms);
+        }
+    }
+
+    onSlow(entry, sql, params, ms) {
+        const slowEntry = {
+            sql: entry.sql,
+            ms: Math.round(ms * 100) / 100,
+            params: QueryProfiler.paramShape(params),
+            at: new Date().toISOString(),
+            plan: entry.plan
+        };
+        this.slow.push(slowEntry);
+        if (this.slow.length > SLOW_LOG_SIZE) this.slow.shift();
+
+        const now = Date.now();
+        const canExplain = this.explainer && EXPLAINABLE.test(sql) && now - entry.lastExplainAt > EXPLAIN_INTERVAL;
+        if (!canExplain) {
+            console.warn(`🐢 [DB] Slow query ${slowEntry.ms}ms ${JSON.stringify(slowEntry.params)}: ${entry.sql}`);
+            return;
+        }
+
+        entry.lastExplainAt = now;
+        this.explainer(sql, params)
+            .then(rows => {
+                entry.plan = (rows || []).map(r => r.detail);
+                slowEntry.plan = entry.plan;
+                console.warn(`🐢 [DB] Slow query ${slowEntry.ms}ms ${JSON.stringify(slowEntry.params)}: ${entry.sql}\n   plan: ${entry.plan.join(' | ')}`);
+            })
+            .catch(err => {
+                console.warn(`🐢 [DB] Slow query ${slowEntry.ms}ms: ${entry.sql} (plan unavailable: ${err.message})`);
+            });
+    }
+
+    static percentile(samples, p) {
+        if (!samples.length) return 0;
+        const sorted = [...samples].sort((a, b) => a - b);
+        const index = Math.min(sorted.length - 1, Math.ceil((p / 100) * sorted.length) - 1);
+        return sorted[Math.max(0, index)];
+    }
+
+    /**
+     * Snapshot for the admin endpoint, sorted by total time spent
+     */
+    getReport({ limit = 50 } = {}) {
+        const round = (n) => Math.round(n * 100) / 100;
+        const queries = [...this.stats.values()]
+            .map(e => ({
+                sql: e.sql,
+                calls: e.calls,
+                totalMs: round(e.totalMs),
+                avgMs: round(e.totalMs / e.calls),
+                p95Ms: round(QueryProfiler.percentile(e.samples, 95)),
+                maxMs: round(e.maxMs),
+                plan: e.plan
+            }))
+            .sort((a, b) => b.totalMs - a.totalMs)
+            .slice(0, limit);
+
+        return {
+            enabled: this.enabled,
+            thresholdMs: this.thresholdMs,
+            since: this.since,
+            queries,
+            slow: [...this.slow].reverse()
+        };
+    }
+
+    reset() {
+        this.stats.clear();
+        this.slow = [];
+        this.since = new Date().toISOString();
+    }
+}
+
+module.exports = new QueryProfiler();
+module.exports.QueryProfiler = QueryProfiler;
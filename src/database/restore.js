@@ -0,0 +1,99 @@
+const fs = require('fs');
+const zlib = require('zlib');
+const sqlite3 = require('sqlite3');
+const { pipeline } = require('stream/promises');
+const { runMigrations, getLatestVersion } = require('./migrator');
+
+const SQLITE_HEADER = Buffer.from('SQLite format 3\0');
+const GZIP_MAGIC = Buffer.from([0x1f, 0x8b]);
+
+const readHeader = async (filePath, length) => {
+    const handle = await fs.promises.open(filePath, 'r');
+    try {
+        const buffer = Buffer.alloc(length);
+        const { bytesRead } = await handle.read(buffer, 0, length, 0);
+        return buffer.subarray(0, bytesRead);
+    } finally {
+        await handle.close();
+    }
+};
+
+/**
+ * Copy an uploaded backup (.sqlite or .sqlite.gz) to destPath, decompressing on the fly
+ */
+async function stageBackup(uploadPath, destPath) {
+    const header = await readHeader(uploadPath, GZIP_MAGIC.length);
+    const stages = [fs.createReadStream(uploadPath)];
+    if (header.equals(GZIP_MAGIC)) stages.push(zlib.createGunzip());
+    stages.push(fs.createWriteStream(destPath));
+    await pipeline(...stages);
+}
+
+// Promise executor over a raw connection, in the shape the migrator expects
+const executorFor = (conn) => ({
+    get: (sql, params = []) => new Promise((resolve, reject) => {
+        conn.get(sql, params, (err, row) => (err ? reject(err) : resolve(row)));
+    }),
+    all: (sql, params = []) => new Promise((resolve, reject) => {
+        conn.all(sql, params, (err, rows) => (err ? reject(err) : resolve(rows)));
+    }),
+    run: (sql, params = []) => new Promise((resolve, reject) => {
+        conn.run(sql, params, function (err) {
+            if (err) reject(err);
+            else resolve({ id: this.lastID, changes: this.changes });
+        });
+    }),
+    exec: (sql) => new Promise((resolve, reject) => {
+        conn.exec(sql, (err) => (err ? reject(err) : resolve()));
+    })
+});
+
+/**
+ * Check a staged backup before it goes live: SQLite header, integrity_check,
+ * application tables and a schema version this code understands.
+ * Older backups are migrated in place, so the swapped-in file is ready to use.
+ */
+async function validateBackup(filePath, { latestVersion = getLatestVersion() } = {}) {
+    const header = await readHeader(filePath, SQLITE_HEADER.length);
+    if (!header.equals(SQLITE_HEADER)) {
+        throw new Error('Uploaded file is not a SQLite database');
+    }
+
+    const conn = await new Promise((resolve, reject) => {
+        const handle = new sqlite3.Database(filePath, (err) => (err ? reject(err) : resolve(handle)));
+    });
+    const db = executorFor(conn);
+
+    try {
+        const problems = await db.all('PRAGMA integrity_check');
+        if (problems.length !== 1 || problems[0].integrity_check !== 'ok') {
+            const details = problems.slice(0, 5).map(p => p.integrity_check).join('; ');
+            throw new Error(`Integrity check failed: ${details}`);
+        }
+
+        const users = await db.get("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'users'");
+        if (!users) {
+            throw new Error('Backup does not contain the application schema');
+        }
+
+        const versionTable = await db.get("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'");
+        const row = versionTable ? await db.get('SELECT MAX(version) AS version FROM schema_version') : null;
+        const schemaVersion = (row && row.version) || 0;
+        if (schemaVersion > latestVersion) {
+            throw new Error(`Backup schema version ${schemaVersion} is newer than this server (${latestVersion})`);
+        }
+
+        const migration = await runMigrations(db);
+        // Leave a single self-contained file behind (no -wal to carry across the swap)
+        await db.exec('PRAGMA journal_mode = DELETE');
+
+        return { schemaVersion, migratedTo: migration.to };
+    } finally {
+        await new Promise(resolve => conn.close(() => resolve()));
+    }
+}
+
+module.exports = {
+    stageBackup,
+    validateBackup
+};
@@ -0,0 +1,200 @@
+const { db } = require('./db');
+
+const FLUSH_INTERVAL = parseInt(process.env.WRITE_BUFFER_FLUSH_MS || '1000', 10);
+const MAX_ITEMS = parseInt(process.env.WRITE_BUFFER_MAX_ITEMS || '200', 10);
+const IDENTIFIER = /^[A-Za-z_][A-Za-z0-9_]*$/;
+
+const assertIdentifiers = (...names) => {
+    for (const name of names) {
+        if (!IDENTIFIER.test(name)) throw new Error(`writeBuffer: invalid identifier ${name}`);
+    }
+};
+
+// Same format as SQLite's CURRENT_TIMESTAMP (UTC), taken when the write is requested
+const sqliteNow = () => new Date().toISOString().replace('T', ' ').slice(0, 19);
+
+/**
+ * Coalesces small, idempotent writes (status flags, last_sent_at, audit rows)
+ * and commits them together in one transaction every FLUSH_INTERVAL ms or
+ * MAX_ITEMS entries, instead of one autocommit (and WAL fsync) per write.
+ * Updates to the same row are merged; the latest value of each column wins.
+ * When a batch fails, its writes are retried one by one, so a bad statement
+ * costs only itself.
+ */
+class WriteBuffer {
+    constructor({ flushInterval = FLUSH_INTERVAL, maxItems = MAX_ITEMS } = {}) {
+        this.flushInterval = flushInterval;
+        this.maxItems = maxItems;
+        this.updates = new Map();
+        this.inserts = [];
+        // Failed updates waiting for their one retry, written before newer values for the same row
+        this.retries = [];
+        this.timer = null;
+        this.flushing = Promise.resolve();
+        this.stats = { requested: 0, coalesced: 0, written: 0, flushes: 0, failures: 0, dropped: 0 };
+    }
+
+    get size() {
+        return this.updates.size + this.inserts.length + this.retries.length;
+    }
+
+    /**
+     * UPDATE table SET ...values WHERE keyColumn = keyValue (buffered)
+     */
+    update(table, keyColumn, keyValue, values) {
+        assertIdentifiers(table, keyColumn, ...Object.keys(values));
+        this.stats.requested++;
+
+        const key = `${table}\u0000${keyColumn}\u0000${keyValue}`;
+        const pending = this.updates.get(key);
+        if (pending) {
+            Object.assign(pending.values, values);
+            this.stats.coalesced++;
+        } else {
+            this.updates.set(key, { key, table, keyColumn, keyValue, values: { ...values } });
+        }
+        this.schedule();
+    }
+
+    /**
+     * Drop pending values for columns the caller is about to write directly,
+     * so an older buffered value cannot land on top of them
+     */
+    discard(table, keyColumn, keyValue, columns) {
+        const key = `${table}\u0000${keyColumn}\u0000${keyValue}`;
+        const pending = this.updates.get(key);
+        if (pending) {
+            for (const column of columns) delete pending.values[column];
+            if (Object.keys(pending.values).length === 0) this.updates.delete(key);
+        }
+        for (const retry of this.retries.filter(r => r.key === key)) {
+            for (const column of columns) delete retry.values[column];
+        }
+        this.retries = this.retries.filter(r => Object.keys(r.values).length > 0);
+    }
+
+    /**
+     * INSERT INTO table (row) (buffered, kept in order)
+     */
+    insert(table, row) {
+        assertIdentifiers(table, ...Object.keys(row));
+        this.stats.requested++;
+        this.inserts.push({ table, row });
+        this.schedule();
+    }
+
+    schedule() {
+        if (this.size >= this.maxItems) {
+            this.flush();
+            return;
+        }
+        if (!this.timer) {
+            this.timer = setTimeout(() => this.flush(), this.flushInterval);
+            if (this.timer.unref) this.timer.unref();
+        }
+    }
+
+    /**
+     * Write everything buffered so far; resolves once it is committed
+     */
+    flush() {
+        if (this.timer) {
+            clearTimeout(this.timer);
+            this.timer = null;
+        }
+        if (this.size === 0) return this.flushing;
+
+        // A retried column that has a newer value since would be overwritten anyway
+        const retries = this.retries
+            .map(retry => {
+                const newer = this.updates.get(retry.key);
+                if (!newer) return retry;
+                const values = { ...retry.values };
+                Object.keys(newer.values).forEach(c => delete values[c]);
+                return { ...retry, values };
+            })
+            .filter(retry => Object.keys(retry.values).length > 0);
+        const updates = [...retries, ...this.updates.values()];
+        const inserts = this.inserts;
+        this.updates = new Map();
+        this.inserts = [];
+        this.retries = [];
+
+        this.flushing = this.flushing.then(() => this.write(updates, inserts));
+        return this.flushing;
+    }
+
+    async write(updates, inserts) {
+        try {
+            await db.transaction(tx => this.apply(tx, updates, inserts));
+            this.stats.flushes++;
+            this.stats.written += updates.length + inserts.length;
+            return;
+        } catch (error) {
+            this.stats.failures++;
+            console.error(`❌ [WriteBuffer] Flush of ${updates.length + inserts.length} writes failed, retrying one by one:`, error.message);
+        }
+
+        // One failing statement must not roll back the rest of the batch
+        const failedUpdates = [];
+        const failedInserts = [];
+        for (const insert of inserts) {
+            if (!(await this.writeOne(tx => this.apply(tx, [], [insert]), insert.table))) failedInserts.push(insert);
+        }
+        for (const update of updates) {
+            if (!(await this.writeOne(tx => this.apply(tx, [update], []), update.table))) failedUpdates.push(update);
+        }
+        this.requeue(failedUpdates, failedInserts);
+    }
+
+    async writeOne(fn, table) {
+        try {
+            await db.transaction(fn);
+            this.stats.written++;
+            return true;
+        } catch (error) {
+            console.error(`❌ [WriteBuffer] Write to ${table} failed:`, error.message);
+            return false;
+        }
+    }
+
+    async apply(tx, updates, inserts) {
+        for (const { table, row } of inserts) {
+            const columns = Object.keys(row);
+            const statement = await tx.prepare(
+                `INSERT INTO ${table} (${columns.join(', ')}) VALUES (${columns.map(() => '?').join(', ')})`
+            );
+            await statement.run(columns.map(c => (row[c] === undefined ? null : row[c])));
+        }
+
+        for (const { table, keyColumn, keyValue, values } of updates) {
+            // Sorted columns keep the SQL text stable, so the statement cache is reused
+            const columns = Object.keys(values).sort();
+            const statement = await tx.prepare(
+                `UPDATE ${table} SET ${columns.map(c => `${c} = ?`).join(', ')} WHERE ${keyColumn} = ?`
+            );
+            await statement.run([...columns.map(c => values[c]), keyValue]);
+        }
+    }
+
+    /**
+     * Put failed writes back for the next flush, once. Only the write that failed
+     * is marked as retried: values buffered for the same row since then are kept
+     * apart and get their own attempts.
+     */
+    requeue(updates, inserts) {
+        const dropped = updates.filter(u => u.retried).length + inserts.filter(i => i.retried).length;
+        if (dropped > 0) {
+            this.stats.dropped += dropped;
+            console.error(`❌ [WriteBuffer] Dropped ${dropped} writes that failed twice`);
+        }
+
+        this.retries.push(...updates.filter(u => !u.retried).map(u => ({ ...u, retried: true })));
+        this.inserts = inserts.filter(i => !i.retried).map(i => ({ ...i, retried: true })).concat(this.inserts);
+        if (this.size > 0) this.schedule();
+    }
+}
+
+module.exports = new WriteBuffer();
+module.exports.WriteBuffer = WriteBuffer;
+module.exports.sqliteNow = sqliteNow;
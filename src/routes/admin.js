@@ -1,10 +1,20 @@
 const express = require('express');
 const router = express.Router();
-const { db } = require('../database/db');
+const { db, profiler } = require('../database/db');
 const bcrypt = require('bcrypt');
 const AuditService = require('../services/AuditService');
 const path = require('path');
 const fs = require('fs');
+const zlib = require('zlib');
+const { pipeline } = require('stream/promises');
+const { tempBackupPath } = require('../database/backup');
+const RestoreService = require('../services/RestoreService');
+const RetentionService = require('../services/RetentionService');
+const httpClient = require('../services/httpClient');
+const WarmPool = require('../services/WarmPool');
+const MediaCacheService = require('../services/MediaCacheService');
+const ContentDeckService = require('../services/ContentDeckService');
+const IslamicBackgroundService = require('../services/IslamicBackgroundService');
 const NotificationService = require('../services/NotificationService');
 const AuthService = require('../services/auth');
 const sessionManager = require('../services/baileys/SessionManager');
@@ -188,6 +198,7 @@ router.delete('/users/:id', requireAdmin, async (req, res) => {
             await db.run('DELETE FROM fasting_settings WHERE config_id = ?', [irConfig.id]);
             await db.run('DELETE FROM adhkar_settings WHERE config_id = ?', [irConfig.id]);
             await db.run('DELETE FROM scheduled_reminders WHERE config_id = ?', [irConfig.id]);
+            await ContentDeckService.deleteConfigDecks(irConfig.id);
             await db.run('DELETE FROM islamic_reminders_config WHERE id = ?', [irConfig.id]);
         }
 
@@ -843,24 +854,117 @@ router.get('/logs', requireAdmin, async (req, res) => {
     }
 });
 
-// Download// Backup Database
-router.get('/backup', requireAdmin, async (req, res) => {
+// Query profiler: per-statement timings, p95 and recent slow queries with their plans
+router.get('/db/profile', requireAdmin, async (req, res) => {
     try {
-        const dbPath = path.join(__dirname, '../database/app.db');
-        const backupPath = path.join(__dirname, '../database/backup-' + Date.now() + '.sqlite');
+        const limit = parseInt(req.query.limit) || 50;
+        res.json(profiler.getReport({ limit }));
+    } catch (error) {
+        res.status(500).json({ error: error.message });
+    }
+});
+
+router.post('/db/profile', requireAdmin, async (req, res) => {
+    try {
+        const { enabled, thresholdMs } = req.body || {};
+        profiler.configure({ enabled, thresholdMs });
+        console.log(`[AdminAPI] Query profiler ${profiler.enabled ? 'enabled' : 'disabled'} (threshold ${profiler.thresholdMs}ms)`);
+        res.json({ enabled: profiler.enabled, thresholdMs: profiler.thresholdMs });
+    } catch (error) {
+        res.status(500).json({ error: error.message });
+    }
+});
 
-        // Create a copy first
-        fs.copyFileSync(dbPath, backupPath);
+router.post('/db/profile/reset', requireAdmin, async (req, res) => {
+    try {
+        profiler.reset();
+        res.json({ success: true });
+    } catch (error) {
+        res.status(500).json({ error: error.message });
+    }
+});
 
-        res.download(backupPath, 'database_backup.sqlite', (err) => {
-            if (err) {
-                console.error('Download error:', err);
-            }
-            // Cleanup backup file after download
-            if (fs.existsSync(backupPath)) {
-                fs.unlinkSync(backupPath);
-            }
+// Outbound HTTP: per-host request counts, latency, bytes and queued requests
+router.get('/http/stats', requireAdmin, async (req, res) => {
+    try {
+        res.json(httpClient.getStats());
+    } catch (error) {
+        res.status(500).json({ error: error.message });
+    }
+});
+
+router.post('/http/stats/reset', requireAdmin, async (req, res) => {
+    try {
+        httpClient.resetStats();
+        res.json({ success: true });
+    } catch (error) {
+        res.status(500).json({ error: error.message });
+    }
+});
+
+// Warm candidate pools (external hadith, videos, Wikimedia images): sizes, misses, last refill
+router.get('/content/pools', requireAdmin, async (req, res) => {
+    try {
+        res.json(WarmPool.getStats());
+    } catch (error) {
+        res.status(500).json({ error: error.message });
+    }
+});
+
+// Background image catalog: last reachability probe and healthy images per theme
+router.get('/content/backgrounds', requireAdmin, async (req, res) => {
+    try {
+        res.json(IslamicBackgroundService.getStatus());
+    } catch (error) {
+        res.status(500).json({ error: error.message });
+    }
+});
+
+// On-disk media cache: files, bytes, hit/revalidation/eviction counters
+router.get('/media/cache', requireAdmin, async (req, res) => {
+    try {
+        res.json(await MediaCacheService.getStats());
+    } catch (error) {
+        res.status(500).json({ error: error.message });
+    }
+});
+
+// Retention policies and the last purge/compaction report
+router.get('/db/retention', requireAdmin, async (req, res) => {
+    try {
+        res.json({
+            running: RetentionService.running,
+            policies: RetentionService.getPolicies(),
+            lastReport: RetentionService.lastReport
         });
+    } catch (error) {
+        res.status(500).json({ error: error.message });
+    }
+});
+
+router.post('/db/retention/run', requireAdmin, async (req, res) => {
+    try {
+        const report = await RetentionService.run();
+        if (!report) {
+            return res.status(409).json({ error: 'Retention run already in progress' });
+        }
+        res.json(report);
+    } catch (error) {
+        res.status(500).json({ error: error.message });
+    }
+});
+
+// Backup Database: consistent online snapshot (SQLite backup API), streamed as gzip
+router.get('/backup', requireAdmin, async (req, res) => {
+    const backupPath = tempBackupPath();
+    try {
+        const result = await db.backup(backupPath);
+        console.log(`💾 [Backup] ${result.pages} pages (${(result.bytes / 1024 / 1024).toFixed(1)} MB) in ${result.ms}ms, ${result.steps} steps`);
+
+        const stamp = new Date().toISOString().slice(0, 19).replace(/[:T]/g, '-');
+        res.setHeader('Content-Type', 'application/gzip');
+        res.setHeader('Content-Disposition', `attachment; filename="database_backup-${stamp}.sqlite.gz"`);
+        await pipeline(fs.createReadStream(backupPath), zlib.createGzip(), res);
 
         // Log action (non-blocking)
         try {
@@ -868,10 +972,15 @@ router.get('/backup', requireAdmin, async (req, res) => {
         } catch (logErr) {
             console.error('Audit Log functionality failed:', logErr);
         }
-
     } catch (error) {
         console.error('Backup error:', error);
-        res.status(500).send('Error creating backup: ' + error.message);
+        if (!res.headersSent) {
+            res.status(500).send('Error creating backup: ' + error.message);
+        } else {
+            res.destroy(error);
+        }
+    } finally {
+        fs.promises.rm(backupPath, { force: true }).catch(() => { });
     }
 });
 
@@ -885,42 +994,12 @@ router.post('/restore', requireAdmin, upload.single('backup'), async (req, res)
             return res.status(400).json({ error: 'No file uploaded' });
         }
 
-        const dbPath = path.join(__dirname, '../database/app.db');
-        const backupPath = req.file.path;
-
-        console.log(`[RESTORE] Replacing ${dbPath} with ${backupPath}`);
-
-        // Close DB connection via db module (if exposed) or just force overwrite
-        // In SQLite with this setup, overwriting usually works if no active write is happening
-        // Ideally we should close the pool, but `db.js` structure is simple.
-
-        // Attempt to copy uploaded file over existing database
-        try {
-            // Backup current just in case (optional, but safe)
-            fs.copyFileSync(dbPath, dbPath + '.bak');
-
-            // Replace
-            fs.copyFileSync(backupPath, dbPath);
-
-            // Cleanup upload
-            fs.unlinkSync(backupPath);
-
-            // Log action
-            await AuditService.log(req.user.id, 'RESTORE', 'تم استعادة النظام من نسخة احتياطية');
+        console.log(`[RESTORE] Restoring database from ${req.file.originalname}`);
+        const result = await RestoreService.restoreFromFile(req.file.path);
 
-            res.json({ success: true, message: 'Database restored successfully' });
-
-            // Optional: Trigger process exit to restart connection
-            // setTimeout(() => process.exit(0), 1000); 
-        } catch (err) {
-            console.error('Replace DB file error:', err);
-            // Restore backup if exists
-            if (fs.existsSync(dbPath + '.bak')) {
-                fs.copyFileSync(dbPath + '.bak', dbPath);
-            }
-            throw err;
-        }
+        await AuditService.log(req.user.id, 'RESTORE', 'تم استعادة النظام من نسخة احتياطية');
 
+        res.json({ success: true, message: 'Database restored successfully', ...result });
     } catch (error) {
         console.error('Restore error:', error);
         res.status(500).json({ error: 'Failed to restore database: ' + error.message });
@@ -948,6 +1027,24 @@ router.get('/content', requireAdmin, async (req, res) => {
     }
 });
 
+// Search content (full text, ranked): ?q=&type=&category=&page=&limit=
+router.get('/content/search', requireAdmin, async (req, res) => {
+    try {
+        const ContentService = require('../services/ContentService');
+        const page = Math.max(parseInt(req.query.page, 10) || 1, 1);
+        const result = await ContentService.searchContent({
+            q: req.query.q,
+            type: req.query.type,
+            category: req.query.category,
+            limit: req.query.limit,
+            page
+        });
+        res.json({ ...result, page });
+    } catch (error) {
+        res.status(500).json({ error: error.message });
+    }
+});
+
 // Add content
 router.post('/content', requireAdmin, async (req, res) => {
     try {
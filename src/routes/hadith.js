@@ -37,6 +37,35 @@ router.get('/random', async (req, res) => {
     }
 });
 
+// Full-text search over cached hadith: ?q=&book=&page=&limit=
+router.get('/search', async (req, res) => {
+    try {
+        const ContentService = require('../services/ContentService');
+        const book = HadithService.books[req.query.book];
+        const page = Math.max(parseInt(req.query.page, 10) || 1, 1);
+        const result = await ContentService.searchContent({
+            q: req.query.q,
+            type: 'hadith_cached',
+            sourcePrefix: book ? book.name : null,
+            limit: req.query.limit,
+            page
+        });
+        res.json({
+            total: result.total,
+            page,
+            limit: result.limit,
+            results: result.items.map(hadith => ({
+                id: hadith.id,
+                text: hadith.content_ar,
+                source: hadith.source,
+                grade: hadith.fadl
+            }))
+        });
+    } catch (error) {
+        res.status(500).json({ error: error.message });
+    }
+});
+
 router.get('/background', async (req, res) => {
     try {
         const source = String(req.query.source || 'quran_pages');
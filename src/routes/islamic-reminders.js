@@ -5,7 +5,7 @@ const PrayerTimesService = require('../services/PrayerTimesService');
 const { db } = require('../database/db');
 const messageService = require('../services/baileys/MessageService');
 const sessionManager = require('../services/baileys/SessionManager');
-const RemoteMediaService = require('../services/RemoteMediaService');
+const ImageVariantService = require('../services/ImageVariantService');
 const SchedulerService = require('../services/SchedulerService');
 const multer = require('multer');
 const fs = require('fs');
@@ -140,7 +140,7 @@ router.get('/islamic-reminders', async (req, res) => {
         const prayerTimes = await PrayerTimesService.getPrayerTimes(config);
 
         // Calculate Next Prayer
-        const nextPrayer = await PrayerTimesService.getNextPrayer(config);
+        const nextPrayer = await PrayerTimesService.getNextPrayer(config, prayerTimes);
 
         res.render('dashboard/islamic-reminders', {
             user: req.user,
@@ -229,17 +229,16 @@ router.post('/test-notification', validateSessionConnected, async (req, res) =>
             try {
                 if (req.body.forceMediaUrl) {
                     const mediaType = req.body.forceMediaType || 'image';
-                    let mediaPayload = req.body.forceMediaUrl;
-                    if (mediaType === 'image' && typeof mediaPayload === 'string' && (mediaPayload.startsWith('http://') || mediaPayload.startsWith('https://'))) {
-                        const buffer = await RemoteMediaService.fetchImageBuffer(mediaPayload);
-                        if (buffer) mediaPayload = buffer;
+                    let media = { mediaUrl: req.body.forceMediaUrl };
+                    if (mediaType === 'image' && typeof media.mediaUrl === 'string' && (media.mediaUrl.startsWith('http://') || media.mediaUrl.startsWith('https://'))) {
+                        media = await ImageVariantService.getMedia(media.mediaUrl);
                     }
                     messageService.addToQueue(
                         config.session_id,
                         recipient.whatsapp_id,
                         message,
                         'media',
-                        { mediaUrl: mediaPayload, mediaType }
+                        { ...media, mediaType }
                     );
                 } else {
                     await messageService.sendMessage(config.session_id, recipient.whatsapp_id, message);
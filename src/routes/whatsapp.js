@@ -3,6 +3,7 @@ const router = express.Router();
 const sessionManager = require('../services/baileys/SessionManager');
 const messageService = require('../services/baileys/MessageService');
 const { db } = require('../database/db');
+const writeBuffer = require('../database/writeBuffer');
 const connectionStability = require('../middleware/connectionStability');
 const AuthService = require('../services/auth');
 
@@ -307,10 +308,14 @@ router.post('/connect', connectionStability, requireAuth, async (req, res) => {
                             } catch (e) { }
 
                             await sessionManager.disconnectSession(sessionId);
+                            writeBuffer.discard('whatsapp_sessions', 'session_id', sessionId, ['connected']);
                             await db.run('UPDATE whatsapp_sessions SET connected = 0 WHERE session_id = ?', [sessionId]);
                             return;
                         }
 
+                        // Written directly, not buffered: the duplicate-number check above reads
+                        // phone_number, so it must be committed before another account can link
+                        writeBuffer.discard('whatsapp_sessions', 'session_id', sessionId, ['connected', 'phone_number']);
                         await db.run('UPDATE whatsapp_sessions SET connected = 1, phone_number = ? WHERE session_id = ?', [normalizedConnectedPhone, sessionId]);
 
                         // --- ACCOUNT LINKING (User Request) ---
@@ -357,7 +362,7 @@ router.post('/connect', connectionStability, requireAuth, async (req, res) => {
                 onDisconnected: async (reason) => {
                     console.log(`Session ${sessionId} disconnected`);
                     try {
-                        await db.run('UPDATE whatsapp_sessions SET connected = 0 WHERE session_id = ?', [sessionId]);
+                        writeBuffer.update('whatsapp_sessions', 'session_id', sessionId, { connected: 0 });
                     } catch (dbError) {
                         console.error('DB update error:', dbError);
                     }
@@ -435,7 +440,7 @@ router.post('/:sessionId/disconnect', async (req, res) => {
         }
 
         await sessionManager.disconnectSession(sessionId);
-        await db.run('UPDATE whatsapp_sessions SET connected = 0 WHERE session_id = ?', [sessionId]);
+        writeBuffer.update('whatsapp_sessions', 'session_id', sessionId, { connected: 0 });
 
         res.json({ success: true });
     } catch (error) {
@@ -0,0 +1,75 @@
+const crypto = require('crypto');
+
+// Harakat, tanween, sukun, shadda, dagger alef and Quranic annotation marks (code-point ranges)
+const MARK_RANGES = [[0x0610, 0x061A], [0x064B, 0x065F], [0x0670, 0x0670], [0x06D6, 0x06ED]];
+const TATWEEL_CHAR = '\u0640';
+const hex = (code) => `\\u${code.toString(16).toUpperCase().padStart(4, '0')}`;
+const DIACRITICS = new RegExp(`[${MARK_RANGES.map(([from, to]) => `${hex(from)}-${hex(to)}`).join('')}]`, 'g');
+const TATWEEL = new RegExp(TATWEEL_CHAR, 'g');
+const NON_LETTERS = /[^\u0621-\u064A\u0660-\u0669a-zA-Z0-9\s]/g;
+
+// Same folding in SQL, for triggers that cannot call JS. Every mark normalize()
+// deletes must be deleted here too: the unicode61 tokenizer treats a leftover mark
+// as a separator and would split the word around it. Other leftovers (punctuation)
+// become separators, as normalize() turns them into spaces.
+const SQL_MARKS = [
+    ...MARK_RANGES.flatMap(([from, to]) => Array.from({ length: to - from + 1 }, (_, i) => String.fromCharCode(from + i))),
+    TATWEEL_CHAR
+].join('');
+const SQL_FOLDS = [['\u0623', '\u0627'], ['\u0625', '\u0627'], ['\u0622', '\u0627'], ['\u0671', '\u0627'], ['\u0649', '\u064A'], ['\u0629', '\u0647']];
+const MAX_QUERY_TERMS = 10;
+
+class ArabicTextService {
+    /**
+     * Normalized form used for matching and deduplication:
+     * no diacritics or tatweel, unified alef/ya/ta marbuta, letters and digits only
+     */
+    static normalize(text) {
+        if (!text) return '';
+        return String(text)
+            .replace(DIACRITICS, '')
+            .replace(TATWEEL, '')
+            .replace(/[آأإٱ]/g, 'ا')
+            .replace(/ى/g, 'ي')
+            .replace(/ة/g, 'ه')
+            .replace(NON_LETTERS, ' ')
+            .replace(/\s+/g, ' ')
+            .trim();
+    }
+
+    /**
+     * SQL expression applying the normalization to a column or expression.
+     * The marks are removed one per step of a recursive CTE: a replace() call per
+     * mark nested in one expression overflows the parser stack of SQLite < 3.46.
+     */
+    static sqlNormalize(expression) {
+        let sql = `(WITH RECURSIVE stripped(i, s) AS (
+            SELECT 0, ${expression}
+            UNION ALL
+            SELECT i + 1, replace(s, substr('${SQL_MARKS}', i + 1, 1), '') FROM stripped WHERE i < ${SQL_MARKS.length}
+        ) SELECT s FROM stripped WHERE i = ${SQL_MARKS.length})`;
+        for (const [from, to] of SQL_FOLDS) sql = `replace(${sql}, '${from}', '${to}')`;
+        return sql;
+    }
+
+    /**
+     * FTS5 MATCH expression for a user query: every normalized term must match,
+     * as a prefix. Returns null when nothing searchable is left.
+     */
+    static ftsQuery(text) {
+        const terms = this.normalize(text).split(' ').filter(Boolean).slice(0, MAX_QUERY_TERMS);
+        if (!terms.length) return null;
+        return terms.map(term => `"${term}"*`).join(' ');
+    }
+
+    /**
+     * Stable hash of the normalized text (null for empty text)
+     */
+    static hash(text) {
+        const normalized = this.normalize(text);
+        if (!normalized) return null;
+        return crypto.createHash('sha1').update(normalized).digest('hex');
+    }
+}
+
+module.exports = ArabicTextService;
@@ -1,4 +1,6 @@
 const { db } = require('../database/db');
+const writeBuffer = require('../database/writeBuffer');
+const { sqliteNow } = writeBuffer;
 
 class AuditService {
     /**
@@ -14,10 +16,15 @@ class AuditService {
             const ua = req ? req.headers['user-agent'] : null;
             const detailsStr = typeof details === 'object' ? JSON.stringify(details) : details;
 
-            await db.run(
-                'INSERT INTO activity_logs (user_id, action, details, ip_address, user_agent) VALUES (?, ?, ?, ?, ?)',
-                [userId, action, detailsStr, ip, ua]
-            );
+            // Buffered and committed in batches; created_at keeps the time of the action
+            writeBuffer.insert('activity_logs', {
+                user_id: userId,
+                action,
+                details: detailsStr,
+                ip_address: ip,
+                user_agent: ua,
+                created_at: sqliteNow()
+            });
             console.log(`[Audit] ${action} by User ${userId}`);
         } catch (error) {
             console.error('Failed to log activity:', error);
@@ -0,0 +1,116 @@
+const WINDOW_SIZE = parseInt(process.env.CIRCUIT_WINDOW_SIZE || '20', 10);
+const MIN_CALLS = parseInt(process.env.CIRCUIT_MIN_CALLS || '5', 10);
+const FAILURE_RATE = parseFloat(process.env.CIRCUIT_FAILURE_RATE || '0.5');
+const SLOW_CALL_MS = parseInt(process.env.CIRCUIT_SLOW_CALL_MS || '5000', 10);
+const COOLDOWN_MS = parseInt(process.env.CIRCUIT_COOLDOWN_MS || '60000', 10);
+
+/**
+ * Circuit breaker for one upstream, fed with the outcome and latency of every call.
+ *
+ * closed    - calls go through; the last WINDOW_SIZE outcomes are kept, and once
+ *             at least MIN_CALLS are in, a failure rate of FAILURE_RATE opens it
+ *             (calls slower than SLOW_CALL_MS count as failures)
+ * open      - calls are rejected immediately for COOLDOWN_MS
+ * half_open - a single trial call is let through; success closes, failure reopens
+ */
+class CircuitBreaker {
+    constructor(name, options = {}) {
+        this.name = name;
+        this.windowSize = options.windowSize || WINDOW_SIZE;
+        this.minCalls = options.minCalls || MIN_CALLS;
+        this.failureRate = options.failureRate || FAILURE_RATE;
+        this.slowCallMs = options.slowCallMs || SLOW_CALL_MS;
+        this.cooldownMs = options.cooldownMs || COOLDOWN_MS;
+
+        this.state = 'closed';
+        this.window = [];
+        this.openedAt = 0;
+        this.trialInFlight = false;
+        this.rejected = 0;
+        this.opens = 0;
+    }
+
+    /**
+     * Whether a call may go out now (moves open -> half_open once the cooldown is over)
+     */
+    canRequest(now = Date.now()) {
+        if (this.state === 'open' && now - this.openedAt >= this.cooldownMs) {
+            this.state = 'half_open';
+            this.trialInFlight = false;
+        }
+        if (this.state === 'closed') return true;
+        if (this.state === 'half_open' && !this.trialInFlight) {
+            this.trialInFlight = true;
+            return true;
+        }
+        this.rejected++;
+        return false;
+    }
+
+    record(ok, ms, now = Date.now()) {
+        const failed = !ok || ms > this.slowCallMs;
+
+        if (this.state === 'half_open') {
+            this.trialInFlight = false;
+            if (failed) this.open(now);
+            else this.close();
+            return;
+        }
+
+        this.window.push({ failed, ms });
+        if (this.window.length > this.windowSize) this.window.shift();
+
+        if (this.state === 'closed' && this.window.length >= this.minCalls && this.stats().failureRate >= this.failureRate) {
+            this.open(now);
+        }
+    }
+
+    onSuccess(ms, now) {
+        this.record(true, ms, now);
+    }
+
+    onFailure(ms, now) {
+        this.record(false, ms, now);
+    }
+
+    open(now = Date.now()) {
+        if (this.state !== 'open') {
+            this.opens++;
+            console.warn(`⚡ [CircuitBreaker] ${this.name} opened; failing fast for ${Math.round(this.cooldownMs / 1000)}s`);
+        }
+        this.state = 'open';
+        this.openedAt = now;
+    }
+
+    close() {
+        console.log(`✅ [CircuitBreaker] ${this.name} closed`);
+        this.state = 'closed';
+        this.window = [];
+    }
+
+    stats() {
+        const calls = this.window.length;
+        const failures = this.window.filter(c => c.failed).length;
+        const totalMs = this.window.reduce((sum, c) => sum + c.ms, 0);
+        return {
+            calls,
+            failureRate: calls ? failures / calls : 0,
+            avgMs: calls ? Math.round(totalMs / calls) : 0
+        };
+    }
+
+    getState(now = Date.now()) {
+        const { calls, failureRate, avgMs } = this.stats();
+        return {
+            state: this.state,
+            calls,
+            failureRate: Math.round(failureRate * 100) / 100,
+            avgMs,
+            opens: this.opens,
+            rejected: this.rejected,
+            retryInMs: this.state === 'open' ? Math.max(0, this.cooldownMs - (now - this.openedAt)) : 0
+        };
+    }
+}
+
+module.exports = CircuitBreaker;
@@ -0,0 +1,159 @@
+const { db } = require('../database/db');
+const { LRUCache } = require('lru-cache');
+const writeBuffer = require('../database/writeBuffer');
+const { sqliteNow } = writeBuffer;
+
+// Cache cost of a deck besides its rowids (key, object, typed array header)
+const DECK_OVERHEAD = 256;
+
+// Fisher-Yates into a new packed array
+const shuffle = (rowids) => {
+    const deck = Uint32Array.from(rowids);
+    for (let i = deck.length - 1; i > 0; i--) {
+        const j = Math.floor(Math.random() * (i + 1));
+        [deck[i], deck[j]] = [deck[j], deck[i]];
+    }
+    return deck;
+};
+
+// Stored form of a deck: 4-byte little-endian rowids
+const pack = (rowids) => {
+    const buffer = Buffer.alloc(rowids.length * 4);
+    rowids.forEach((rowid, i) => buffer.writeUInt32LE(rowid, i * 4));
+    return buffer;
+};
+
+const unpack = (buffer) => {
+    const rowids = new Uint32Array(buffer.length / 4);
+    for (let i = 0; i < rowids.length; i++) rowids[i] = buffer.readUInt32LE(i * 4);
+    return rowids;
+};
+
+/**
+ * Shuffled, no-repeat decks of content_library rowids, one per (config, pool).
+ * A deck is a stored permutation plus a cursor: drawing is O(1) and nothing
+ * repeats until the whole pool has been used, then the pool is reshuffled
+ * (picking up items added or removed since the last shuffle). The permutation
+ * is written once per pass; a draw only updates the small cursor row.
+ */
+class ContentDeckService {
+    // Bounded by size, not only count: a deck over a full imported edition holds thousands of rowids
+    static decks = new LRUCache({
+        max: parseInt(process.env.CONTENT_DECK_CACHE_SIZE || '5000', 10),
+        maxSize: parseInt(process.env.CONTENT_DECK_CACHE_BYTES || String(32 * 1024 * 1024), 10),
+        sizeCalculation: (deck) => DECK_OVERHEAD + deck.rowids.byteLength
+    });
+    static pending = new Map();
+
+    static deckKey(configId, pool) {
+        return `${configId}:${pool}`;
+    }
+
+    /**
+     * Load a deck from memory or the database, creating it on first use
+     * @param {Function} loadRowids - async () => array of rowids currently in the pool
+     */
+    static async getDeck(configId, pool, loadRowids) {
+        const key = this.deckKey(configId, pool);
+        const cached = this.decks.get(key);
+        if (cached) return cached;
+
+        // Concurrent callers share one load
+        if (this.pending.has(key)) return this.pending.get(key);
+        const loading = (async () => {
+            // A deck evicted right after a draw still has its cursor in the write buffer:
+            // read back stale, the next draws would repeat
+            await writeBuffer.flush();
+            const row = await db.get(
+                `SELECT d.rowids, c.cursor FROM content_decks d
+                 LEFT JOIN content_deck_cursors c ON c.deck_key = d.deck_key
+                 WHERE d.deck_key = ?`,
+                [key]
+            );
+            let deck;
+            if (row) {
+                deck = { key, rowids: unpack(row.rowids), cursor: row.cursor || 0, refill: null };
+            } else {
+                deck = { key, rowids: shuffle(await loadRowids()), cursor: 0, refill: null };
+                // Created before any buffered update for this key can exist
+                await db.transaction(async (tx) => {
+                    await tx.run(
+                        'INSERT OR REPLACE INTO content_decks (deck_key, config_id, pool, rowids) VALUES (?, ?, ?, ?)',
+                        [key, String(configId), pool, pack(deck.rowids)]
+                    );
+                    await tx.run('INSERT OR REPLACE INTO content_deck_cursors (deck_key, cursor) VALUES (?, 0)', [key]);
+                });
+            }
+            this.decks.set(key, deck);
+            return deck;
+        })();
+
+        this.pending.set(key, loading);
+        try {
+            return await loading;
+        } finally {
+            this.pending.delete(key);
+        }
+    }
+
+    static async reshuffle(deck, loadRowids) {
+        const last = deck.rowids[deck.cursor - 1];
+        const rowids = shuffle(await loadRowids());
+        // Never repeat across the boundary between two passes
+        if (rowids.length > 1 && rowids[0] === last) {
+            const j = 1 + Math.floor(Math.random() * (rowids.length - 1));
+            [rowids[0], rowids[j]] = [rowids[j], rowids[0]];
+        }
+        deck.rowids = rowids;
+        deck.cursor = 0;
+        // Set again so the cache accounts for the new size
+        this.decks.set(deck.key, deck);
+        const now = sqliteNow();
+        writeBuffer.update('content_decks', 'deck_key', deck.key, { rowids: pack(rowids), updated_at: now });
+        writeBuffer.update('content_deck_cursors', 'deck_key', deck.key, { cursor: 0, updated_at: now });
+    }
+
+    /**
+     * Next rowid from the config's deck for this pool, or null if the pool is empty
+     */
+    static async draw(configId, pool, loadRowids) {
+        const deck = await this.getDeck(configId, pool, loadRowids);
+
+        if (deck.cursor >= deck.rowids.length) {
+            // One reshuffle per exhausted deck, however many callers are waiting
+            if (!deck.refill) {
+                deck.refill = this.reshuffle(deck, loadRowids).finally(() => { deck.refill = null; });
+            }
+            await deck.refill;
+            if (deck.cursor >= deck.rowids.length) return null;
+        }
+
+        const rowid = deck.rowids[deck.cursor++];
+        writeBuffer.update('content_deck_cursors', 'deck_key', deck.key, { cursor: deck.cursor, updated_at: sqliteNow() });
+        return rowid;
+    }
+
+    /**
+     * Remove a config's decks (when the config is deleted)
+     */
+    static async deleteConfigDecks(configId) {
+        const prefix = `${configId}:`;
+        [...this.decks.keys()].filter(key => key.startsWith(prefix)).forEach(key => this.decks.delete(key));
+        await db.transaction(async (tx) => {
+            await tx.run(
+                'DELETE FROM content_deck_cursors WHERE deck_key IN (SELECT deck_key FROM content_decks WHERE config_id = ?)',
+                [String(configId)]
+            );
+            await tx.run('DELETE FROM content_decks WHERE config_id = ?', [String(configId)]);
+        });
+    }
+
+    /**
+     * Forget cached decks (e.g. after a database restore)
+     */
+    static clear() {
+        this.decks.clear();
+    }
+}
+
+module.exports = ContentDeckService;
@@ -0,0 +1,56 @@
+const ArabicTextService = require('./ArabicTextService');
+
+const HADITH_TYPES = ['hadith', 'hadith_cached'];
+// Prefix HadithService.stripSanad puts in front of the matn
+const MATN_PREFIX = 'قال رسول الله ﷺ:';
+const SNIPPET_LENGTH = 100;
+const LENGTH_CLASSES = [[200, 'short'], [600, 'medium']];
+
+/**
+ * Fields derived from an item's text, computed once when it is inserted,
+ * imported or edited and stored on content_library, so the send path only
+ * reads them.
+ */
+class ContentEnrichmentService {
+    static HADITH_TYPES = HADITH_TYPES;
+
+    static lengthClass(text) {
+        const length = String(text || '').length;
+        for (const [max, name] of LENGTH_CLASSES) {
+            if (length <= max) return name;
+        }
+        return 'long';
+    }
+
+    /**
+     * @param {{type: string, content_ar: string}} content
+     * @returns {{content_hash: string|null, matn: string|null, snippet: string|null, source_url: string|null, length_class: string}}
+     */
+    static derive({ type, content_ar }) {
+        const text = String(content_ar || '');
+        const fields = {
+            content_hash: null,
+            matn: null,
+            snippet: null,
+            source_url: null,
+            length_class: this.lengthClass(text)
+        };
+        if (!HADITH_TYPES.includes(type) || !text) return fields;
+
+        const prefixAt = text.indexOf(MATN_PREFIX);
+        const matn = (prefixAt === -1 ? text : text.slice(prefixAt + MATN_PREFIX.length))
+            .trim()
+            .replace(/^"(.*)"$/s, '$1');
+        const snippet = matn.substring(0, SNIPPET_LENGTH).replace(/[^\u0621-\u064A\s]/g, '').trim();
+
+        // Library-wide dedupe key (unique index) for auto-cached hadith only;
+        // manually added items may legitimately repeat
+        if (type === 'hadith_cached') fields.content_hash = ArabicTextService.hash(text);
+        fields.matn = matn;
+        fields.snippet = snippet;
+        fields.source_url = snippet ? `https://dorar.net/hadith/search?q=${encodeURIComponent(snippet)}` : null;
+        return fields;
+    }
+}
+
+module.exports = ContentEnrichmentService;
@@ -1,19 +1,49 @@
 const { db } = require('../database/db');
 const { v4: uuidv4 } = require('uuid');
+const writeBuffer = require('../database/writeBuffer');
+const { sqliteNow } = writeBuffer;
+const ArabicTextService = require('./ArabicTextService');
+const ContentEnrichmentService = require('./ContentEnrichmentService');
+
+// Auto-cached hadith are drawn through decks and can number in the tens of thousands
+const CATALOG_EXCLUDED_TYPES = ['hadith_cached'];
+// Safety net for writes made outside this process (maintenance scripts)
+const CATALOG_TTL_MS = parseInt(process.env.CONTENT_CATALOG_TTL_MS || '300000', 10);
+const SET_SEPARATOR = '\n\n--------------------------------\n\n';
+const SET_HEADERS = {
+    morning: '🌅 أذكار الصباح كاملة',
+    evening: '🌙 أذكار المساء كاملة',
+    after_prayer: '📿 أذكار بعد الصلاة'
+};
+const SHORT_SET_SIZE = 3;
+
+const withHeaderFooter = (category, body) => {
+    const header = `========================\n${SET_HEADERS[category] || ''}\n========================\n\n`;
+    const footer = `\n\n========================\n🤍 تم بحمد الله\n========================`;
+    return header + body + footer;
+};
 
 class ContentService {
+    // Process-wide snapshot of active library content, rebuilt after any change
+    static catalog = null;
+    static catalogVersion = 0;
+    static catalogLoading = null;
+
     /**
      * Add new content to library
      */
     static async addContent(data) {
         const id = uuidv4();
         const { type, category, content_ar, source, media_url } = data;
+        const derived = ContentEnrichmentService.derive({ type, content_ar });
 
         await db.run(
-            `INSERT INTO content_library (id, type, category, content_ar, source, media_url) 
-             VALUES (?, ?, ?, ?, ?, ?)`,
-            [id, type, category, content_ar, source, media_url]
+            `INSERT INTO content_library (id, type, category, content_ar, source, media_url, content_hash, matn, snippet, source_url, length_class) 
+             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`,
+            [id, type, category, content_ar, source, media_url,
+                derived.content_hash, derived.matn, derived.snippet, derived.source_url, derived.length_class]
         );
+        this.invalidateCatalog();
 
         return await this.getContentById(id);
     }
@@ -41,21 +71,136 @@ class ContentService {
     }
 
     /**
-     * Get random content item
+     * Active content of a type (and category), ordered by id. Served from the
+     * catalog snapshot; the returned array is shared and frozen.
      */
     static async getAllContent(type, category = null) {
-        let sql = 'SELECT * FROM content_library WHERE type = ? AND active = 1';
-        const params = [type];
+        const catalog = await this.getCatalog();
+        return catalog.groups.get(category ? `${type}|${category}` : `${type}|*`) || catalog.empty;
+    }
+
+    /**
+     * Mark the catalog stale; the next read rebuilds it
+     */
+    static invalidateCatalog() {
+        this.catalogVersion++;
+    }
+
+    static async getCatalog() {
+        const current = this.catalog;
+        if (current && current.version === this.catalogVersion && Date.now() - current.builtAt < CATALOG_TTL_MS) {
+            return current;
+        }
+        if (!this.catalogLoading) {
+            this.catalogLoading = this.buildCatalog()
+                .then((catalog) => {
+                    this.catalog = catalog;
+                    return catalog;
+                })
+                .finally(() => { this.catalogLoading = null; });
+        }
+        return this.catalogLoading;
+    }
+
+    /**
+     * Group active content by (type, category) and pre-join the adhkar set bodies
+     */
+    static async buildCatalog() {
+        const version = this.catalogVersion;
+        const rows = await db.all(
+            `SELECT * FROM content_library WHERE active = 1 AND type NOT IN (${CATALOG_EXCLUDED_TYPES.map(() => '?').join(', ')}) ORDER BY id ASC`,
+            CATALOG_EXCLUDED_TYPES
+        );
+
+        const groups = new Map();
+        const add = (key, row) => {
+            if (!groups.has(key)) groups.set(key, []);
+            groups.get(key).push(Object.freeze(row));
+        };
+        for (const row of rows) {
+            add(`${row.type}|*`, row);
+            if (row.category) add(`${row.type}|${row.category}`, row);
+        }
+
+        const sets = new Map();
+        for (const [key, items] of groups) {
+            Object.freeze(items);
+            const [type, category] = key.split('|');
+            if (type !== 'adhkar' || category === '*') continue;
+
+            const body = items.map(item => item.content_ar).join(SET_SEPARATOR);
+            sets.set(category, {
+                items,
+                plain: Object.freeze({ id: `full_set_${category}`, content_ar: body, source: 'تم تجميع الأذكار' }),
+                full: Object.freeze({ id: `full_set_${category}`, content_ar: withHeaderFooter(category, body), source: 'تم تجميع الأذكار' })
+            });
+        }
 
+        return { version, builtAt: Date.now(), groups, sets, empty: Object.freeze([]) };
+    }
+
+    /**
+     * Ready-to-send adhkar set for a category:
+     * 'full' -> whole set with header/footer, 'short' -> SHORT_SET_SIZE random items, otherwise the whole set
+     * @returns {Promise<{id: string, content_ar: string, source: string}|null>}
+     */
+    static async getAdhkarSet(category, textLength = null) {
+        const catalog = await this.getCatalog();
+        const set = catalog.sets.get(category);
+        if (!set) return null;
+
+        if (textLength === 'full') return set.full;
+        if (textLength !== 'short') return set.plain;
+
+        // Partial Fisher-Yates over indexes: picks without reordering the shared array
+        const indexes = set.items.map((_, i) => i);
+        const count = Math.min(SHORT_SET_SIZE, indexes.length);
+        for (let i = 0; i < count; i++) {
+            const j = i + Math.floor(Math.random() * (indexes.length - i));
+            [indexes[i], indexes[j]] = [indexes[j], indexes[i]];
+        }
+        return {
+            id: `short_set_${category}`,
+            content_ar: indexes.slice(0, count).map(i => set.items[i].content_ar).join(SET_SEPARATOR),
+            source: 'مقتطفات من الأذكار'
+        };
+    }
+
+    /**
+     * Full-text search (content_fts) ranked by bm25, with optional filters and pagination
+     * @param {object} options - { q, type, category, sourcePrefix, limit, offset | page }
+     * @returns {Promise<{items: object[], total: number, limit: number, offset: number}>}
+     */
+    static async searchContent({ q, type = null, category = null, sourcePrefix = null, limit = 20, offset = 0, page = null } = {}) {
+        limit = Math.min(Math.max(parseInt(limit, 10) || 20, 1), 100);
+        // page is applied after the limit is capped, so every row stays reachable
+        offset = page ? (Math.max(parseInt(page, 10) || 1, 1) - 1) * limit : Math.max(parseInt(offset, 10) || 0, 0);
+
+        const match = ArabicTextService.ftsQuery(q);
+        if (!match) return { items: [], total: 0, limit, offset };
+
+        let where = 'content_fts MATCH ?';
+        const params = [match];
+        if (type) {
+            where += ' AND c.type = ?';
+            params.push(type);
+        }
         if (category) {
-            sql += ' AND category = ?';
+            where += ' AND c.category = ?';
             params.push(category);
         }
+        if (sourcePrefix) {
+            where += ' AND c.source LIKE ?';
+            params.push(`${sourcePrefix}%`);
+        }
 
-        // Order by ID or a sequence column if available
-        sql += ' ORDER BY id ASC';
+        const from = 'FROM content_fts JOIN content_library c ON c.rowid = content_fts.rowid';
+        const [items, count] = await Promise.all([
+            db.all(`SELECT c.* ${from} WHERE ${where} ORDER BY bm25(content_fts) LIMIT ? OFFSET ?`, [...params, limit, offset]),
+            db.get(`SELECT COUNT(*) as total ${from} WHERE ${where}`, params)
+        ]);
 
-        return await db.all(sql, params);
+        return { items, total: count ? count.total : 0, limit, offset };
     }
 
     static async getRandomContent(type, category = null) {
@@ -82,12 +227,10 @@ class ContentService {
 
     /**
      * Mark content as sent (update last_sent_at)
+     * Buffered: sends fan out in bursts, so these are committed together
      */
     static async markContentAsSent(contentId) {
-        await db.run(
-            'UPDATE content_library SET last_sent_at = CURRENT_TIMESTAMP WHERE id = ?',
-            [contentId]
-        );
+        writeBuffer.update('content_library', 'id', contentId, { last_sent_at: sqliteNow() });
     }
 
     /**
@@ -106,8 +249,24 @@ class ContentService {
 
         if (fields.length === 0) return;
 
+        // Text or type changed: recompute the stored derived fields
+        if (data.content_ar !== undefined || data.type !== undefined) {
+            const current = await this.getContentById(id);
+            if (current) {
+                const derived = ContentEnrichmentService.derive({
+                    type: data.type !== undefined ? data.type : current.type,
+                    content_ar: data.content_ar !== undefined ? data.content_ar : current.content_ar
+                });
+                for (const [column, value] of Object.entries(derived)) {
+                    fields.push(`${column} = ?`);
+                    params.push(value);
+                }
+            }
+        }
+
         params.push(id);
         await db.run(`UPDATE content_library SET ${fields.join(', ')} WHERE id = ?`, params);
+        this.invalidateCatalog();
 
         return await this.getContentById(id);
     }
@@ -117,6 +276,7 @@ class ContentService {
      */
     static async deleteContent(id) {
         await db.run('DELETE FROM content_library WHERE id = ?', [id]);
+        this.invalidateCatalog();
     }
 
     /**
@@ -154,9 +314,16 @@ class ContentService {
             { type: 'hadith', category: 'general', content_ar: 'قال رسول الله ﷺ: "إنما الأعمال بالنيات، وإنما لكل امرئ ما نوى".', source: 'البخاري' }
         ];
 
-        for (const item of initialContent) {
-            await this.addContent(item);
-        }
+        await db.insertMany('content_library', initialContent.map(item => ({
+            id: uuidv4(),
+            type: item.type,
+            category: item.category,
+            content_ar: item.content_ar,
+            source: item.source,
+            media_url: item.media_url || null,
+            ...ContentEnrichmentService.derive(item)
+        })));
+        this.invalidateCatalog();
 
         console.log(`✅ Seeded ${initialContent.length} content items.`);
     }
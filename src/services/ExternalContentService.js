@@ -1,21 +1,71 @@
-const axios = require('axios');
+const httpClient = require('./httpClient');
 const IslamicVideoService = require('./IslamicVideoService');
+const HadithService = require('./HadithService');
+const WarmPool = require('./WarmPool');
+
+const HADITH_POOL_SIZE = parseInt(process.env.EXTERNAL_HADITH_POOL_SIZE || '20', 10);
+// The API returns one hadith per call
+const HADITH_FETCH_BATCH = 5;
 
 class ExternalContentService {
 
+    static async fetchRandomHadith() {
+        // Using random-hadith-generator (Bukhari)
+        const response = await httpClient.get('https://random-hadith-generator.vercel.app/bukhari/');
+        if (response.data && response.data.data) {
+            const text = response.data.data.hadith_arabic || response.data.data.hadith_urdu;
+            return text ? { text_ar: text, source: 'صحيح البخاري' } : null;
+        }
+        return null;
+    }
+
+    /**
+     * A few hadiths for the warm pool; stops at the first failed call
+     */
+    static async fetchHadithBatch(wanted) {
+        const hadiths = [];
+        for (let i = 0; i < Math.min(wanted, HADITH_FETCH_BATCH); i++) {
+            try {
+                const hadith = await this.fetchRandomHadith();
+                if (hadith) hadiths.push(hadith);
+            } catch (error) {
+                console.error('Error fetching external hadith:', error.message);
+                break;
+            }
+        }
+        return hadiths;
+    }
+
+    static hadithPool = new WarmPool('hadith:external', {
+        fill: (wanted) => ExternalContentService.fetchHadithBatch(wanted),
+        keyOf: hadith => hadith.text_ar,
+        capacity: HADITH_POOL_SIZE,
+        lowWater: HADITH_FETCH_BATCH
+    });
+
+    /**
+     * Fill the hadith and video pools ahead of the first send
+     */
+    static warm() {
+        return Promise.all([this.hadithPool.refill(), IslamicVideoService.warm()]);
+    }
+
+    /**
+     * Never waits on the API: takes from the warm pool, or the local library while it is empty
+     */
     static async getRandomHadith() {
+        return this.hadithPool.take() || this.getCachedHadith();
+    }
+
+    /**
+     * Hadith from the local library, used when the random-hadith API is down
+     */
+    static async getCachedHadith() {
         try {
-            // Using random-hadith-generator (Bukhari)
-            const response = await axios.get('https://random-hadith-generator.vercel.app/bukhari/');
-            if (response.data && response.data.data) {
-                return {
-                    text_ar: response.data.data.hadith_arabic || response.data.data.hadith_urdu,
-                    source: 'صحيح البخاري'
-                };
-            }
-            return null;
+            const row = await HadithService.getRandomHadith('bukhari');
+            return row ? { text_ar: row.content_ar, source: row.source } : null;
         } catch (error) {
-            console.error('Error fetching external hadith:', error.message);
+            console.error('Error loading cached hadith:', error.message);
             return null;
         }
     }
@@ -0,0 +1,202 @@
+const fs = require('fs');
+const path = require('path');
+const zlib = require('zlib');
+const { PassThrough } = require('stream');
+const httpClient = require('./httpClient');
+const { v4: uuidv4 } = require('uuid');
+const { db } = require('../database/db');
+const ContentEnrichmentService = require('./ContentEnrichmentService');
+const HadithService = require('./HadithService');
+
+const BATCH_SIZE = parseInt(process.env.HADITH_IMPORT_BATCH_SIZE || '1000', 10);
+const EDITIONS_DIR = process.env.HADITH_EDITIONS_DIR || path.join(__dirname, '../../data/hadith');
+
+/**
+ * Yield the elements of the top-level array `key` of a JSON document, one at a
+ * time, without holding the whole file (edition files are several MB) in memory.
+ */
+async function* streamArrayItems(readable, key) {
+    let depth = 0;
+    let inString = false;
+    let escaped = false;
+    let text = '';
+    let lastKey = null;
+    let arrayDepth = -1;
+    let item = null;
+
+    // Decode as a stream so multi-byte characters split across chunks survive
+    if (typeof readable.setEncoding === 'function') readable.setEncoding('utf8');
+
+    for await (const data of readable) {
+        let start = item !== null ? 0 : -1;
+
+        for (let i = 0; i < data.length; i++) {
+            const ch = data[i];
+
+            if (inString) {
+                if (escaped) escaped = false;
+                else if (ch === '\\') escaped = true;
+                else if (ch === '"') {
+                    inString = false;
+                    if (depth === 1) lastKey = text;
+                }
+                else if (depth === 1) text += ch;
+                continue;
+            }
+
+            if (ch === '"') {
+                inString = true;
+                text = '';
+            } else if (ch === '{' || ch === '[') {
+                if (depth === 1 && ch === '[' && lastKey === key) arrayDepth = depth + 1;
+                else if (depth === arrayDepth && ch === '{') {
+                    item = '';
+                    start = i;
+                }
+                depth++;
+            } else if (ch === '}' || ch === ']') {
+                depth--;
+                if (depth === arrayDepth && item !== null) {
+                    yield JSON.parse(item + data.slice(start, i + 1));
+                    item = null;
+                    start = -1;
+                } else if (depth === arrayDepth - 1) {
+                    arrayDepth = -1;
+                }
+            }
+        }
+
+        // Carry the unfinished element over to the next chunk
+        if (item !== null) item += data.slice(start);
+    }
+}
+
+class HadithImportService {
+    static BATCH_SIZE = BATCH_SIZE;
+    static EDITIONS_DIR = EDITIONS_DIR;
+
+    static editionFile(bookKey, dir = EDITIONS_DIR) {
+        const book = HadithService.books[bookKey];
+        const candidates = [`${book.id}.json`, `${book.id}.min.json`, `${book.id}.json.gz`];
+        for (const name of candidates) {
+            const file = path.join(dir, name);
+            if (fs.existsSync(file)) return file;
+        }
+        return null;
+    }
+
+    /**
+     * Readable stream for a book: local edition file if present, otherwise one download
+     * (saved into dir when save is set, so later imports stay offline)
+     */
+    static async openEdition(bookKey, { dir = EDITIONS_DIR, save = false } = {}) {
+        const book = HadithService.books[bookKey];
+        const file = this.editionFile(bookKey, dir);
+        if (file) {
+            const stream = fs.createReadStream(file);
+            return file.endsWith('.gz') ? stream.pipe(zlib.createGunzip()) : stream;
+        }
+
+        console.log(`⬇️ [HadithImport] Downloading full edition ${book.id}...`);
+        const response = await httpClient.get(`${book.baseUrl}.json`, { responseType: 'stream' });
+        if (!save) return response.data;
+
+        await fs.promises.mkdir(dir, { recursive: true });
+        const parsed = new PassThrough();
+        response.data.pipe(fs.createWriteStream(path.join(dir, `${book.id}.json`)));
+        response.data.pipe(parsed);
+        return parsed;
+    }
+
+    static toRow(book, hadith) {
+        if (!hadith || !hadith.text || hadith.text.length < 10) return null;
+        const content = { type: 'hadith_cached', content_ar: HadithService.cleanText(hadith.text) };
+        const derived = ContentEnrichmentService.derive(content);
+        if (!derived.content_hash) return null;
+
+        return {
+            id: uuidv4(),
+            type: content.type,
+            category: 'hadith',
+            content_ar: content.content_ar,
+            source: `${book.name} - ${hadith.hadithnumber}`,
+            fadl: hadith.grades ? (hadith.grades[0]?.grade || 'صحيح') : 'صحيح',
+            ...derived
+        };
+    }
+
+    /**
+     * Import one complete edition: stream-parse, clean, dedupe by normalized hash,
+     * and insert in BATCH_SIZE-row transactions (INSERT OR IGNORE on content_hash)
+     * @returns {Promise<{book: string, parsed: number, inserted: number, duplicates: number, ms: number}>}
+     */
+    static async importEdition(bookKey, { dir = EDITIONS_DIR, save = false, batchSize = BATCH_SIZE, onProgress = null } = {}) {
+        const book = HadithService.books[bookKey];
+        if (!book) throw new Error(`Unknown hadith book: ${bookKey}`);
+
+        const started = Date.now();
+        const stats = { book: bookKey, parsed: 0, inserted: 0, duplicates: 0, skipped: 0 };
+        const seen = new Set();
+        let batch = [];
+
+        const report = onProgress || ((s) => console.log(`📥 [HadithImport] ${book.name}: ${s.parsed} parsed, ${s.inserted} new, ${s.duplicates} duplicates`));
+        const flush = async () => {
+            if (!batch.length) return;
+            const inserted = await db.insertMany('content_library', batch, { conflict: 'IGNORE' });
+            stats.inserted += inserted;
+            // Already in the library from an earlier import or refill
+            stats.duplicates += batch.length - inserted;
+            batch = [];
+            report({ ...stats });
+        };
+
+        const stream = await this.openEdition(bookKey, { dir, save });
+        for await (const hadith of streamArrayItems(stream, 'hadiths')) {
+            stats.parsed++;
+            const row = this.toRow(book, hadith);
+            if (!row) {
+                stats.skipped++;
+                continue;
+            }
+            if (seen.has(row.content_hash)) {
+                stats.duplicates++;
+                continue;
+            }
+            seen.add(row.content_hash);
+            batch.push(row);
+            if (batch.length >= batchSize) await flush();
+        }
+        await flush();
+
+        stats.ms = Date.now() - started;
+        console.log(`✅ [HadithImport] ${book.name}: ${stats.inserted} hadiths imported in ${stats.ms}ms`);
+        return stats;
+    }
+
+    /**
+     * Import several books in turn; a failing book does not stop the others
+     */
+    static async importAll(bookKeys = Object.keys(HadithService.books), options = {}) {
+        const results = [];
+        for (const bookKey of bookKeys) {
+            try {
+                results.push(await this.importEdition(bookKey, options));
+            } catch (error) {
+                console.error(`❌ [HadithImport] ${bookKey} failed:`, error.message);
+                results.push({ book: bookKey, error: error.message });
+            }
+        }
+        return results;
+    }
+
+    /**
+     * Books whose edition file is available locally
+     */
+    static localBooks(dir = EDITIONS_DIR) {
+        if (!fs.existsSync(dir)) return [];
+        return Object.keys(HadithService.books).filter(key => this.editionFile(key, dir));
+    }
+}
+
+module.exports = HadithImportService;
+module.exports.streamArrayItems = streamArrayItems;
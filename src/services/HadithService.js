@@ -1,6 +1,21 @@
-const axios = require('axios');
+const httpClient = require('./httpClient');
 const { db } = require('../database/db'); // Access the main DB wrapper
 const { v4: uuidv4 } = require('uuid');
+const ContentDeckService = require('./ContentDeckService');
+const ContentEnrichmentService = require('./ContentEnrichmentService');
+
+// Common start markers for the actual Hadith text (Matn)
+const SANAD_MARKERS = [
+    'أن رسول الله صلى الله عليه وسلم قال',
+    'أن النبي صلى الله عليه وسلم قال',
+    'يقول سمعت النبي صلى الله عليه وسلم يقول',
+    'قال قال رسول الله صلى الله عليه وسلم',
+    'عن النبي صلى الله عليه وسلم قال',
+    'صلى الله عليه وسلم قال',
+    'أن رسول الله قال',
+    'سمعت النبي صلى الله عليه وسلم يقول'
+];
+const SANAD_MARKER_PATTERN = new RegExp([...SANAD_MARKERS].sort((a, b) => b.length - a.length).join('|'));
 
 class HadithService {
     constructor() {
@@ -16,6 +31,32 @@ class HadithService {
                 baseUrl: 'https://cdn.jsdelivr.net/gh/fawazahmed0/hadith-api@1/editions/ara-muslim',
                 name: 'صحيح مسلم',
                 sections: 56
+            },
+            // Imported as complete editions only (see HadithImportService)
+            abudawud: {
+                id: 'ara-abudawud',
+                baseUrl: 'https://cdn.jsdelivr.net/gh/fawazahmed0/hadith-api@1/editions/ara-abudawud',
+                name: 'سنن أبي داود'
+            },
+            tirmidhi: {
+                id: 'ara-tirmidhi',
+                baseUrl: 'https://cdn.jsdelivr.net/gh/fawazahmed0/hadith-api@1/editions/ara-tirmidhi',
+                name: 'جامع الترمذي'
+            },
+            nasai: {
+                id: 'ara-nasai',
+                baseUrl: 'https://cdn.jsdelivr.net/gh/fawazahmed0/hadith-api@1/editions/ara-nasai',
+                name: 'سنن النسائي'
+            },
+            ibnmajah: {
+                id: 'ara-ibnmajah',
+                baseUrl: 'https://cdn.jsdelivr.net/gh/fawazahmed0/hadith-api@1/editions/ara-ibnmajah',
+                name: 'سنن ابن ماجه'
+            },
+            malik: {
+                id: 'ara-malik',
+                baseUrl: 'https://cdn.jsdelivr.net/gh/fawazahmed0/hadith-api@1/editions/ara-malik',
+                name: 'موطأ مالك'
             }
         };
         this.isFetching = false;
@@ -44,11 +85,17 @@ class HadithService {
             const count = await this.getCachedCount();
             console.log(`📊 [HadithService] Cached hadiths: ${count}`);
 
-            // If less than 50, fetch a new batch
+            // If less than 50, fill the pool: complete local editions first, CDN sections as a fallback
             if (count < 50) {
                 this.isFetching = true;
-                await this.fetchBatch('bukhari');
-                await this.fetchBatch('muslim');
+                const HadithImportService = require('./HadithImportService');
+                const localBooks = HadithImportService.localBooks();
+                if (localBooks.length) {
+                    await HadithImportService.importAll(localBooks);
+                } else {
+                    await this.fetchBatch('bukhari');
+                    await this.fetchBatch('muslim');
+                }
                 this.isFetching = false;
             }
         } catch (error) {
@@ -74,32 +121,27 @@ class HadithService {
         console.log(`⬇️ [HadithService] Fetching ${book.name} (Section ${sectionId})...`);
 
         try {
-            const response = await axios.get(url);
+            const response = await httpClient.get(url);
             const hadiths = response.data.hadiths;
 
             if (!hadiths || !Array.isArray(hadiths)) return;
 
-            // Save to DB
-            let savedCount = 0;
             // Take random 10 from this section to avoid flooding
             const selected = hadiths.sort(() => 0.5 - Math.random()).slice(0, 10);
 
-            for (const item of selected) {
-                if (!item.text || item.text.length < 10) continue; // Skip empty/short
-
-                const content = {
+            const rows = selected
+                .filter(item => item.text && item.text.length >= 10) // Skip empty/short
+                .map(item => ({
                     id: uuidv4(),
                     type: 'hadith_cached', // Special type for auto-cached content
                     category: 'hadith',
                     content_ar: this.cleanText(item.text),
                     source: `${book.name} - ${item.hadithnumber}`,
                     fadl: item.grades ? (item.grades[0]?.grade || 'صحيح') : 'صحيح'
-                };
+                }));
 
-                // Insert into DB (ignore errors if duplicates logic was strict, but UUID prevents that)
-                await this.saveToDb(content);
-                savedCount++;
-            }
+            // Save to DB in a single transaction
+            const savedCount = await this.saveManyToDb(rows);
 
             console.log(`💾 [HadithService] Saved ${savedCount} hadiths from ${book.name}.`);
 
@@ -111,31 +153,12 @@ class HadithService {
     stripSanad(text) {
         if (!text) return '';
 
-        // Define common start markers for the actual Hadith text (Matn)
-        const markers = [
-            'أن رسول الله صلى الله عليه وسلم قال',
-            'أن النبي صلى الله عليه وسلم قال',
-            'يقول سمعت النبي صلى الله عليه وسلم يقول',
-            'قال قال رسول الله صلى الله عليه وسلم',
-            'عن النبي صلى الله عليه وسلم قال',
-            'صلى الله عليه وسلم قال',
-            'أن رسول الله قال',
-            'سمعت النبي صلى الله عليه وسلم يقول'
-        ];
-
         let cleanText = text;
 
-        // Try to find the first occurrence of any marker
-        let firstIndex = -1;
-        let chosenMarker = '';
-
-        for (const marker of markers) {
-            const index = text.indexOf(marker);
-            if (index !== -1 && (firstIndex === -1 || index < firstIndex)) {
-                firstIndex = index;
-                chosenMarker = marker;
-            }
-        }
+        // Single scan for the earliest marker (longest wins at the same position)
+        const found = SANAD_MARKER_PATTERN.exec(text);
+        const firstIndex = found ? found.index : -1;
+        const chosenMarker = found ? found[0] : '';
 
         if (firstIndex !== -1) {
             // Take everything after the marker
@@ -166,31 +189,54 @@ class HadithService {
     }
 
     async saveToDb(content) {
+        return this.saveManyToDb([content]);
+    }
+
+    async saveManyToDb(rows) {
         try {
-            await db.run(
-                `INSERT INTO content_library (id, type, category, content_ar, source, fadl) 
-                 VALUES (?, ?, ?, ?, ?, ?)`,
-                [content.id, content.type, content.category, content.content_ar, content.source, content.fadl]
-            );
+            return await db.insertMany('content_library', rows.map(content => ({
+                id: content.id,
+                type: content.type,
+                category: content.category,
+                content_ar: content.content_ar,
+                source: content.source,
+                fadl: content.fadl,
+                ...ContentEnrichmentService.derive(content)
+            })), { conflict: 'IGNORE' });
         } catch (err) {
-            // Ignore duplicates or other errors to continue loop
+            console.error('❌ [HadithService] Failed to save hadiths:', err.message);
+            return 0;
         }
     }
 
     /**
-     * Get a random Hadith from the DB cache
+     * content_library rowids of the cached hadiths in a pool (one book, or all of them)
      */
-    async getRandomHadith(book = null) {
-        if (book === 'bukhari') {
-            const row = await db.get("SELECT * FROM content_library WHERE type = 'hadith_cached' AND source LIKE 'صحيح البخاري%' ORDER BY RANDOM() LIMIT 1");
-            return row || null;
-        }
-        if (book === 'muslim') {
-            const row = await db.get("SELECT * FROM content_library WHERE type = 'hadith_cached' AND source LIKE 'صحيح مسلم%' ORDER BY RANDOM() LIMIT 1");
-            return row || null;
+    async getHadithRowids(book = null) {
+        const name = this.books[book]?.name;
+        const rows = name
+            ? await db.all("SELECT rowid FROM content_library WHERE type = 'hadith_cached' AND source LIKE ?", [`${name}%`])
+            : await db.all("SELECT rowid FROM content_library WHERE type = 'hadith_cached'");
+        return rows.map(r => r.rowid);
+    }
+
+    /**
+     * Next Hadith from a shuffled deck: no repeats until the whole pool has been sent
+     * @param {string|null} book - 'bukhari', 'muslim' or null for both
+     * @param {string|null} configId - Deck owner; callers without a config share one deck
+     */
+    async getRandomHadith(book = null, configId = null) {
+        const pool = `hadith:${this.books[book] ? book : 'all'}`;
+        const loadRowids = () => this.getHadithRowids(this.books[book] ? book : null);
+
+        // A drawn item may have been deleted since the deck was shuffled; move on to the next one
+        for (let i = 0; i < 5; i++) {
+            const rowid = await ContentDeckService.draw(configId || '*', pool, loadRowids);
+            if (!rowid) return null;
+            const row = await db.get('SELECT * FROM content_library WHERE rowid = ?', [rowid]);
+            if (row) return row;
         }
-        const row = await db.get("SELECT * FROM content_library WHERE type = 'hadith_cached' ORDER BY RANDOM() LIMIT 1");
-        return row || null;
+        return null;
     }
 
     /**
@@ -0,0 +1,122 @@
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+const MONTHS_AR = [
+    'محرم', 'صفر', 'ربيع الأول', 'ربيع الآخر', 'جمادى الأولى', 'جمادى الآخرة',
+    'رجب', 'شعبان', 'رمضان', 'شوال', 'ذو القعدة', 'ذو الحجة'
+];
+
+const toArabicDigits = (value) => String(value).replace(/\d/g, d => '٠١٢٣٤٥٦٧٨٩'[d]);
+
+/**
+ * Gregorian -> Hijri lookup table, built once per Gregorian year with a single
+ * Intl formatter and then read in O(1). hijri_adjustment (days) is applied as
+ * an offset into the table, so every config gets its own correction for free.
+ */
+class HijriCalendarService {
+    // Gregorian year -> Int32Array of packed hijri dates (year * 10000 + month * 100 + day)
+    static years = new Map();
+    static formatter = null;
+    // `${epochDay}|${adjustment}` -> fasting flags
+    static fastingFlags = new Map();
+
+    /**
+     * Days since epoch for a YYYY-MM-DD string or a Date (its local calendar day)
+     */
+    static toEpochDay(date) {
+        if (typeof date === 'string') {
+            const [y, m, d] = date.split('-').map(Number);
+            return Math.floor(Date.UTC(y, m - 1, d) / DAY_MS);
+        }
+        return Math.floor(Date.UTC(date.getFullYear(), date.getMonth(), date.getDate()) / DAY_MS);
+    }
+
+    static buildYear(year) {
+        if (!this.formatter) {
+            this.formatter = new Intl.DateTimeFormat('en-u-ca-islamic', {
+                day: 'numeric', month: 'numeric', year: 'numeric', timeZone: 'UTC'
+            });
+        }
+
+        const first = Date.UTC(year, 0, 1);
+        const length = Math.round((Date.UTC(year + 1, 0, 1) - first) / DAY_MS);
+        const table = new Int32Array(length);
+
+        for (let i = 0; i < length; i++) {
+            // Noon UTC keeps the calendar day stable whatever the host timezone
+            const parts = this.formatter.formatToParts(new Date(first + i * DAY_MS + DAY_MS / 2));
+            const value = (type) => parseInt(parts.find(p => p.type === type).value, 10);
+            table[i] = value('year') * 10000 + value('month') * 100 + value('day');
+        }
+
+        this.years.set(year, table);
+        return table;
+    }
+
+    /**
+     * @param {string|Date} date - YYYY-MM-DD or Date
+     * @param {number} adjustment - hijri_adjustment in days (may be negative)
+     * @returns {{day: number, month: number, year: number}}
+     */
+    static toHijri(date, adjustment = 0) {
+        const epochDay = this.toEpochDay(date) + (Number(adjustment) || 0);
+        const year = new Date(epochDay * DAY_MS).getUTCFullYear();
+        const table = this.years.get(year) || this.buildYear(year);
+        const packed = table[epochDay - Math.floor(Date.UTC(year, 0, 1) / DAY_MS)];
+
+        return {
+            day: packed % 100,
+            month: Math.floor(packed / 100) % 100,
+            year: Math.floor(packed / 10000)
+        };
+    }
+
+    /**
+     * Arabic label, e.g. "١٥ رمضان ١٤٤٦ هـ"
+     */
+    static getLabel(date, adjustment = 0) {
+        try {
+            const { day, month, year } = this.toHijri(date, adjustment);
+            return `${toArabicDigits(day)} ${MONTHS_AR[month - 1]} ${toArabicDigits(year)} هـ`;
+        } catch (error) {
+            console.error('Hijri calendar error:', error.message);
+            return '';
+        }
+    }
+
+    /**
+     * Fasting flags for one date, computed once per (date, adjustment)
+     */
+    static getFastingFlags(date, adjustment = 0) {
+        const epochDay = this.toEpochDay(date);
+        const key = `${epochDay}|${Number(adjustment) || 0}`;
+        const cached = this.fastingFlags.get(key);
+        if (cached) return cached;
+
+        let hijri = { day: 0, month: 0, year: 0 };
+        try {
+            hijri = this.toHijri(date, adjustment);
+        } catch (error) {
+            console.error('Error calculating Hijri date:', error);
+        }
+
+        // 1970-01-01 was a Thursday
+        const dayOfWeek = (epochDay + 4) % 7;
+        const flags = Object.freeze({
+            hijriDate: `${hijri.day}/${hijri.month}/${hijri.year}`,
+            isMonday: dayOfWeek === 1,
+            isThursday: dayOfWeek === 4,
+            // White days are 13, 14, 15
+            isWhiteDay: [13, 14, 15].includes(hijri.day),
+            // Ashura (10th of Muharram)
+            isAshura: hijri.month === 1 && hijri.day === 10,
+            // Arafah (9th of Dhul Hijjah)
+            isArafah: hijri.month === 12 && hijri.day === 9
+        });
+
+        if (this.fastingFlags.size > 5000) this.fastingFlags.clear();
+        this.fastingFlags.set(key, flags);
+        return flags;
+    }
+}
+
+module.exports = HijriCalendarService;
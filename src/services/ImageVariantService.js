@@ -0,0 +1,88 @@
+const RemoteMediaService = require('./RemoteMediaService');
+
+// Wikimedia renders (and keeps in its CDN) thumbnails at standard widths: 1280 is
+// the largest under WhatsApp's own ~1600px limit, 120 fits a message preview
+const WIDTH = parseInt(process.env.IMAGE_VARIANT_WIDTH || '1280', 10);
+const THUMB_WIDTH = parseInt(process.env.IMAGE_THUMB_WIDTH || '120', 10);
+// A variant the host refused (4xx) is not asked for again before this
+const RETRY_MS = 24 * 60 * 60 * 1000;
+// upload.wikimedia.org/wikipedia/<project>/[thumb/]<x>/<xy>/<file>[/<width>px-<file>]
+const WIKIMEDIA = /^(https:\/\/upload\.wikimedia\.org\/wikipedia\/[^/]+\/)(?:thumb\/)?([0-9a-f]\/[0-9a-f]{2}\/([^/]+?))(?:\/(\d+)px-[^/]+)?$/;
+const RESIZABLE = /\.(jpe?g|png|gif|webp)$/i;
+
+/**
+ * WhatsApp-sized copies of remote images. Catalog backgrounds are up to 3840px
+ * originals; sending the host's resized rendering instead cuts the upload per
+ * message several times over. Variants go through the media cache like any
+ * other image, so each one is fetched once and then read from disk.
+ */
+class ImageVariantService {
+    static WIDTH = WIDTH;
+    static THUMB_WIDTH = THUMB_WIDTH;
+    static unavailable = new Map();
+
+    /**
+     * URL of the image rendered at `width`, or null when the host cannot resize
+     * it or it is already that small
+     */
+    static variantUrl(url, width) {
+        const match = typeof url === 'string' ? url.match(WIKIMEDIA) : null;
+        if (!match) return null;
+        const [, base, file, name, current] = match;
+        if (!RESIZABLE.test(name)) return null;
+        if (current && parseInt(current, 10) <= width) return null;
+        return `${base}thumb/${file}/${width}px-${name}`;
+    }
+
+    /**
+     * Local file to send for a remote image: the resized variant when there is
+     * one, else the original
+     */
+    static async getImageFile(url) {
+        const variant = this.variantUrl(url, WIDTH);
+        const refusedAt = variant ? this.unavailable.get(variant) : null;
+
+        if (variant && !(refusedAt && Date.now() - refusedAt < RETRY_MS)) {
+            const file = await RemoteMediaService.fetchImageFile(variant);
+            if (file) {
+                this.unavailable.delete(variant);
+                return file;
+            }
+            // Only a refusal is remembered (e.g. more pixels than the original has);
+            // after a timeout or a 5xx the variant is asked for again next time
+            if (await this.isRefused(variant)) this.unavailable.set(variant, Date.now());
+        }
+        return RemoteMediaService.fetchImageFile(url);
+    }
+
+    /**
+     * Whether the host answered the variant URL with a client error. Rate limits
+     * and request timeouts are not refusals.
+     */
+    static async isRefused(variant) {
+        const probe = await RemoteMediaService.probeImageUrl(variant);
+        if (!probe) return false;
+        return probe.status >= 400 && probe.status < 500 && probe.status !== 408 && probe.status !== 429;
+    }
+
+    /**
+     * Base64 JPEG preview for the message bubble (Baileys cannot make one
+     * without an image library installed), or undefined
+     */
+    static async getThumbnail(url) {
+        const thumb = this.variantUrl(url, THUMB_WIDTH);
+        if (!thumb || !/\.jpe?g$/i.test(thumb)) return undefined;
+        const buffer = await RemoteMediaService.fetchImageBuffer(thumb);
+        return buffer ? buffer.toString('base64') : undefined;
+    }
+
+    /**
+     * Queue options for sending a remote image: { mediaUrl, jpegThumbnail }
+     */
+    static async getMedia(url) {
+        const [file, jpegThumbnail] = await Promise.all([this.getImageFile(url), this.getThumbnail(url)]);
+        return { mediaUrl: file ? { url: file } : url, jpegThumbnail };
+    }
+}
+
+module.exports = ImageVariantService;
@@ -1,27 +1,125 @@
-const axios = require('axios');
+const cron = require('node-cron');
 const RemoteMediaService = require('./RemoteMediaService');
 
+const THEMES = ['mosques', 'quran', 'patterns'];
+// Key for themes without a list of their own (see getThemeList)
+const FALLBACK = '*';
+// URLs whose host could not be asked are probed again this soon, not at the next cron run
+const RETRY_MS = parseInt(process.env.BACKGROUND_PROBE_RETRY_MS || String(5 * 60 * 1000), 10);
+
+/**
+ * Curated background images. Reachability is checked off the send path: a
+ * prober checks every catalog URL concurrently at startup and on a schedule,
+ * and getBackground picks from the per-theme healthy lists without any I/O.
+ */
 class IslamicBackgroundService {
-    static cache = new Map();
+    // Last probe result per catalog URL (bounded by the catalog size);
+    // ok: null means the host has not been reachable for a probe yet
+    static health = new Map();
+    // Theme key -> catalog items not known to be broken
+    static healthy = new Map();
+    static probing = null;
+    static lastProbe = null;
+    static retryTimer = null;
+
+    static init() {
+        cron.schedule(process.env.BACKGROUND_PROBE_CRON || '20 */6 * * *', () => this.probeAll());
+        this.probeAll();
+    }
+
+    static catalog() {
+        return [...this.MOSQUES, ...this.QURAN, ...this.PATTERNS].filter(x => x?.url);
+    }
+
+    static themeKey(theme) {
+        return THEMES.includes(theme) && this[theme.toUpperCase()].length ? theme : FALLBACK;
+    }
+
+    /**
+     * Probe every catalog URL (concurrently, within the HTTP client's per-host limit)
+     * and rebuild the healthy lists. Concurrent callers share one run.
+     */
+    static probeAll() {
+        if (this.probing) return this.probing;
+
+        this.probing = (async () => {
+            const started = Date.now();
+            const urls = [...new Set(this.catalog().map(x => x.url))];
+            const results = await Promise.all(urls.map(async url => [url, await RemoteMediaService.isImageUrlReachable(url)]));
+
+            for (const [url, ok] of results) {
+                // null: the host could not be asked; keep the previous answer, or
+                // leave the URL usable as unknown rather than marking it down
+                if (ok === null && this.health.has(url)) continue;
+                this.health.set(url, { ok, checkedAt: started });
+            }
+            // Drop URLs that left the catalog
+            for (const url of this.health.keys()) {
+                if (!urls.includes(url)) this.health.delete(url);
+            }
+            this.rebuildHealthy();
+
+            const ok = results.filter(([, r]) => r === true).length;
+            const unknown = results.filter(([, r]) => r === null).length;
+            this.lastProbe = { at: new Date(started).toISOString(), ms: Date.now() - started, urls: urls.length, ok, unknown };
+            console.log(`🖼️ [Backgrounds] ${ok}/${urls.length} background URLs reachable, ${unknown} unknown (${this.lastProbe.ms}ms)`);
+            if (unknown) this.scheduleRetry();
+            return this.lastProbe;
+        })()
+            .catch(error => {
+                console.error('❌ [Backgrounds] Probe failed:', error.message);
+                return null;
+            })
+            .finally(() => {
+                this.probing = null;
+            });
+        return this.probing;
+    }
+
+    static scheduleRetry() {
+        if (this.retryTimer) return;
+        this.retryTimer = setTimeout(() => {
+            this.retryTimer = null;
+            this.probeAll();
+        }, RETRY_MS);
+        if (this.retryTimer.unref) this.retryTimer.unref();
+    }
+
+    static rebuildHealthy() {
+        const healthy = new Map();
+        for (const key of [...THEMES, FALLBACK]) {
+            // Unknown (ok: null) stays in: only a host that answered can rule a URL out
+            healthy.set(key, this.getThemeList(key).filter(x => x?.url && this.health.get(x.url)?.ok !== false));
+        }
+        this.healthy = healthy;
+    }
+
+    static getStatus() {
+        const themes = {};
+        for (const [key, list] of this.healthy) themes[key] = list.length;
+        return { lastProbe: this.lastProbe, probing: !!this.probing, checked: this.health.size, healthy: themes };
+    }
 
     static async getBackground({ theme = 'mixed', excludeUrls = [] } = {}) {
         const exclude = new Set(Array.isArray(excludeUrls) ? excludeUrls.filter(Boolean) : []);
-        const fullList = this.getThemeList(theme);
-        const list = fullList.filter(x => x?.url && !exclude.has(x.url));
-        const shuffled = (list.length ? list : fullList).slice().sort(() => 0.5 - Math.random());
-
-        for (const item of shuffled) {
-            if (!item?.url) continue;
-            const ok = await this.isUrlOk(item.url);
-            if (!ok) continue;
-            return {
-                url: item.url,
-                source: item.source || 'خلفيات إسلامية ثابتة',
-                meta: item.meta || null
-            };
+        // Before the first probe has finished, fall back to the unchecked catalog
+        const list = this.lastProbe
+            ? (this.healthy.get(this.themeKey(theme)) || [])
+            : this.getThemeList(theme).filter(x => x?.url);
+        if (!list.length) return null;
+
+        let item = list[Math.floor(Math.random() * list.length)];
+        if (exclude.has(item.url)) {
+            const rest = list.filter(x => !exclude.has(x.url));
+            // Everything excluded: repeating an image beats sending none
+            if (rest.length) item = rest[Math.floor(Math.random() * rest.length)];
         }
 
-        return null;
+        return {
+            url: item.url,
+            source: item.source || 'خلفيات إسلامية ثابتة',
+            meta: item.meta || null
+        };
     }
 
     static getThemeList(theme) {
@@ -36,19 +134,6 @@ class IslamicBackgroundService {
         return [...this.MOSQUES, ...this.QURAN, ...this.PATTERNS];
     }
 
-    static async isUrlOk(url) {
-        const cached = this.cache.get(url);
-        const now = Date.now();
-        if (cached && now - cached.checkedAt < 6 * 60 * 60 * 1000) {
-            return cached.ok;
-        }
-
-        const ok = await RemoteMediaService.isImageUrlReachable(url);
-
-        this.cache.set(url, { ok, checkedAt: now });
-        return ok;
-    }
-
     static MOSQUES = [
         { url: 'https://upload.wikimedia.org/wikipedia/commons/thumb/a/ac/Bohoniki_meczet_5.jpg/1920px-Bohoniki_meczet_5.jpg', source: 'Wikimedia Commons (صور مساجد احترافية)', meta: { theme: 'mosques' } },
         { url: 'https://upload.wikimedia.org/wikipedia/commons/thumb/7/76/Arc_design_National_Mosque_of_Ghana.jpg/1920px-Arc_design_National_Mosque_of_Ghana.jpg', source: 'Wikimedia Commons (صور مساجد احترافية)', meta: { theme: 'mosques' } },
@@ -13,34 +13,38 @@ class IslamicRemindersService {
 
         if (!config) {
             const configId = 'conf-' + Math.random().toString(36).substr(2, 9);
-            await db.run(
-                'INSERT INTO islamic_reminders_config (id, user_id) VALUES (?, ?)',
-                [configId, userId]
-            );
 
-            // Initialize Prayer Settings
-            const prayers = ['fajr', 'dhuhr', 'asr', 'maghrib', 'isha'];
-            for (const prayer of prayers) {
-                const settingId = 'pray-' + Math.random().toString(36).substr(2, 9);
-                await db.run(
-                    'INSERT INTO prayer_settings (id, config_id, prayer_name) VALUES (?, ?, ?)',
-                    [settingId, configId, prayer]
+            // Config + all default settings in one transaction (single commit)
+            await db.transaction(async (tx) => {
+                await tx.run(
+                    'INSERT INTO islamic_reminders_config (id, user_id) VALUES (?, ?)',
+                    [configId, userId]
                 );
-            }
 
-            // Initialize Fasting Settings
-            const fastingId = 'fast-' + Math.random().toString(36).substr(2, 9);
-            await db.run(
-                'INSERT INTO fasting_settings (id, config_id) VALUES (?, ?)',
-                [fastingId, configId]
-            );
+                // Initialize Prayer Settings
+                const prayers = ['fajr', 'dhuhr', 'asr', 'maghrib', 'isha'];
+                for (const prayer of prayers) {
+                    const settingId = 'pray-' + Math.random().toString(36).substr(2, 9);
+                    await tx.run(
+                        'INSERT INTO prayer_settings (id, config_id, prayer_name) VALUES (?, ?, ?)',
+                        [settingId, configId, prayer]
+                    );
+                }
 
-            // Initialize Adhkar Settings (CRITICAL FIX)
-            const adhkarId = 'adhkar-' + Math.random().toString(36).substr(2, 9);
-            await db.run(
-                'INSERT INTO adhkar_settings (id, config_id) VALUES (?, ?)',
-                [adhkarId, configId]
-            );
+                // Initialize Fasting Settings
+                const fastingId = 'fast-' + Math.random().toString(36).substr(2, 9);
+                await tx.run(
+                    'INSERT INTO fasting_settings (id, config_id) VALUES (?, ?)',
+                    [fastingId, configId]
+                );
+
+                // Initialize Adhkar Settings (CRITICAL FIX)
+                const adhkarId = 'adhkar-' + Math.random().toString(36).substr(2, 9);
+                await tx.run(
+                    'INSERT INTO adhkar_settings (id, config_id) VALUES (?, ?)',
+                    [adhkarId, configId]
+                );
+            });
 
             config = await db.get('SELECT * FROM islamic_reminders_config WHERE user_id = ?', [userId]);
         } else {
@@ -70,13 +74,11 @@ class IslamicRemindersService {
             const checkPrayer = await db.get('SELECT id FROM prayer_settings WHERE config_id = ?', [config.id]);
             if (!checkPrayer) {
                 const prayers = ['fajr', 'dhuhr', 'asr', 'maghrib', 'isha'];
-                for (const prayer of prayers) {
-                    const settingId = 'pray-' + Math.random().toString(36).substr(2, 9);
-                    await db.run(
-                        'INSERT INTO prayer_settings (id, config_id, prayer_name) VALUES (?, ?, ?)',
-                        [settingId, config.id, prayer]
-                    );
-                }
+                await db.insertMany('prayer_settings', prayers.map(prayer => ({
+                    id: 'pray-' + Math.random().toString(36).substr(2, 9),
+                    config_id: config.id,
+                    prayer_name: prayer
+                })));
             }
         }
 
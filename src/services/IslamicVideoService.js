@@ -1,7 +1,12 @@
-const axios = require('axios');
+const httpClient = require('./httpClient');
+const WarmPool = require('./WarmPool');
+
+const POOL_CAPACITY = parseInt(process.env.VIDEO_POOL_SIZE || '30', 10);
+const RECENT_LIMIT = 50;
 
 class IslamicVideoService {
-    static cache = new Map();
+    // Videos handed out before, reused while both APIs are unavailable
+    static recent = [];
 
     static QUERIES = [
         'mosque',
@@ -16,16 +21,14 @@ class IslamicVideoService {
         return this.QUERIES[Math.floor(Math.random() * this.QUERIES.length)];
     }
 
-    static async getFromPexels() {
+    /**
+     * Candidate videos for one query: portrait-friendly mp4 links of at most 720px and 14MB
+     */
+    static async searchPexels(q = this.getRandomQuery()) {
         const key = process.env.PEXELS_API_KEY;
-        if (!key) return null;
-
-        const q = this.getRandomQuery();
-        const cacheKey = `pexels:${q}`;
-        const cached = this.cache.get(cacheKey);
-        if (cached && (Date.now() - cached.at) < 10 * 60 * 1000) return cached.url;
+        if (!key) return [];
 
-        const res = await axios.get('https://api.pexels.com/videos/search', {
+        const res = await httpClient.get('https://api.pexels.com/videos/search', {
             headers: { Authorization: key },
             params: { query: q, per_page: 20, orientation: 'portrait' }
         });
@@ -44,25 +47,17 @@ class IslamicVideoService {
                 if (quality && quality !== 'sd' && quality !== 'hd') continue;
                 if (w && w > 720) continue;
                 if (size && size > 14 * 1024 * 1024) continue;
-                candidates.push({ link, w, size });
+                candidates.push(link);
             }
         }
-
-        const picked = candidates.sort(() => 0.5 - Math.random())[0]?.link || null;
-        if (picked) this.cache.set(cacheKey, { at: Date.now(), url: picked });
-        return picked;
+        return candidates;
     }
 
-    static async getFromPixabay() {
+    static async searchPixabay(q = this.getRandomQuery()) {
         const key = process.env.PIXABAY_API_KEY;
-        if (!key) return null;
+        if (!key) return [];
 
-        const q = this.getRandomQuery();
-        const cacheKey = `pixabay:${q}`;
-        const cached = this.cache.get(cacheKey);
-        if (cached && (Date.now() - cached.at) < 10 * 60 * 1000) return cached.url;
-
-        const res = await axios.get('https://pixabay.com/api/videos/', {
+        const res = await httpClient.get('https://pixabay.com/api/videos/', {
             params: {
                 key,
                 q,
@@ -81,10 +76,19 @@ class IslamicVideoService {
             if (!url.toLowerCase().includes('.mp4')) continue;
             candidates.push(url);
         }
+        return candidates;
+    }
 
-        const picked = candidates.sort(() => 0.5 - Math.random())[0] || null;
-        if (picked) this.cache.set(cacheKey, { at: Date.now(), url: picked });
-        return picked;
+    static pools = {
+        pexels: new WarmPool('video:pexels', { fill: () => IslamicVideoService.searchPexels(), capacity: POOL_CAPACITY, lowWater: 10 }),
+        pixabay: new WarmPool('video:pixabay', { fill: () => IslamicVideoService.searchPixabay(), capacity: POOL_CAPACITY, lowWater: 10 })
+    };
+
+    /**
+     * Fill the pools ahead of the first send
+     */
+    static warm() {
+        return Promise.all(Object.values(this.pools).map(pool => pool.refill()));
     }
 
     static getFallbackCurated() {
@@ -95,16 +99,25 @@ class IslamicVideoService {
         return videos[Math.floor(Math.random() * videos.length)];
     }
 
+    /**
+     * Any previously picked video, however old; used while both pools are empty
+     */
+    static getStale() {
+        if (!this.recent.length) return null;
+        return this.recent[Math.floor(Math.random() * this.recent.length)];
+    }
+
+    /**
+     * Never waits on Pexels/Pixabay: picks from the warm pools, which refill in the background
+     */
     static async getIslamicVideoUrl() {
-        try {
-            const pexels = await this.getFromPexels();
-            if (pexels) return pexels;
-        } catch (e) { }
-        try {
-            const pixabay = await this.getFromPixabay();
-            if (pixabay) return pixabay;
-        } catch (e) { }
-        return this.getFallbackCurated();
+        const url = this.pools.pexels.take() || this.pools.pixabay.take();
+        if (url) {
+            if (!this.recent.includes(url)) this.recent.push(url);
+            if (this.recent.length > RECENT_LIMIT) this.recent.shift();
+            return url;
+        }
+        return this.getStale() || this.getFallbackCurated();
     }
 }
 
@@ -0,0 +1,189 @@
+const fs = require('fs');
+const path = require('path');
+const crypto = require('crypto');
+const { Transform } = require('stream');
+const { pipeline } = require('stream/promises');
+const { db } = require('../database/db');
+const writeBuffer = require('../database/writeBuffer');
+const httpClient = require('./httpClient');
+
+const CACHE_DIR = process.env.MEDIA_CACHE_DIR || path.join(process.cwd(), 'data', 'media-cache');
+const MAX_BYTES = parseInt(process.env.MEDIA_CACHE_MAX_BYTES || String(512 * 1024 * 1024), 10);
+const MAX_FILE_BYTES = parseInt(process.env.MEDIA_CACHE_MAX_FILE_BYTES || String(25 * 1024 * 1024), 10);
+const FRESH_MS = parseInt(process.env.MEDIA_CACHE_FRESH_MS || String(24 * 60 * 60 * 1000), 10);
+// Files used this recently are never evicted: a queued send may still read them
+const PIN_MS = 15 * 60 * 1000;
+const EXTENSIONS = { 'image/jpeg': 'jpg', 'image/png': 'png', 'image/webp': 'webp', 'image/gif': 'gif', 'video/mp4': 'mp4' };
+
+/**
+ * On-disk cache for remote media (hadith background images, Quran pages).
+ *
+ * Files are content-addressed (sha256 of the bytes) and written atomically
+ * (temp file + rename); media_cache maps each URL to its file and keeps the
+ * ETag/Last-Modified validators. Entries are served without a request for
+ * MEDIA_CACHE_FRESH_MS, then revalidated with a conditional GET. When the
+ * total size passes MEDIA_CACHE_MAX_BYTES the least recently used files go.
+ */
+class MediaCacheService {
+    static CACHE_DIR = CACHE_DIR;
+    static pending = new Map();
+    static stats = { hits: 0, revalidated: 0, stored: 0, stale: 0, failures: 0, evicted: 0 };
+
+    static filePath(hash, contentType) {
+        return path.join(CACHE_DIR, `${hash}.${EXTENSIONS[contentType] || 'bin'}`);
+    }
+
+    /**
+     * Local copy of a remote file. Concurrent calls for one URL share the download.
+     * @param {string} url
+     * @param {{accept?: string, headers?: object}} options - accept: required content-type prefix
+     * @returns {Promise<{path: string, contentType: string, size: number, hash: string, status: string}|null>}
+     *          null when the URL cannot be fetched (or has the wrong type) and nothing is cached
+     */
+    static get(url, options = {}) {
+        const pending = this.pending.get(url);
+        if (pending) return pending;
+
+        const promise = this.resolve(url, options).finally(() => this.pending.delete(url));
+        this.pending.set(url, promise);
+        return promise;
+    }
+
+    static async resolve(url, { accept = '', headers = {} } = {}) {
+        const now = Date.now();
+        const entry = await db.get('SELECT * FROM media_cache WHERE url = ?', [url]);
+        const file = entry ? this.filePath(entry.hash, entry.content_type) : null;
+        const cached = file && fs.existsSync(file)
+            ? { path: file, contentType: entry.content_type, size: entry.size, hash: entry.hash }
+            : null;
+
+        if (cached && now - entry.fetched_at < FRESH_MS) {
+            return this.served(url, cached, 'hits', { used_at: now });
+        }
+
+        const validators = {};
+        if (cached && entry.etag) validators['If-None-Match'] = entry.etag;
+        if (cached && entry.last_modified) validators['If-Modified-Since'] = entry.last_modified;
+
+        let res;
+        try {
+            res = await httpClient.get(url, {
+                responseType: 'stream',
+                validateStatus: () => true,
+                headers: { ...headers, ...validators }
+            });
+        } catch (error) {
+            // Upstream unavailable: an old copy is better than none
+            if (cached) return this.served(url, cached, 'stale', { used_at: now });
+            this.stats.failures++;
+            return null;
+        }
+
+        if (res.status === 304 && cached) {
+            res.data.resume();
+            return this.served(url, cached, 'revalidated', { fetched_at: now, used_at: now });
+        }
+
+        const contentType = String(res.headers?.['content-type'] || '').split(';')[0].trim().toLowerCase();
+        if (res.status < 200 || res.status >= 300 || (accept && !contentType.startsWith(accept))) {
+            res.data.destroy();
+            if (cached && res.status >= 500) return this.served(url, cached, 'stale', { used_at: now });
+            this.stats.failures++;
+            return null;
+        }
+
+        const stored = await this.store(res.data, contentType);
+        await db.run(
+            `INSERT OR REPLACE INTO media_cache (url, hash, content_type, size, etag, last_modified, fetched_at, used_at)
+             VALUES (?, ?, ?, ?, ?, ?, ?, ?)`,
+            [url, stored.hash, contentType, stored.size, res.headers?.etag || null, res.headers?.['last-modified'] || null, now, now]
+        );
+        // The URL now points at different bytes; drop the old file if nothing else uses it
+        if (entry && entry.hash !== stored.hash) await this.removeIfUnused(entry.hash, entry.content_type);
+
+        this.stats.stored++;
+        await this.evict();
+        return { path: stored.path, contentType, size: stored.size, hash: stored.hash, status: 'stored' };
+    }
+
+    static served(url, cached, stat, values) {
+        this.stats[stat]++;
+        writeBuffer.update('media_cache', 'url', url, values);
+        return { ...cached, status: stat === 'hits' ? 'hit' : stat };
+    }
+
+    /**
+     * Write a stream to a temp file while hashing it, then rename it into place
+     */
+    static async store(stream, contentType) {
+        await fs.promises.mkdir(CACHE_DIR, { recursive: true });
+        const tmp = path.join(CACHE_DIR, `.tmp-${process.pid}-${crypto.randomBytes(6).toString('hex')}`);
+        const hasher = crypto.createHash('sha256');
+        let size = 0;
+        const meter = new Transform({
+            transform(chunk, encoding, callback) {
+                size += chunk.length;
+                if (size > MAX_FILE_BYTES) return callback(new Error(`Media file larger than ${MAX_FILE_BYTES} bytes`));
+                hasher.update(chunk);
+                callback(null, chunk);
+            }
+        });
+
+        try {
+            await pipeline(stream, meter, fs.createWriteStream(tmp));
+        } catch (error) {
+            await fs.promises.rm(tmp, { force: true });
+            throw error;
+        }
+
+        const hash = hasher.digest('hex');
+        const file = this.filePath(hash, contentType);
+        // Same bytes already cached under another URL: keep the existing file
+        if (fs.existsSync(file)) await fs.promises.rm(tmp, { force: true });
+        else await fs.promises.rename(tmp, file);
+        return { hash, size, path: file };
+    }
+
+    static async removeIfUnused(hash, contentType) {
+        const row = await db.get('SELECT 1 AS used FROM media_cache WHERE hash = ? LIMIT 1', [hash]);
+        if (!row) await fs.promises.rm(this.filePath(hash, contentType), { force: true });
+    }
+
+    /**
+     * Delete least recently used files until the cache fits in MEDIA_CACHE_MAX_BYTES
+     * @returns {Promise<number>} files removed
+     */
+    static async evict(maxBytes = MAX_BYTES) {
+        const files = await db.all(
+            `SELECT hash, content_type, MAX(size) AS size, MAX(used_at) AS used_at
+             FROM media_cache GROUP BY hash ORDER BY used_at ASC`
+        );
+        let total = files.reduce((sum, f) => sum + f.size, 0);
+        const pinnedAfter = Date.now() - PIN_MS;
+        let removed = 0;
+
+        for (const file of files) {
+            if (total <= maxBytes || file.used_at >= pinnedAfter) break;
+            await db.run('DELETE FROM media_cache WHERE hash = ?', [file.hash]);
+            await fs.promises.rm(this.filePath(file.hash, file.content_type), { force: true });
+            total -= file.size;
+            removed++;
+        }
+
+        if (removed) {
+            this.stats.evicted += removed;
+            console.log(`🧹 [MediaCache] Evicted ${removed} files, ${Math.round(total / 1024 / 1024)}MB kept`);
+        }
+        return removed;
+    }
+
+    static async getStats() {
+        const row = await db.get(
+            `SELECT SUM(urls) AS urls, COUNT(*) AS files, COALESCE(SUM(size), 0) AS bytes
+             FROM (SELECT COUNT(*) AS urls, MAX(size) AS size FROM media_cache GROUP BY hash)`
+        );
+        return { dir: CACHE_DIR, maxBytes: MAX_BYTES, freshMs: FRESH_MS, ...row, ...this.stats };
+    }
+}
+
+module.exports = MediaCacheService;
@@ -1,70 +1,326 @@
 const { db } = require('../database/db');
-const { v4: uuidv4 } = require('uuid');
+const { LRUCache } = require('lru-cache');
+const cron = require('node-cron');
 const { Coordinates, CalculationMethod, PrayerTimes } = require('adhan');
 const moment = require('moment-timezone');
+const HijriCalendarService = require('./HijriCalendarService');
+
+const PRAYERS = ['fajr', 'sunrise', 'dhuhr', 'asr', 'maghrib', 'isha'];
+const DEFAULT_TIMEZONE = 'Africa/Cairo';
+// How far ahead the background job keeps every configured location computed
+const PRECOMPUTE_DAYS = parseInt(process.env.PRAYER_PRECOMPUTE_DAYS || '60', 10);
+
+// Nearby users share one location key (and one computed month):
+// 'grid' snaps to cells of PRAYER_LOCATION_GRID_KM (~1 km moves times by well under a minute),
+// 'city' snaps to the nearest known city within PRAYER_CITY_SNAP_KM (grid otherwise),
+// 'exact' keeps raw coordinates
+const LOCATION_MODE = process.env.PRAYER_LOCATION_MODE || 'grid';
+const GRID_KM = parseFloat(process.env.PRAYER_LOCATION_GRID_KM || '1');
+const CITY_SNAP_KM = parseFloat(process.env.PRAYER_CITY_SNAP_KM || '15');
+const KM_PER_DEGREE = 111.32;
+
+let knownCities = null;
+const getKnownCities = () => {
+    if (!knownCities) {
+        const LOCATION_DATA = require('../public/js/location-data');
+        knownCities = [];
+        for (const governorates of Object.values(LOCATION_DATA)) {
+            for (const cities of Object.values(governorates)) {
+                for (const { lat, lng } of Object.values(cities)) knownCities.push({ lat, lng });
+            }
+        }
+    }
+    return knownCities;
+};
+
+// Equirectangular distance, accurate enough at city scale
+const distanceKm = (lat1, lng1, lat2, lng2) => {
+    const x = (lng2 - lng1) * Math.cos(((lat1 + lat2) / 2) * Math.PI / 180);
+    const y = lat2 - lat1;
+    return Math.sqrt(x * x + y * y) * KM_PER_DEGREE;
+};
+
+const snapToGrid = (latitude, longitude, km = GRID_KM) => {
+    if (!(km > 0)) return { latitude, longitude };
+    const latStep = km / KM_PER_DEGREE;
+    const lat = Math.round(latitude / latStep) * latStep;
+    // Longitude cells keep roughly the same width in km at every latitude
+    const lngStep = latStep / Math.max(Math.cos(lat * Math.PI / 180), 0.01);
+    const lng = Math.round(longitude / lngStep) * lngStep;
+    return { latitude: Number(lat.toFixed(4)), longitude: Number(lng.toFixed(4)) };
+};
+
+const snapToCity = (latitude, longitude) => {
+    let best = null;
+    let bestDistance = CITY_SNAP_KM;
+    for (const city of getKnownCities()) {
+        const distance = distanceKm(latitude, longitude, city.lat, city.lng);
+        if (distance <= bestDistance) {
+            best = city;
+            bestDistance = distance;
+        }
+    }
+    return best ? { latitude: best.lat, longitude: best.lng } : snapToGrid(latitude, longitude);
+};
+
+const quantize = (latitude, longitude, mode = LOCATION_MODE) => {
+    if (mode === 'exact') return { latitude, longitude };
+    if (mode === 'city') return snapToCity(latitude, longitude);
+    return snapToGrid(latitude, longitude);
+};
+
+// Stored as little-endian int16 so the rows do not depend on the host
+const packTimes = (packed) => {
+    const buffer = Buffer.alloc(packed.length * 2);
+    packed.forEach((value, i) => buffer.writeInt16LE(value, i * 2));
+    return buffer;
+};
+
+const unpackTimes = (buffer) => {
+    const packed = new Int16Array(buffer.length / 2);
+    for (let i = 0; i < packed.length; i++) packed[i] = buffer.readInt16LE(i * 2);
+    return packed;
+};
+
+const toHHmm = (minutes) => `${String(Math.floor(minutes / 60)).padStart(2, '0')}:${String(minutes % 60).padStart(2, '0')}`;
 
 class PrayerTimesService {
+    // `${locationKey}|YYYY-MM` -> Int16Array (days * 6 minute offsets)
+    static months = new LRUCache({ max: parseInt(process.env.PRAYER_MONTH_CACHE_SIZE || '5000', 10) });
+    static pendingMonths = new Map();
+    // `${locationKey}|YYYY-MM-DD` -> frozen day times, expiring at the location's next midnight
+    static days = new LRUCache({ max: parseInt(process.env.PRAYER_DAY_CACHE_SIZE || '20000', 10) });
+    // raw `${lat}_${lng}_${method}_${tz}` -> quantized location
+    static locations = new LRUCache({ max: 20000 });
+
     /**
-     * Get cached prayer times or calculate fresh
+     * Load stored months and keep every configured location computed ahead
      */
-    static async getPrayerTimes(config) {
-        let times = null;
-        const date = new Date().toISOString().split('T')[0];
-        let hijriDate = '';
+    static async init() {
         try {
-            hijriDate = new Intl.DateTimeFormat('ar-SA-u-ca-islamic', {
-                day: 'numeric', month: 'long', year: 'numeric'
-            }).format(new Date());
-        } catch (e) {
-            console.error('Intl Hijri Error:', e.message);
-            hijriDate = new Date().toLocaleDateString('ar-SA');
+            const rows = await db.all(
+                'SELECT location_key, month, times FROM prayer_times_monthly WHERE month >= ?',
+                [moment().subtract(1, 'month').format('YYYY-MM')]
+            );
+            for (const row of rows) {
+                this.months.set(`${row.location_key}|${row.month}`, unpackTimes(row.times));
+            }
+            console.log(`🕌 Loaded ${rows.length} precomputed prayer months`);
+        } catch (error) {
+            console.error('Error loading precomputed prayer times:', error.message);
         }
 
+        // Background refresh: now (not awaited) and every night
+        this.precomputeAll().catch(err => console.error('Prayer times precompute failed:', err.message));
+        cron.schedule('30 0 * * *', async () => {
+            try {
+                await this.precomputeAll();
+            } catch (error) {
+                console.error('Prayer times precompute failed:', error.message);
+            }
+        });
+    }
+
+    static quantize(latitude, longitude, mode = LOCATION_MODE) {
+        return quantize(latitude, longitude, mode);
+    }
+
+    /**
+     * Calculation inputs for a config, with coordinates quantized per PRAYER_LOCATION_MODE
+     */
+    static getLocation(config) {
+        const method = config.prayer_calculation_method || 'Egypt';
+        const timezone = config.timezone || DEFAULT_TIMEZONE;
+        const rawKey = `${config.latitude}_${config.longitude}_${method}_${timezone}`;
+        let location = this.locations.get(rawKey);
+        if (!location) {
+            const { latitude, longitude } = quantize(Number(config.latitude), Number(config.longitude));
+            location = Object.freeze({ latitude, longitude, method, timezone });
+            this.locations.set(rawKey, location);
+        }
+        return location;
+    }
+
+    static locationKey(location) {
+        return `${location.latitude}_${location.longitude}_${location.method}_${location.timezone}`;
+    }
+
+    static calculationParams(method) {
+        if (method === 'Makkah') return CalculationMethod.UmmAlQura();
+        if (method === 'MWL') return CalculationMethod.MuslimWorldLeague();
+        if (method === 'ISNA') return CalculationMethod.NorthAmerica();
+        return CalculationMethod.Egyptian();
+    }
+
+    /**
+     * Compute a whole month in one pass.
+     * @param {object} location - { latitude, longitude, method, timezone }
+     * @param {string} month - YYYY-MM (local calendar of the location)
+     * @returns {Int16Array} six minute-of-day offsets per day
+     */
+    static computeMonth(location, month) {
+        const [year, monthIndex] = month.split('-').map(Number);
+        const days = new Date(Date.UTC(year, monthIndex, 0)).getUTCDate();
+        const coordinates = new Coordinates(location.latitude, location.longitude);
+        const params = this.calculationParams(location.method);
+        const zone = moment.tz.zone(location.timezone) || moment.tz.zone(DEFAULT_TIMEZONE);
+        const packed = new Int16Array(days * PRAYERS.length);
+
+        for (let day = 1; day <= days; day++) {
+            // adhan reads the calendar day from the Date's local fields
+            const prayerTimes = new PrayerTimes(coordinates, new Date(year, monthIndex - 1, day), params);
+            for (let i = 0; i < PRAYERS.length; i++) {
+                const timestamp = prayerTimes[PRAYERS[i]].getTime();
+                const localMinutes = Math.floor(timestamp / 60000) - zone.utcOffset(timestamp);
+                packed[(day - 1) * PRAYERS.length + i] = ((localMinutes % 1440) + 1440) % 1440;
+            }
+        }
+        return packed;
+    }
+
+    static async saveMonths(rows) {
+        if (!rows.length) return;
+        await db.insertMany('prayer_times_monthly', rows.map(({ locationKey, month, packed }) => ({
+            location_key: locationKey,
+            month,
+            times: packTimes(packed),
+            computed_at: new Date().toISOString()
+        })), { conflict: 'REPLACE' });
+    }
+
+    /**
+     * Month block for a location: memory, then the stored row, then computed (and saved).
+     * Concurrent misses for the same month share one load.
+     */
+    static async getMonth(location, month) {
+        const locationKey = this.locationKey(location);
+        const key = `${locationKey}|${month}`;
+        const cached = this.months.get(key);
+        if (cached) return cached;
+        if (this.pendingMonths.has(key)) return this.pendingMonths.get(key);
+
+        const pending = (async () => {
+            const row = await db.get(
+                'SELECT times FROM prayer_times_monthly WHERE location_key = ? AND month = ?',
+                [locationKey, month]
+            );
+            let packed = row ? unpackTimes(row.times) : null;
+            if (!packed) {
+                packed = this.computeMonth(location, month);
+                this.saveMonths([{ locationKey, month, packed }])
+                    .catch(err => console.error('Error saving prayer times:', err.message));
+            }
+            this.months.set(key, packed);
+            return packed;
+        })().finally(() => this.pendingMonths.delete(key));
+
+        this.pendingMonths.set(key, pending);
+        return pending;
+    }
+
+    /**
+     * Times for one local date (YYYY-MM-DD) of a config's location.
+     * Served from the day cache until local midnight, so configs sharing a
+     * location key (and repeated dashboard calls) reuse one object.
+     */
+    static async getTimesForDate(config, date) {
+        const location = this.getLocation(config);
+        const locationKey = this.locationKey(location);
+        const dayKey = `${locationKey}|${date}`;
+        const cached = this.days.get(dayKey);
+        if (cached) return cached;
+
+        const packed = await this.getMonth(location, date.slice(0, 7));
+        // Another caller may have filled the day while the month was loading
+        const filled = this.days.get(dayKey);
+        if (filled) return filled;
+
+        const offset = (Number(date.slice(8, 10)) - 1) * PRAYERS.length;
+
+        const times = { location_key: locationKey, prayer_date: date, hijri_date: HijriCalendarService.getLabel(date) };
+        PRAYERS.forEach((name, i) => { times[name] = toHHmm(packed[offset + i]); });
+        Object.freeze(times);
+
+        const nextMidnight = moment.tz(date, location.timezone).add(1, 'day');
+        const ttl = Math.max(nextMidnight.valueOf() - Date.now(), 1000);
+        this.days.set(dayKey, times, { ttl });
+        return times;
+    }
+
+    /**
+     * Compute the next PRECOMPUTE_DAYS for every distinct configured location
+     */
+    static async precomputeAll(days = PRECOMPUTE_DAYS) {
+        const started = Date.now();
+        const locations = await db.all(`
+            SELECT DISTINCT latitude, longitude, prayer_calculation_method, timezone
+            FROM islamic_reminders_config
+            WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+        `);
+
+        const rows = [];
+        const keys = new Set();
+        for (const config of locations) {
+            const location = this.getLocation(config);
+            const locationKey = this.locationKey(location);
+            if (keys.has(locationKey)) continue;
+            keys.add(locationKey);
+            const today = moment().tz(location.timezone);
+            const last = today.clone().add(days, 'days');
+
+            for (const cursor = today.clone().startOf('month'); !cursor.isAfter(last); cursor.add(1, 'month')) {
+                const month = cursor.format('YYYY-MM');
+                const key = `${locationKey}|${month}`;
+                if (this.months.has(key)) continue;
+                const packed = this.computeMonth(location, month);
+                this.months.set(key, packed);
+                rows.push({ locationKey, month, packed });
+            }
+            // Yield between locations so a large backlog never stalls requests
+            await new Promise(resolve => setImmediate(resolve));
+        }
+
+        await this.saveMonths(rows);
+        console.log(`🕌 Prayer times precomputed: ${locations.length} configured locations -> ${keys.size} keys, ${rows.length} new months in ${Date.now() - started}ms`);
+        return { locations: locations.length, keys: keys.size, months: rows.length };
+    }
+
+    /**
+     * Get cached prayer times or calculate fresh
+     */
+    static async getPrayerTimes(config) {
+        const timezone = config.timezone || DEFAULT_TIMEZONE;
+        const date = moment().tz(timezone).format('YYYY-MM-DD');
+
         // Default base times
-        times = {
+        let times = {
             fajr: '05:00',
             sunrise: '06:30',
             dhuhr: '12:00',
             asr: '15:30',
             maghrib: '18:00',
             isha: '19:30',
-            hijri_date: hijriDate,
+            hijri_date: HijriCalendarService.getLabel(date, config.hijri_adjustment),
             prayer_date: date,
             is_manual: true
         };
 
-        if (!config.latitude && !config.longitude) {
-            return times;
-        }
-
         // Try to get automatic times if location is available
         if (config.latitude && config.longitude) {
-            const locationKey = `${config.latitude}_${config.longitude}_${config.prayer_calculation_method || 'Egypt'}`;
-            
-            // Check cache
-            let cached = await db.get(
-                'SELECT * FROM prayer_times_cache WHERE location_key = ? AND prayer_date = ?',
-                [locationKey, date]
-            );
-
-            if (!cached) {
-                cached = await this.calculateAndCachePrayerTimes(config, date, locationKey);
-            }
-
-            if (cached) {
-                times = { ...cached, is_manual: false };
+            try {
+                times = {
+                    ...(await this.getTimesForDate(config, date)),
+                    // Day entries are shared across configs; the label follows this config's adjustment
+                    hijri_date: times.hijri_date,
+                    is_manual: false
+                };
+            } catch (error) {
+                console.error('Error calculating prayer times:', error.message);
             }
         }
 
         // If explicitly set to manual mode, apply manual overrides
         if (config.prayer_time_mode === 'manual') {
-            console.log(`[PrayerTimesService-Debug] Applying manual overrides for config ${config.id}:`, {
-                fajr: config.manual_fajr,
-                dhuhr: config.manual_dhuhr,
-                asr: config.manual_asr,
-                maghrib: config.manual_maghrib,
-                isha: config.manual_isha
-            });
             if (config.manual_fajr) times.fajr = config.manual_fajr;
             if (config.manual_dhuhr) times.dhuhr = config.manual_dhuhr;
             if (config.manual_asr) times.asr = config.manual_asr;
@@ -76,75 +332,14 @@ class PrayerTimesService {
         return times;
     }
 
-    /**
-     * Calculate using adhan library and cache
-     */
-    static async calculateAndCachePrayerTimes(config, date, locationKey) {
-        try {
-            const coordinates = new Coordinates(config.latitude, config.longitude);
-            const dateObj = new Date(date);
-            const timezone = config.timezone || 'Africa/Cairo';
-
-            // Map method
-            let calculationMethod = CalculationMethod.Egyptian();
-            if (config.prayer_calculation_method === 'Makkah') calculationMethod = CalculationMethod.UmmAlQura();
-            else if (config.prayer_calculation_method === 'MWL') calculationMethod = CalculationMethod.MuslimWorldLeague();
-            else if (config.prayer_calculation_method === 'ISNA') calculationMethod = CalculationMethod.NorthAmerica();
-
-            const prayerTimes = new PrayerTimes(coordinates, dateObj, calculationMethod);
-
-            // Format times to HH:mm
-            const formatter = (time) => moment(time).tz(timezone).format('HH:mm');
-
-            // Get Hijri Date
-            let hijriDate = '';
-            try {
-                hijriDate = new Intl.DateTimeFormat('ar-SA-u-ca-islamic', {
-                    day: 'numeric', month: 'long', year: 'numeric'
-                }).format(dateObj);
-            } catch (e) {
-                hijriDate = dateObj.toLocaleDateString('ar-SA');
-            }
-
-            const prayerData = {
-                id: uuidv4(),
-                location_key: locationKey,
-                prayer_date: date,
-                fajr: formatter(prayerTimes.fajr),
-                sunrise: formatter(prayerTimes.sunrise),
-                dhuhr: formatter(prayerTimes.dhuhr),
-                asr: formatter(prayerTimes.asr),
-                maghrib: formatter(prayerTimes.maghrib),
-                isha: formatter(prayerTimes.isha),
-                hijri_date: hijriDate,
-                cached_at: new Date().toISOString()
-            };
-
-            await db.run(
-                `INSERT INTO prayer_times_cache 
-                (id, location_key, prayer_date, fajr, sunrise, dhuhr, asr, maghrib, isha, hijri_date, cached_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`,
-                [
-                    prayerData.id, prayerData.location_key, prayerData.prayer_date,
-                    prayerData.fajr, prayerData.sunrise, prayerData.dhuhr,
-                    prayerData.asr, prayerData.maghrib, prayerData.isha,
-                    prayerData.hijri_date, prayerData.cached_at
-                ]
-            );
-
-            return prayerData;
-
-        } catch (error) {
-            console.error('Error calculating prayer times:', error.message);
-            return null;
-        }
-    }
-
     /**
      * Get next prayer time
+     * @param {object} config
+     * @param {object} [times] - result of getPrayerTimes(config), if already available
      */
-    static async getNextPrayer(config) {
-        const times = await this.getPrayerTimes(config);
+    static async getNextPrayer(config, times = null) {
+        // Callers that already fetched today's times pass them in
+        if (!times) times = await this.getPrayerTimes(config);
         if (!times) return null;
 
         const now = new Date();
@@ -0,0 +1,394 @@
+const fs = require('fs');
+const path = require('path');
+const zlib = require('zlib');
+const crypto = require('crypto');
+const httpClient = require('./httpClient');
+const QuranService = require('./QuranService');
+
+const CONCURRENCY = parseInt(process.env.QURAN_MIRROR_CONCURRENCY || '4', 10);
+// WhatsApp scales images down to about 1600px anyway; wider pages only cost upload time
+const MAX_WIDTH = parseInt(process.env.QURAN_PAGE_MAX_WIDTH || '1600', 10);
+const RETRIES = 3;
+const MANIFEST = 'manifest.json';
+const PNG_SIGNATURE = Buffer.from([0x89, 0x50, 0x4e, 0x47, 0x0d, 0x0a, 0x1a, 0x0a]);
+// Text and timestamp chunks carry nothing needed for display
+const DROPPED_CHUNKS = new Set(['tEXt', 'zTXt', 'iTXt', 'tIME']);
+// Chunks that still describe the pixels after resampling (palettes are expanded away)
+const COLOR_CHUNKS = new Set(['gAMA', 'cHRM', 'sRGB', 'iCCP']);
+// Channels per PNG colour type, and the colour type for a channel count
+const CHANNELS = { 0: 1, 2: 3, 3: 1, 4: 2, 6: 4 };
+const COLOR_TYPES = { 1: 0, 2: 4, 3: 2, 4: 6 };
+
+const CRC_TABLE = new Int32Array(256).map((_, n) => {
+    let c = n;
+    for (let k = 0; k < 8; k++) c = c & 1 ? 0xedb88320 ^ (c >>> 1) : c >>> 1;
+    return c;
+});
+
+function crc32(buffer) {
+    let crc = -1;
+    for (let i = 0; i < buffer.length; i++) crc = CRC_TABLE[(crc ^ buffer[i]) & 0xff] ^ (crc >>> 8);
+    return (crc ^ -1) >>> 0;
+}
+
+function paeth(a, b, c) {
+    const p = a + b - c;
+    const pa = Math.abs(p - a);
+    const pb = Math.abs(p - b);
+    const pc = Math.abs(p - c);
+    if (pa <= pb && pa <= pc) return a;
+    return pb <= pc ? b : c;
+}
+
+// PNG filter predictors: none, sub, up, average, paeth
+function predict(filter, a, b, c) {
+    if (filter === 0) return 0;
+    if (filter === 1) return a;
+    if (filter === 2) return b;
+    if (filter === 3) return (a + b) >> 1;
+    return paeth(a, b, c);
+}
+
+/**
+ * One-time mirror of the 604 Madani page images into QURAN_PAGES_DIR, so wird
+ * and hadith-with-page sends read local files instead of raw.githubusercontent.com.
+ *
+ * Resumable: pages whose file matches the manifest (size + sha256) are skipped,
+ * and each download is written to a .part file and renamed once verified.
+ */
+class QuranMirrorService {
+    static CONCURRENCY = CONCURRENCY;
+    static MAX_WIDTH = MAX_WIDTH;
+
+    static sha256(buffer) {
+        return crypto.createHash('sha256').update(buffer).digest('hex');
+    }
+
+    static pngChunk(type, data) {
+        const head = Buffer.alloc(8);
+        head.writeUInt32BE(data.length, 0);
+        head.write(type, 4, 'ascii');
+        const crc = Buffer.alloc(4);
+        crc.writeUInt32BE(crc32(Buffer.concat([head.subarray(4), data])), 0);
+        return Buffer.concat([head, data, crc]);
+    }
+
+    /**
+     * PNG signature at the start and an IEND chunk at the end (catches truncated downloads)
+     */
+    static isCompletePng(buffer) {
+        if (!Buffer.isBuffer(buffer) || buffer.length < PNG_SIGNATURE.length + 12) return false;
+        if (!buffer.subarray(0, 8).equals(PNG_SIGNATURE)) return false;
+        return buffer.toString('ascii', buffer.length - 8, buffer.length - 4) === 'IEND';
+    }
+
+    static readChunks(buffer) {
+        const chunks = [];
+        let offset = PNG_SIGNATURE.length;
+        while (offset + 12 <= buffer.length) {
+            const length = buffer.readUInt32BE(offset);
+            chunks.push({
+                type: buffer.toString('ascii', offset + 4, offset + 8),
+                data: buffer.subarray(offset + 8, offset + 8 + length),
+                raw: buffer.subarray(offset, offset + 12 + length)
+            });
+            offset += 12 + length;
+        }
+        return chunks;
+    }
+
+    /**
+     * Unfiltered 8-bit pixels ({width, height, channels, pixels}), palettes expanded
+     * to RGB(A). null for what the resampler does not handle: other bit depths,
+     * interlacing, colour-key transparency.
+     */
+    static decodePng(chunks) {
+        const header = chunks.find(c => c.type === 'IHDR')?.data;
+        if (!header || header.length < 13) return null;
+        const width = header.readUInt32BE(0);
+        const height = header.readUInt32BE(4);
+        const colorType = header[9];
+        let channels = CHANNELS[colorType];
+        if (header[8] !== 8 || header[12] !== 0 || !channels) return null;
+        if (colorType !== 3 && chunks.some(c => c.type === 'tRNS')) return null;
+
+        const raw = zlib.inflateSync(Buffer.concat(chunks.filter(c => c.type === 'IDAT').map(c => c.data)));
+        const stride = width * channels;
+        if (raw.length < (stride + 1) * height) return null;
+
+        let pixels = Buffer.alloc(stride * height);
+        for (let y = 0; y < height; y++) {
+            const filter = raw[y * (stride + 1)];
+            if (filter > 4) return null;
+            const input = y * (stride + 1) + 1;
+            const row = y * stride;
+            for (let i = 0; i < stride; i++) {
+                const a = i >= channels ? pixels[row + i - channels] : 0;
+                const b = y ? pixels[row - stride + i] : 0;
+                const c = y && i >= channels ? pixels[row - stride + i - channels] : 0;
+                pixels[row + i] = (raw[input + i] + predict(filter, a, b, c)) & 0xff;
+            }
+        }
+
+        if (colorType === 3) {
+            const palette = chunks.find(c => c.type === 'PLTE')?.data;
+            if (!palette) return null;
+            const alpha = chunks.find(c => c.type === 'tRNS')?.data;
+            channels = alpha ? 4 : 3;
+            const expanded = Buffer.alloc(width * height * channels);
+            for (let i = 0; i < pixels.length; i++) {
+                const index = pixels[i];
+                palette.copy(expanded, i * channels, index * 3, index * 3 + 3);
+                if (alpha) expanded[i * channels + 3] = index < alpha.length ? alpha[index] : 255;
+            }
+            pixels = expanded;
+        }
+
+        return { width, height, channels, pixels };
+    }
+
+    /**
+     * Downscale to `width` by averaging the source pixels under each target pixel
+     */
+    static resizePixels(image, width) {
+        const { channels } = image;
+        const height = Math.max(1, Math.round(image.height * width / image.width));
+        const pixels = Buffer.alloc(width * height * channels);
+        const sx = image.width / width;
+        const sy = image.height / height;
+        const sums = new Float64Array(channels);
+
+        for (let y = 0; y < height; y++) {
+            const y0 = Math.floor(y * sy);
+            const y1 = Math.max(y0 + 1, Math.floor((y + 1) * sy));
+            for (let x = 0; x < width; x++) {
+                const x0 = Math.floor(x * sx);
+                const x1 = Math.max(x0 + 1, Math.floor((x + 1) * sx));
+                sums.fill(0);
+                for (let v = y0; v < y1; v++) {
+                    let offset = (v * image.width + x0) * channels;
+                    for (let u = x0; u < x1; u++) {
+                        for (let k = 0; k < channels; k++) sums[k] += image.pixels[offset++];
+                    }
+                }
+                const count = (y1 - y0) * (x1 - x0);
+                const out = (y * width + x) * channels;
+                for (let k = 0; k < channels; k++) pixels[out + k] = Math.round(sums[k] / count);
+            }
+        }
+        return { width, height, channels, pixels };
+    }
+
+    /**
+     * Encode 8-bit pixels, picking per row the filter with the smallest output
+     * (the usual minimum-sum-of-absolute-differences heuristic)
+     */
+    static encodePng(image, extraChunks = []) {
+        const { width, height, channels, pixels } = image;
+        const stride = width * channels;
+        const filtered = Buffer.alloc((stride + 1) * height);
+        const candidates = Array.from({ length: 5 }, () => Buffer.alloc(stride));
+
+        for (let y = 0; y < height; y++) {
+            const row = y * stride;
+            let best = 0;
+            let bestScore = Infinity;
+            for (let filter = 0; filter < 5; filter++) {
+                const out = candidates[filter];
+                let score = 0;
+                for (let i = 0; i < stride; i++) {
+                    const a = i >= channels ? pixels[row + i - channels] : 0;
+                    const b = y ? pixels[row - stride + i] : 0;
+                    const c = y && i >= channels ? pixels[row - stride + i - channels] : 0;
+                    const value = (pixels[row + i] - predict(filter, a, b, c)) & 0xff;
+                    out[i] = value;
+                    score += value < 128 ? value : 256 - value;
+                }
+                if (score < bestScore) {
+                    best = filter;
+                    bestScore = score;
+                }
+            }
+            filtered[y * (stride + 1)] = best;
+            candidates[best].copy(filtered, y * (stride + 1) + 1);
+        }
+
+        const header = Buffer.alloc(13);
+        header.writeUInt32BE(width, 0);
+        header.writeUInt32BE(height, 4);
+        header[8] = 8;
+        header[9] = COLOR_TYPES[channels];
+        return Buffer.concat([
+            PNG_SIGNATURE,
+            this.pngChunk('IHDR', header),
+            ...extraChunks.map(c => c.raw),
+            this.pngChunk('IDAT', zlib.deflateSync(filtered, { level: 9, memLevel: 9 })),
+            this.pngChunk('IEND', Buffer.alloc(0))
+        ]);
+    }
+
+    /**
+     * Send-ready variant of a page. Pages wider than maxWidth are downscaled;
+     * the rest are recompressed losslessly (IDAT chunks merged and deflated
+     * again at level 9, text/time chunks dropped). Returns null when that is
+     * not smaller.
+     */
+    static optimizePng(buffer, { maxWidth = MAX_WIDTH } = {}) {
+        const chunks = this.readChunks(buffer);
+        if (!chunks.some(c => c.type === 'IDAT')) return null;
+
+        const header = chunks.find(c => c.type === 'IHDR')?.data;
+        const image = maxWidth && header && header.readUInt32BE(0) > maxWidth ? this.decodePng(chunks) : null;
+        let optimized;
+        if (image) {
+            optimized = this.encodePng(this.resizePixels(image, maxWidth), chunks.filter(c => COLOR_CHUNKS.has(c.type)));
+        } else {
+            const parts = [PNG_SIGNATURE];
+            const idat = [];
+            let idatAt = -1;
+            for (const chunk of chunks) {
+                if (chunk.type === 'IDAT') {
+                    if (idatAt === -1) idatAt = parts.length;
+                    idat.push(chunk.data);
+                } else if (!DROPPED_CHUNKS.has(chunk.type)) {
+                    parts.push(chunk.raw);
+                }
+            }
+            const pixels = zlib.inflateSync(Buffer.concat(idat));
+            parts.splice(idatAt, 0, this.pngChunk('IDAT', zlib.deflateSync(pixels, { level: 9, memLevel: 9 })));
+            optimized = Buffer.concat(parts);
+        }
+
+        return optimized.length < buffer.length ? optimized : null;
+    }
+
+    static async loadManifest(dir) {
+        try {
+            return JSON.parse(await fs.promises.readFile(path.join(dir, MANIFEST), 'utf8'));
+        } catch (e) {
+            return {};
+        }
+    }
+
+    static async saveManifest(dir, manifest) {
+        const file = path.join(dir, MANIFEST);
+        await fs.promises.writeFile(`${file}.part`, JSON.stringify(manifest, null, 1));
+        await fs.promises.rename(`${file}.part`, file);
+    }
+
+    static async writeAtomic(file, buffer) {
+        await fs.promises.writeFile(`${file}.part`, buffer);
+        await fs.promises.rename(`${file}.part`, file);
+    }
+
+    /**
+     * Whether the mirrored file still matches its manifest entry
+     */
+    static async verify(file, entry) {
+        if (!entry) return false;
+        try {
+            const buffer = await fs.promises.readFile(file);
+            return buffer.length === entry.size && this.sha256(buffer) === entry.sha256;
+        } catch (e) {
+            return false;
+        }
+    }
+
+    static async download(page) {
+        let lastError = null;
+        for (let attempt = 1; attempt <= RETRIES; attempt++) {
+            try {
+                const res = await httpClient.get(QuranService.pageUrl(page), { responseType: 'arraybuffer' });
+                const buffer = Buffer.from(res.data);
+                if (!this.isCompletePng(buffer)) throw new Error('incomplete PNG');
+                return buffer;
+            } catch (error) {
+                lastError = error;
+            }
+        }
+        throw lastError;
+    }
+
+    /**
+     * Mirror (or resume mirroring) the pages
+     * @returns {Promise<{downloaded: number, verified: number, optimized: number, failed: number[], bytes: number, ms: number}>}
+     */
+    static async mirror({ dir = QuranService.pagesDir, pages = null, concurrency = CONCURRENCY, optimize = false, maxWidth = MAX_WIDTH, force = false, onProgress = null } = {}) {
+        const started = Date.now();
+        const queue = pages ? pages.slice() : Array.from({ length: QuranService.totalPages }, (_, i) => i + 1);
+        const total = queue.length;
+        const stats = { downloaded: 0, verified: 0, optimized: 0, failed: [], bytes: 0 };
+        const report = onProgress || ((s, done) => {
+            if (done % 50 === 0 || done === total) console.log(`📖 [QuranMirror] ${done}/${total} pages (${s.downloaded} downloaded, ${s.failed.length} failed)`);
+        });
+
+        await fs.promises.mkdir(dir, { recursive: true });
+        const manifest = await this.loadManifest(dir);
+        let done = 0;
+        let checkpoint = Promise.resolve();
+        const save = () => {
+            checkpoint = checkpoint.then(() => this.saveManifest(dir, manifest));
+            return checkpoint;
+        };
+
+        const mirrorPage = async (page) => {
+            const file = path.join(dir, `${page}.png`);
+            const optimizedFile = path.join(dir, `${page}.opt.png`);
+            let entry = manifest[page];
+            let buffer = null;
+
+            if (!force && await this.verify(file, entry)) {
+                stats.verified++;
+            } else {
+                buffer = await this.download(page);
+                // A variant of the previous bytes must not outlive them
+                await fs.promises.rm(optimizedFile, { force: true });
+                await this.writeAtomic(file, buffer);
+                entry = { sha256: this.sha256(buffer), size: buffer.length };
+                manifest[page] = entry;
+                stats.downloaded++;
+                stats.bytes += buffer.length;
+            }
+
+            // Redo the variant when the page changed, the file is off or the width limit moved
+            if (optimize && (buffer || entry.optimized?.maxWidth !== maxWidth || !await this.verify(optimizedFile, entry.optimized))) {
+                const optimized = this.optimizePng(buffer || await fs.promises.readFile(file), { maxWidth });
+                if (optimized) {
+                    await this.writeAtomic(optimizedFile, optimized);
+                    entry.optimized = { sha256: this.sha256(optimized), size: optimized.length, maxWidth };
+                    stats.optimized++;
+                } else {
+                    await fs.promises.rm(optimizedFile, { force: true });
+                    delete entry.optimized;
+                }
+            }
+        };
+
+        const worker = async () => {
+            while (queue.length) {
+                const page = queue.shift();
+                try {
+                    await mirrorPage(page);
+                } catch (error) {
+                    console.error(`❌ [QuranMirror] Page ${page} failed:`, error.message);
+                    stats.failed.push(page);
+                }
+                done++;
+                report({ ...stats }, done);
+                // Checkpoint so an interrupted run resumes close to where it stopped
+                if (done % 25 === 0) await save();
+            }
+        };
+
+        await Promise.all(Array.from({ length: Math.max(1, concurrency) }, worker));
+        await save();
+
+        stats.failed.sort((a, b) => a - b);
+        stats.ms = Date.now() - started;
+        console.log(`✅ [QuranMirror] ${total - stats.failed.length}/${total} pages mirrored in ${stats.ms}ms`);
+        return stats;
+    }
+}
+
+module.exports = QuranMirrorService;
+module.exports.crc32 = crc32;
@@ -1,3 +1,9 @@
+const fs = require('fs');
+const path = require('path');
+
+const TOTAL_PAGES = 604;
+const PAGES_DIR = process.env.QURAN_PAGES_DIR || path.join(__dirname, '../../data/quran-pages');
+
 class QuranService {
     constructor() {
         // Mapping of Juz to Start Page (Madani Mushaf)
@@ -6,7 +12,38 @@ class QuranService {
             11: 202, 12: 222, 13: 242, 14: 262, 15: 282, 16: 302, 17: 322, 18: 342, 19: 362, 20: 382,
             21: 402, 22: 422, 23: 442, 24: 462, 25: 482, 26: 502, 27: 522, 28: 542, 29: 562, 30: 582
         };
-        // Total pages: 604
+        this.totalPages = TOTAL_PAGES;
+        // Local mirror filled by `npm run mirror-quran` (see QuranMirrorService)
+        this.pagesDir = PAGES_DIR;
+    }
+
+    pageUrl(page) {
+        // Source: https://github.com/Five-Prayers/quran-pages (Public Repo)
+        return `https://raw.githubusercontent.com/Five-Prayers/quran-pages/main/quran_pages/${page}.png`;
+    }
+
+    /**
+     * Mirrored file for a page (the recompressed variant when there is one), or null
+     */
+    localPage(page) {
+        for (const name of [`${page}.opt.png`, `${page}.png`]) {
+            const file = path.join(this.pagesDir, name);
+            if (fs.existsSync(file)) return file;
+        }
+        return null;
+    }
+
+    /**
+     * Media payload for sending a page: the local mirror, else the media cache, else the URL
+     */
+    async getPageMedia(page) {
+        const local = this.localPage(page);
+        if (local) return { url: local };
+
+        const RemoteMediaService = require('./RemoteMediaService');
+        const url = this.pageUrl(page);
+        const cached = await RemoteMediaService.fetchImageFile(url);
+        return cached ? { url: cached } : url;
     }
 
     /**
@@ -20,14 +57,12 @@ class QuranService {
         }
 
         const startPage = this.juzStartPages[juzNumber];
-        const nextJuzStart = this.juzStartPages[juzNumber + 1] || 605;
+        const nextJuzStart = this.juzStartPages[juzNumber + 1] || TOTAL_PAGES + 1;
         const endPage = nextJuzStart - 1;
 
         const imageUrls = [];
-        // Using a reliable GitHub raw source for Quran pages (Madani)
         for (let page = startPage; page <= endPage; page++) {
-            // Source: https://github.com/Five-Prayers/quran-pages (Public Repo)
-            imageUrls.push(`https://raw.githubusercontent.com/Five-Prayers/quran-pages/main/quran_pages/${page}.png`);
+            imageUrls.push(this.pageUrl(page));
         }
 
         return {
@@ -38,9 +73,12 @@ class QuranService {
         };
     }
 
+    getRandomPage() {
+        return Math.floor(Math.random() * TOTAL_PAGES) + 1;
+    }
+
     getRandomPageImage() {
-        const page = Math.floor(Math.random() * 604) + 1;
-        return `https://raw.githubusercontent.com/Five-Prayers/quran-pages/main/quran_pages/${page}.png`;
+        return this.pageUrl(this.getRandomPage());
     }
 }
 
@@ -1,52 +1,69 @@
-const axios = require('axios');
+const fs = require('fs');
+const httpClient = require('./httpClient');
+const MediaCacheService = require('./MediaCacheService');
 
 class RemoteMediaService {
     static USER_AGENT = 'WaselMediaFetcher/1.0 (https://localhost; contact: admin@wasel.local)';
 
-    static async fetchImageBuffer(url) {
+    /**
+     * Path of a local copy of a remote image (downloaded once, then served from the media cache)
+     */
+    static async fetchImageFile(url) {
         if (!url || typeof url !== 'string') return null;
 
         try {
-            const res = await axios.get(url, {
-                responseType: 'arraybuffer',
-                timeout: 20000,
-                maxRedirects: 5,
-                validateStatus: () => true,
-                headers: {
-                    'User-Agent': this.USER_AGENT
-                }
+            const file = await MediaCacheService.get(url, {
+                accept: 'image/',
+                headers: { 'User-Agent': this.USER_AGENT }
             });
+            return file ? file.path : null;
+        } catch (e) {
+            console.error(`❌ [RemoteMedia] Failed to cache ${url}:`, e.message);
+            return null;
+        }
+    }
 
-            if (res.status < 200 || res.status >= 400) return null;
-            const contentType = String(res.headers?.['content-type'] || '');
-            if (!contentType.startsWith('image/')) return null;
+    static async fetchImageBuffer(url) {
+        const file = await this.fetchImageFile(url);
+        if (!file) return null;
 
-            return Buffer.from(res.data);
+        try {
+            return await fs.promises.readFile(file);
         } catch (e) {
             return null;
         }
     }
 
-    static async isImageUrlReachable(url) {
+    /**
+     * { status, contentType } of a one-byte request for the URL, or null when it
+     * could not be asked (timeout, network error, open circuit)
+     */
+    static async probeImageUrl(url) {
         try {
-            const res = await axios.get(url, {
+            const res = await httpClient.get(url, {
                 responseType: 'arraybuffer',
-                timeout: 12000,
-                maxRedirects: 5,
                 validateStatus: () => true,
                 headers: {
                     'User-Agent': this.USER_AGENT,
                     Range: 'bytes=0-0'
                 }
             });
-
-            if (res.status < 200 || res.status >= 400) return false;
-            const contentType = String(res.headers?.['content-type'] || '');
-            return contentType.startsWith('image/');
+            return { status: res.status, contentType: String(res.headers?.['content-type'] || '') };
         } catch (e) {
-            return false;
+            return null;
         }
     }
+
+    /**
+     * true/false when the server answered; null when it could not be asked
+     * (timeout, network error, open circuit), so callers do not cache a guess
+     */
+    static async isImageUrlReachable(url) {
+        const probe = await this.probeImageUrl(url);
+        if (!probe) return null;
+        if (probe.status < 200 || probe.status >= 400) return false;
+        return probe.contentType.startsWith('image/');
+    }
 }
 
 module.exports = RemoteMediaService;
@@ -0,0 +1,74 @@
+const fs = require('fs');
+const { swapDatabase, dbPath } = require('../database/db');
+const { stageBackup, validateBackup } = require('../database/restore');
+const writeBuffer = require('../database/writeBuffer');
+const ContentDeckService = require('./ContentDeckService');
+const ContentService = require('./ContentService');
+const SchedulerService = require('./SchedulerService');
+const MessageService = require('./baileys/MessageService');
+
+class RestoreService {
+    static restoring = false;
+
+    /**
+     * Restore the live database from an uploaded backup without restarting the server.
+     * 1. stage + validate (integrity_check, schema version, migrations) in a side file
+     * 2. quiesce the scheduler and the message queue
+     * 3. swap the file and reopen connections, then resume
+     * @param {string} uploadPath - Uploaded .sqlite or .sqlite.gz file
+     * @returns {Promise<{schemaVersion: number, migratedTo: number, timings: object}>}
+     */
+    static async restoreFromFile(uploadPath) {
+        if (this.restoring) {
+            throw new Error('A restore is already in progress');
+        }
+        this.restoring = true;
+
+        // Side file next to the database so the final rename stays on one filesystem
+        const sidePath = `${dbPath}.restore-${Date.now()}`;
+        const timings = {};
+        const started = Date.now();
+        let mark = started;
+        const lap = (name) => {
+            const now = Date.now();
+            timings[name] = now - mark;
+            mark = now;
+        };
+
+        let quiesced = false;
+        try {
+            await stageBackup(uploadPath, sidePath);
+            lap('stageMs');
+
+            const validation = await validateBackup(sidePath);
+            lap('validateMs');
+
+            await Promise.all([SchedulerService.pause(), MessageService.pause()]);
+            quiesced = true;
+            // Buffered writes belong to the database being replaced
+            await writeBuffer.flush();
+            lap('quiesceMs');
+
+            await swapDatabase(sidePath);
+            // Deck cursors and the content catalog now come from the restored file
+            ContentDeckService.clear();
+            ContentService.invalidateCatalog();
+            lap('swapMs');
+
+            timings.totalMs = Date.now() - started;
+            console.log(`♻️ [Restore] Database restored (schema v${validation.schemaVersion} → v${validation.migratedTo}) in ${timings.totalMs}ms`, timings);
+
+            return { ...validation, timings };
+        } finally {
+            if (quiesced) {
+                SchedulerService.resume();
+                MessageService.resume();
+            }
+            await fs.promises.rm(sidePath, { force: true });
+            await fs.promises.rm(uploadPath, { force: true });
+            this.restoring = false;
+        }
+    }
+}
+
+module.exports = RestoreService;
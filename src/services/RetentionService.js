@@ -0,0 +1,185 @@
+const cron = require('node-cron');
+const { db } = require('../database/db');
+
+const envInt = (name, fallback) => {
+    const value = parseInt(process.env[name], 10);
+    return Number.isFinite(value) ? value : fallback;
+};
+
+const BATCH_SIZE = envInt('RETENTION_BATCH_SIZE', 500);
+const BATCH_PAUSE_MS = envInt('RETENTION_BATCH_PAUSE_MS', 50);
+const MAX_BATCHES = envInt('RETENTION_MAX_BATCHES', 2000);
+const VACUUM_PAGES = envInt('RETENTION_VACUUM_PAGES', 2000);
+const SCHEDULE_LOG_DAYS = envInt('RETENTION_SCHEDULE_LOG_DAYS', 30);
+
+/**
+ * One policy per append-only table.
+ * column: date or datetime column compared against the cutoff date (YYYY-MM-DD)
+ * keepDays: rows older than this are removed (0 disables the policy)
+ * rollup: dimension kept in log_daily_rollups before rows are deleted
+ * where: extra condition a row must also match to be removed
+ */
+const POLICIES = [
+    { table: 'hadith_schedule_log', column: 'date', keepDays: SCHEDULE_LOG_DAYS, rollup: 'config_id' },
+    { table: 'selected_adhkar_schedule_log', column: 'date', keepDays: SCHEDULE_LOG_DAYS, rollup: 'config_id' },
+    { table: 'custom_schedule_log', column: 'date', keepDays: SCHEDULE_LOG_DAYS, rollup: 'job_id' },
+    { table: 'activity_logs', column: 'created_at', keepDays: envInt('RETENTION_ACTIVITY_LOG_DAYS', 180), rollup: 'action' },
+    { table: 'prayer_times_cache', column: 'prayer_date', keepDays: envInt('RETENTION_PRAYER_CACHE_DAYS', 2) },
+    // YYYY-MM compares below any day of its own month: keep > 31 days so the current month survives
+    { table: 'prayer_times_monthly', column: 'month', keepDays: 62 },
+    { table: 'notifications', column: 'created_at', keepDays: envInt('RETENTION_NOTIFICATIONS_DAYS', 90), where: 'is_read = 1' }
+];
+
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+class RetentionService {
+    static running = false;
+    static lastReport = null;
+    static rollupsEnabled = process.env.RETENTION_ROLLUPS !== 'false';
+
+    static init() {
+        // Daily purge + compaction, off-peak
+        cron.schedule(process.env.RETENTION_CRON || '15 3 * * *', async () => {
+            await this.run();
+        });
+
+        // Keep the -wal file from growing between daily runs
+        cron.schedule('7 * * * *', async () => {
+            try {
+                await db.exec('PRAGMA wal_checkpoint(PASSIVE)');
+            } catch (error) {
+                console.warn('⚠️ [Retention] WAL checkpoint failed:', error.message);
+            }
+        });
+
+        console.log('✅ Retention service initialized');
+    }
+
+    static getPolicies() {
+        return POLICIES.map(p => ({ ...p, rollup: this.rollupsEnabled ? p.rollup || null : null }));
+    }
+
+    static cutoffFor(policy, now = new Date()) {
+        const cutoff = new Date(now.getTime() - policy.keepDays * 24 * 60 * 60 * 1000);
+        return cutoff.toISOString().slice(0, 10);
+    }
+
+    /**
+     * Remove (and optionally roll up) one batch of expired rows in a single transaction.
+     * The batch's rowids are collected first (through the date index) so the rollup
+     * counts exactly the rows that are deleted.
+     * @returns {Promise<number>} rows deleted
+     */
+    static async purgeBatch(policy, cutoff, batchSize = BATCH_SIZE) {
+        const { table, column } = policy;
+        const condition = `${column} < ?${policy.where ? ` AND ${policy.where}` : ''}`;
+
+        return db.transaction(async (tx) => {
+            await tx.run('CREATE TEMP TABLE IF NOT EXISTS retention_batch (id INTEGER PRIMARY KEY)');
+            await tx.run('DELETE FROM temp.retention_batch');
+            const selected = await tx.run(
+                `INSERT INTO temp.retention_batch (id) SELECT rowid FROM ${table} WHERE ${condition} LIMIT ?`,
+                [cutoff, batchSize]
+            );
+            if (!selected.changes) return 0;
+
+            const inBatch = 'rowid IN (SELECT id FROM temp.retention_batch)';
+            if (this.rollupsEnabled && policy.rollup) {
+                await tx.run(
+                    `INSERT INTO log_daily_rollups (source, day, dimension, total)
+                     SELECT ?, substr(${column}, 1, 10), COALESCE(${policy.rollup}, ''), COUNT(*)
+                     FROM ${table} WHERE ${inBatch}
+                     GROUP BY 2, 3
+                     ON CONFLICT(source, day, dimension) DO UPDATE SET total = total + excluded.total`,
+                    [table]
+                );
+            }
+
+            const result = await tx.run(`DELETE FROM ${table} WHERE ${inBatch}`);
+            return result.changes;
+        });
+    }
+
+    static async purge(policy, { now = new Date(), batchSize = BATCH_SIZE } = {}) {
+        const cutoff = this.cutoffFor(policy, now);
+        let deleted = 0;
+        let batches = 0;
+
+        while (batches < MAX_BATCHES) {
+            const changes = await this.purgeBatch(policy, cutoff, batchSize);
+            if (changes > 0) {
+                deleted += changes;
+                batches++;
+            }
+            if (changes < batchSize) break;
+            // Let scheduler writes and requests in between batches
+            await sleep(BATCH_PAUSE_MS);
+        }
+
+        return { cutoff, deleted, batches };
+    }
+
+    /**
+     * Return free pages to the filesystem, refresh planner statistics and truncate the WAL
+     */
+    static async compact() {
+        const { auto_vacuum: autoVacuum } = await db.get('PRAGMA auto_vacuum');
+        const before = await db.get('PRAGMA freelist_count');
+
+        // 2 = INCREMENTAL; databases created before it was enabled need a one-off VACUUM
+        if (autoVacuum === 2) {
+            await db.exec(`PRAGMA incremental_vacuum(${VACUUM_PAGES})`);
+        }
+        await db.exec('PRAGMA optimize');
+        await db.exec('PRAGMA wal_checkpoint(TRUNCATE)');
+
+        const after = await db.get('PRAGMA freelist_count');
+        return {
+            incrementalVacuum: autoVacuum === 2,
+            freePagesBefore: before.freelist_count,
+            freePagesAfter: after.freelist_count
+        };
+    }
+
+    /**
+     * Apply every enabled policy, then compact
+     */
+    static async run(options = {}) {
+        if (this.running) {
+            console.log('⏳ [Retention] Previous run still in progress, skipping');
+            return null;
+        }
+        this.running = true;
+        const started = Date.now();
+
+        try {
+            const tables = {};
+            for (const policy of POLICIES) {
+                if (policy.keepDays <= 0) continue;
+                try {
+                    tables[policy.table] = await this.purge(policy, options);
+                } catch (error) {
+                    console.error(`❌ [Retention] ${policy.table} failed:`, error.message);
+                    tables[policy.table] = { error: error.message };
+                }
+            }
+
+            let compaction = null;
+            try {
+                compaction = await this.compact();
+            } catch (error) {
+                console.error('❌ [Retention] Compaction failed:', error.message);
+                compaction = { error: error.message };
+            }
+
+            const deleted = Object.values(tables).reduce((sum, t) => sum + (t.deleted || 0), 0);
+            this.lastReport = { at: new Date().toISOString(), ms: Date.now() - started, deleted, tables, compaction };
+            console.log(`🧹 [Retention] Removed ${deleted} expired rows in ${this.lastReport.ms}ms`);
+            return this.lastReport;
+        } finally {
+            this.running = false;
+        }
+    }
+}
+
+module.exports = RetentionService;
@@ -4,27 +4,54 @@ const crypto = require('crypto');
 const IslamicRemindersService = require('./IslamicRemindersService');
 const PrayerTimesService = require('./PrayerTimesService');
 const FastingService = require('./FastingService');
+const ArabicTextService = require('./ArabicTextService');
+const ContentEnrichmentService = require('./ContentEnrichmentService');
 const MessageService = require('./baileys/MessageService');
 const { db } = require('../database/db');
 
 class SchedulerService {
     static prayerJobs = new Map();
+    static paused = false;
+    static currentRun = null;
 
     static init() {
         console.log('Starting Scheduler Service...');
         // Every minute tasks (Reminders)
         cron.schedule('* * * * *', async () => {
-            await this.runScheduledTasks();
+            if (this.paused) return;
+            this.currentRun = this.runScheduledTasks();
+            try {
+                await this.currentRun;
+            } finally {
+                this.currentRun = null;
+            }
         });
 
         // Daily tasks (at midnight)
         cron.schedule('0 0 * * *', async () => {
+            if (this.paused) return;
             await this.checkSubscriptionExpirations();
         });
 
         console.log('✅ Scheduler initialized successfully');
     }
 
+    /**
+     * Stop starting new ticks and wait for the running one (used while the database is swapped)
+     */
+    static async pause() {
+        this.paused = true;
+        if (this.currentRun) {
+            await this.currentRun.catch(() => { });
+        }
+        console.log('⏸️ Scheduler paused');
+    }
+
+    static resume() {
+        this.paused = false;
+        console.log('▶️ Scheduler resumed');
+    }
+
     static async runScheduledTasks() {
         try {
             const configs = await db.all(`
@@ -253,6 +280,7 @@ class SchedulerService {
 
             const AdhkarService = require('./AdhkarService');
             const IslamicBackgroundService = require('./IslamicBackgroundService');
+            const ImageVariantService = require('./ImageVariantService');
 
             const category = String(config.selected_category || 'general');
             const item = await AdhkarService.getRandomAdhkar(category);
@@ -273,7 +301,8 @@ class SchedulerService {
             }
 
             if (mediaUrl) {
-                MessageService.addToQueue(config.session_id, phone, message, 'media', { mediaUrl, mediaType: 'image' });
+                const media = await ImageVariantService.getMedia(mediaUrl);
+                MessageService.addToQueue(config.session_id, phone, message, 'media', { ...media, mediaType: 'image' });
             } else {
                 MessageService.addToQueue(config.session_id, phone, message, 'text');
             }
@@ -406,7 +435,7 @@ class SchedulerService {
 
     static async checkUserFastingReminders(config) {
         try {
-            const status = FastingService.checkFastingDay();
+            const status = FastingService.checkFastingDay(new Date(), config.hijri_adjustment);
             const settings = await IslamicRemindersService.getFastingSettings(config.id);
             if (!settings) return;
 
@@ -462,30 +491,22 @@ class SchedulerService {
             let isLocal = false;
             const scheduleTime = options.scheduleTime ? String(options.scheduleTime) : null;
             const scheduleDate = options.scheduleDate ? String(options.scheduleDate) : null;
-            const usedHadithIds = new Set();
             const usedHadithHashes = new Set();
             const usedImageUrls = new Set();
-            const normalizeText = (t) => String(t || '').replace(/\s+/g, ' ').trim();
-            const hashText = (t) => {
-                const s = normalizeText(t);
-                if (!s) return '';
-                return crypto.createHash('sha1').update(s).digest('hex');
-            };
+            // Library items carry a precomputed hash; only external content is hashed here
+            const hashOf = (item) => item.content_hash || ArabicTextService.hash(item.content_ar || item.content);
 
             if (type === 'hadith' && scheduleTime && scheduleDate) {
                 try {
-                    const already = await db.get(
-                        'SELECT id FROM hadith_schedule_log WHERE config_id = ? AND date = ? AND send_time = ?',
-                        [config.id, scheduleDate, scheduleTime]
-                    );
-                    if (already) return;
-
+                    // One read for both the "already sent at this time" check and
+                    // today's hashes/images (external content and backgrounds still dedupe against them)
                     const rows = await db.all(
-                        'SELECT hadith_id, hadith_hash, image_url FROM hadith_schedule_log WHERE config_id = ? AND date = ?',
+                        'SELECT send_time, hadith_hash, image_url FROM hadith_schedule_log WHERE config_id = ? AND date = ?',
                         [config.id, scheduleDate]
                     );
+                    if ((rows || []).some(r => String(r?.send_time) === scheduleTime)) return;
+
                     for (const r of rows || []) {
-                        if (r?.hadith_id) usedHadithIds.add(String(r.hadith_id));
                         if (r?.hadith_hash) usedHadithHashes.add(String(r.hadith_hash));
                         if (r?.image_url) usedImageUrls.add(String(r.image_url));
                     }
@@ -524,10 +545,11 @@ class SchedulerService {
                 // Send Pages (Limit to first 5 pages for demo/performance, or handling bulk sending needed)
                 // Sending 20 images is risky for anti-spam. Suggest sending first 1-3 pages + Link to full juz
                 // For now, let's send configured number of pages (default 3)
-                const pagesToSend = juzData.images.slice(0, config.quran_pages_per_day || 3);
-                for (const imgUrl of pagesToSend) {
-                    await this.sendWhatsAppMessage(config.session_id, config.user_id, "", config.id, {
-                        mediaUrl: imgUrl,
+                // Pages come from the local mirror when it exists; the queue skips messages without text
+                const lastPage = Math.min(juzData.endPage, juzData.startPage + (config.quran_pages_per_day || 3) - 1);
+                for (let page = juzData.startPage; page <= lastPage; page++) {
+                    await this.sendWhatsAppMessage(config.session_id, config.user_id, `📖 صفحة ${page}`, config.id, {
+                        mediaUrl: await QuranService.getPageMedia(page),
                         mediaType: 'image'
                     });
                 }
@@ -545,58 +567,23 @@ class SchedulerService {
             if (sourcePreference === 'manual' || sourcePreference === 'mixed' || forceFullText || useLocalHadith) {
                 if (type === 'adhkar') {
                     console.log(`[Scheduler-Adhkar] Fetching manual adhkar for ${category} (ForceFull: ${forceFullText})`);
-                    // Fetch adhkar for morning/evening
-                    let allContent = await ContentService.getAllContent(type, category);
-                    console.log(`[Scheduler-Adhkar] Found ${allContent ? allContent.length : 0} items in library`);
-
-                    if (allContent && allContent.length > 0) {
-                        // Logic for Short vs Full
-                        if (config.text_length === 'short') {
-                            // Shuffle and pick 3
-                            const shuffled = allContent.sort(() => 0.5 - Math.random());
-                            allContent = shuffled.slice(0, 3);
-                        }
-
-                        const separator = '\n\n--------------------------------\n\n';
-                        let body = allContent.map(item => item.content_ar).join(separator);
-
-                        // Apply Headers/Footers for Full Mode
-                        if (config.text_length === 'full') {
-                            let headerTitle = '';
-                            if (category === 'morning') headerTitle = '🌅 أذكار الصباح كاملة';
-                            else if (category === 'evening') headerTitle = '🌙 أذكار المساء كاملة';
-                            else if (category === 'after_prayer') headerTitle = '📿 أذكار بعد الصلاة';
-                            
-                            const header = `========================\n${headerTitle}\n========================\n\n`;
-                            const footer = `\n\n========================\n🤍 تم بحمد الله\n========================`;
-                            body = header + body + footer;
-                        }
-
-                        content = {
-                            id: (config.text_length === 'short' ? 'short_set_' : 'full_set_') + category,
-                            content_ar: body,
-                            source: config.text_length === 'short' ? 'مقتطفات من الأذكار' : 'تم تجميع الأذكار'
-                        };
+                    // Pre-joined set from the in-memory catalog (rebuilt only when content changes)
+                    const set = await ContentService.getAdhkarSet(category, config.text_length);
+                    if (set) {
+                        content = set;
                         isLocal = true;
+                    } else {
+                        console.log(`[Scheduler-Adhkar] No ${category} adhkar in library`);
                     }
                 } else {
                     // For Hadith or other types, keep random
                     if (type === 'hadith') {
                         const book = (sourcePreference === 'bukhari' || sourcePreference === 'muslim') ? sourcePreference : null;
-                        const maxTries = (scheduleTime && scheduleDate) ? 30 : 1;
-                        for (let i = 0; i < maxTries; i++) {
-                            const row = await HadithService.getRandomHadith(book);
-                            if (!row) break;
-
-                            const h = hashText(row.content_ar || row.content);
-                            if (scheduleTime && scheduleDate) {
-                                if (row.id && usedHadithIds.has(String(row.id))) continue;
-                                if (h && usedHadithHashes.has(String(h))) continue;
-                            }
-
+                        // Per-config shuffled deck: no repeats until the whole pool has been sent
+                        const row = await HadithService.getRandomHadith(book, config.id);
+                        if (row) {
                             content = row;
                             isLocal = true;
-                            break;
                         }
                     } else {
                         content = await ContentService.getRandomContent(type, category);
@@ -618,7 +605,7 @@ class SchedulerService {
                     for (let i = 0; i < 10; i++) {
                         const external = await ExternalContentService.getDailyContent(config.media_preference || 'mixed', type, category);
                         if (!external) continue;
-                        const h = hashText(external.content_ar || external.content);
+                        const h = hashOf(external);
                         if (h && usedHadithHashes.has(String(h))) continue;
                         content = external;
                         isLocal = false;
@@ -658,12 +645,8 @@ class SchedulerService {
                     else if (category === 'evening') sourceLink = 'https://www.islambook.com/azkar/2/%D8%A3%D8%B0%D9%83%D8%A7%D8%B1-%D8%A7%D9%84%D9%85%D8%B3%D8%A7%D8%A1';
                     else sourceLink = 'https://www.islambook.com/azkar/1/%D8%A3%D8%B0%D9%83%D8%A7%D8%B1-%D8%A7%D9%84%D8%B5%D8%A8%D8%A7%D8%AD';
                 } else if (type === 'hadith' && (content.content_ar || content.content)) {
-                    // Generate Dorar.net search link - USE CLEANED SNIPPET (No Sanad)
-                    const text = content.content_ar || content.content;
-                    // Extract core text after "قال رسول الله ﷺ: " if present, or just use first 100 chars
-                    const coreText = text.includes('قال رسول الله ﷺ:') ? text.split('قال رسول الله ﷺ:')[1] : text;
-                    const snippet = coreText.substring(0, 100).replace(/[^\u0621-\u064A\s]/g, '').trim();
-                    sourceLink = `https://dorar.net/hadith/search?q=${encodeURIComponent(snippet)}`;
+                    // Library items store their Dorar.net link; external content derives it the same way
+                    sourceLink = ContentEnrichmentService.derive({ type: 'hadith', content_ar: content.content_ar || content.content }).source_url;
                 }
             }
 
@@ -693,25 +676,20 @@ class SchedulerService {
             if (type === 'hadith' && (config.hadith_media_mode === 'image' || config.hadith_media_mode === 'both')) {
                 const QuranService = require('./QuranService');
                 const IslamicBackgroundService = require('./IslamicBackgroundService');
-                const RemoteMediaService = require('./RemoteMediaService');
+                const ImageVariantService = require('./ImageVariantService');
 
                 const imageSource = config.hadith_image_source || 'quran_pages';
                 if (imageSource === 'islamic_backgrounds') {
                     const img = await IslamicBackgroundService.getBackground({ theme: config.hadith_image_theme || 'mixed', excludeUrls: Array.from(usedImageUrls) });
                     const pickedUrl = img?.url || null;
                     pickedImageUrlForLog = pickedUrl;
-                    const buffer = pickedUrl ? await RemoteMediaService.fetchImageBuffer(pickedUrl) : null;
-                    if (buffer) {
-                        sendOptions.mediaUrl = buffer;
-                    } else if (pickedUrl) {
-                        sendOptions.mediaUrl = pickedUrl;
-                    }
+                    // WhatsApp-sized variant, sent straight from the media cache file
+                    if (pickedUrl) Object.assign(sendOptions, await ImageVariantService.getMedia(pickedUrl));
                     sendOptions.mediaType = 'image';
                 } else {
-                    const url = QuranService.getRandomPageImage();
-                    pickedImageUrlForLog = url;
-                    const buffer = await RemoteMediaService.fetchImageBuffer(url);
-                    sendOptions.mediaUrl = buffer || url;
+                    const page = QuranService.getRandomPage();
+                    pickedImageUrlForLog = QuranService.pageUrl(page);
+                    sendOptions.mediaUrl = await QuranService.getPageMedia(page);
                     sendOptions.mediaType = 'image';
                 }
 
@@ -729,7 +707,7 @@ class SchedulerService {
 
             if (type === 'hadith' && scheduleTime && scheduleDate && sentCount > 0) {
                 const hadithId = content?.id ? String(content.id) : null;
-                const hadithHash = hashText(content.content_ar || content.content) || null;
+                const hadithHash = hashOf(content) || null;
                 try {
                     await db.run(
                         'INSERT OR IGNORE INTO hadith_schedule_log (config_id, date, send_time, hadith_id, hadith_hash, image_url) VALUES (?, ?, ?, ?, ?, ?)',
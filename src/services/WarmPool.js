@@ -0,0 +1,135 @@
+const RETRY_MS = parseInt(process.env.WARM_POOL_RETRY_MS || '60000', 10);
+
+/**
+ * Bounded pool of ready-to-use candidates from a slow source (search APIs).
+ * take() is O(1) and never waits: when the pool drops below lowWater a refill
+ * runs in the background (one at a time), and a failed or empty refill is not
+ * retried for retryMs so an outage does not turn into a request loop.
+ */
+class WarmPool {
+    static registry = new Map();
+
+    /**
+     * @param {string} name
+     * @param {object} options
+     * @param {Function} options.fill - async (wanted) => candidates
+     * @param {Function} [options.keyOf] - dedupe key of a candidate
+     */
+    constructor(name, { fill, keyOf = (value) => value, capacity = 20, lowWater = 5, ttlMs = 0, retryMs = RETRY_MS }) {
+        this.name = name;
+        this.fill = fill;
+        this.keyOf = keyOf;
+        this.capacity = capacity;
+        this.lowWater = lowWater;
+        this.ttlMs = ttlMs;
+        this.retryMs = retryMs;
+        this.clear();
+        WarmPool.registry.set(name, this);
+    }
+
+    clear() {
+        this.items = [];
+        this.keys = new Set();
+        this.filling = null;
+        this.lastAttemptAt = 0;
+        this.lastFillAt = null;
+        this.lastError = null;
+        this.backoff = false;
+        this.taken = 0;
+        this.misses = 0;
+    }
+
+    get size() {
+        return this.items.length;
+    }
+
+    /**
+     * Add candidates at random positions, so take() from the end is a random pick
+     */
+    add(values) {
+        let added = 0;
+        for (const value of values) {
+            if (this.items.length >= this.capacity) break;
+            if (value == null) continue;
+            const key = this.keyOf(value);
+            if (this.keys.has(key)) continue;
+            this.keys.add(key);
+            this.items.push({ value, key, at: Date.now() });
+            const j = Math.floor(Math.random() * this.items.length);
+            const last = this.items.length - 1;
+            [this.items[j], this.items[last]] = [this.items[last], this.items[j]];
+            added++;
+        }
+        return added;
+    }
+
+    /**
+     * Next candidate, or null when the pool is (still) empty
+     */
+    take() {
+        let entry = this.items.pop();
+        while (entry) {
+            this.keys.delete(entry.key);
+            if (!this.ttlMs || Date.now() - entry.at < this.ttlMs) break;
+            entry = this.items.pop();
+        }
+
+        if (this.items.length < this.lowWater) this.refill();
+
+        if (!entry) {
+            this.misses++;
+            return null;
+        }
+        this.taken++;
+        return entry.value;
+    }
+
+    /**
+     * Top the pool up in the background; concurrent callers share one run
+     */
+    refill() {
+        if (this.filling) return this.filling;
+        if (this.items.length >= this.capacity) return Promise.resolve(0);
+        if (this.backoff && Date.now() - this.lastAttemptAt < this.retryMs) return Promise.resolve(0);
+
+        this.lastAttemptAt = Date.now();
+        this.filling = (async () => {
+            try {
+                const values = await this.fill(this.capacity - this.items.length);
+                const added = this.add(Array.isArray(values) ? values : []);
+                this.lastFillAt = new Date().toISOString();
+                this.backoff = added === 0;
+                return added;
+            } catch (error) {
+                console.error(`❌ [WarmPool] ${this.name} refill failed:`, error.message);
+                this.lastError = { message: error.message, at: new Date().toISOString() };
+                this.backoff = true;
+                return 0;
+            } finally {
+                this.filling = null;
+            }
+        })();
+        return this.filling;
+    }
+
+    getState() {
+        return {
+            size: this.items.length,
+            capacity: this.capacity,
+            lowWater: this.lowWater,
+            filling: !!this.filling,
+            taken: this.taken,
+            misses: this.misses,
+            lastFillAt: this.lastFillAt,
+            lastError: this.lastError
+        };
+    }
+
+    static getStats() {
+        const pools = {};
+        for (const [name, pool] of this.registry) pools[name] = pool.getState();
+        return pools;
+    }
+}
+
+module.exports = WarmPool;
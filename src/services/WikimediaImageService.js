@@ -1,30 +1,88 @@
-const axios = require('axios');
+const httpClient = require('./httpClient');
+const RemoteMediaService = require('./RemoteMediaService');
+const WarmPool = require('./WarmPool');
+
+const COMMONS_API = 'https://commons.wikimedia.org/w/api.php';
+const RECENT_LIMIT = 100;
+const POOL_CAPACITY = parseInt(process.env.WIKIMEDIA_POOL_SIZE || '15', 10);
 
 class WikimediaImageService {
-    static async getRandomIslamicImage() {
-        const queries = [
-            'incategory:"Mosques" filetype:bitmap',
-            'incategory:"Islamic architecture" filetype:bitmap',
-            'incategory:"Islamic geometric patterns" filetype:bitmap',
-            'incategory:"Kaaba" filetype:bitmap',
-            'incategory:"Al-Masjid an-Nabawi" filetype:bitmap',
-            'incategory:"Al-Masjid al-Haram" filetype:bitmap'
-        ];
+    // Images handed out before, served while every pool is empty
+    static recent = [];
 
-        for (let attempt = 0; attempt < 4; attempt++) {
-            const q = queries[Math.floor(Math.random() * queries.length)];
-            const result = await this.searchCommonsImage(q);
-            if (result) return result;
+    static remember(image) {
+        if (this.recent.some(r => r.url === image.url)) return;
+        this.recent.push(image);
+        if (this.recent.length > RECENT_LIMIT) this.recent.shift();
+    }
+
+    static getStale() {
+        if (!this.recent.length) return null;
+        return this.recent[Math.floor(Math.random() * this.recent.length)];
+    }
+
+    static QUERIES = [
+        'incategory:"Mosques" filetype:bitmap',
+        'incategory:"Islamic architecture" filetype:bitmap',
+        'incategory:"Islamic geometric patterns" filetype:bitmap',
+        'incategory:"Kaaba" filetype:bitmap',
+        'incategory:"Al-Masjid an-Nabawi" filetype:bitmap',
+        'incategory:"Al-Masjid al-Haram" filetype:bitmap'
+    ];
+
+    // One warm pool of reachable images per search theme
+    static pools = new Map();
+
+    static getPool(searchQuery) {
+        let pool = this.pools.get(searchQuery);
+        if (!pool) {
+            pool = new WarmPool(`wikimedia:${searchQuery}`, {
+                fill: () => this.fetchValidated(searchQuery),
+                keyOf: image => image.url,
+                capacity: POOL_CAPACITY,
+                lowWater: Math.ceil(POOL_CAPACITY / 3)
+            });
+            this.pools.set(searchQuery, pool);
         }
+        return pool;
+    }
 
-        const fallback = await this.searchCommonsImage('incategory:"Mosques" filetype:bitmap');
-        if (fallback) return fallback;
+    /**
+     * Search results whose image actually answers, for filling a pool in the background
+     */
+    static async fetchValidated(searchQuery) {
+        const candidates = await this.searchCommonsCandidates(searchQuery);
+        const checked = await Promise.all(candidates.map(async image => (
+            await RemoteMediaService.isImageUrlReachable(image.url) ? image : null
+        )));
+        return checked.filter(Boolean);
+    }
 
-        return null;
+    /**
+     * Never waits on Commons: takes from the first theme pool that has an image
+     * (themes tried in random order) and lets empty pools refill in the background
+     */
+    static async getRandomIslamicImage() {
+        const queries = this.QUERIES.slice().sort(() => 0.5 - Math.random());
+        for (const q of queries) {
+            const image = this.getPool(q).take();
+            if (image) {
+                this.remember(image);
+                return image;
+            }
+        }
+        return this.getStale();
     }
 
     static async searchCommonsImage(searchQuery) {
-        const url = 'https://commons.wikimedia.org/w/api.php';
+        const candidates = await this.searchCommonsCandidates(searchQuery);
+        if (!candidates.length) return null;
+        const picked = candidates[Math.floor(Math.random() * candidates.length)];
+        this.remember(picked);
+        return picked;
+    }
+
+    static async searchCommonsCandidates(searchQuery) {
         const params = {
             action: 'query',
             format: 'json',
@@ -40,16 +98,14 @@ class WikimediaImageService {
 
         let data;
         try {
-            const res = await axios.get(url, { params, timeout: 7000 });
+            const res = await httpClient.get(COMMONS_API, { params });
             data = res.data;
         } catch (e) {
-            return null;
+            return [];
         }
 
         const pages = data?.query?.pages ? Object.values(data.query.pages) : [];
-        if (!pages.length) return null;
-
-        const candidates = pages
+        return pages
             .map(p => {
                 const ii = p?.imageinfo?.[0];
                 const imgUrl = ii?.thumburl || ii?.url;
@@ -73,9 +129,6 @@ class WikimediaImageService {
                 };
             })
             .filter(Boolean);
-
-        if (!candidates.length) return null;
-        return candidates[Math.floor(Math.random() * candidates.length)];
     }
 }
 
@@ -6,6 +6,8 @@ class MessageService {
     constructor() {
         this.messageQueue = [];
         this.processing = false;
+        this.paused = false;
+        this.inflight = null;
     }
 
     /**
@@ -117,8 +119,9 @@ class MessageService {
      * @param {Buffer|string} media - Media buffer or URL
      * @param {string} caption - Caption text
      * @param {string} type - Media type: 'image', 'video', 'document'
+     * @param {object} options - jpegThumbnail: base64 preview for images
      */
-    async sendMedia(sessionId, phoneNumber, media, caption = '', type = 'image') {
+    async sendMedia(sessionId, phoneNumber, media, caption = '', type = 'image', options = {}) {
         try {
             const session = sessionManager.getSession(sessionId);
 
@@ -155,6 +158,7 @@ class MessageService {
             // Set media based on type
             if (type === 'image') {
                 mediaMessage.image = formatMedia(media);
+                if (options.jpegThumbnail) mediaMessage.jpegThumbnail = options.jpegThumbnail;
             } else if (type === 'video') {
                 mediaMessage.video = formatMedia(media);
                 mediaMessage.mimetype = 'video/mp4';
@@ -213,6 +217,11 @@ class MessageService {
      * Process message queue with rate limiting
      */
     async processQueue() {
+        if (this.paused) {
+            this.processing = false;
+            return;
+        }
+
         if (this.messageQueue.length === 0) {
             this.processing = false;
             console.log('[MessageService] Queue processing complete. Queue is now empty.');
@@ -221,6 +230,8 @@ class MessageService {
 
         this.processing = true;
         const item = this.messageQueue.shift();
+        let itemDone;
+        this.inflight = new Promise(resolve => { itemDone = resolve; });
         
         console.log(`[MessageService] Processing queue item (${item.type}) for ${item.phoneNumber}. Remaining: ${this.messageQueue.length}`);
 
@@ -242,7 +253,8 @@ class MessageService {
                     item.phoneNumber,
                     item.options.mediaUrl,
                     item.message,
-                    item.options.mediaType || 'image'
+                    item.options.mediaType || 'image',
+                    item.options
                 );
             }
             
@@ -257,10 +269,30 @@ class MessageService {
             console.error(`[MessageService] Error processing queue item for ${item.phoneNumber}:`, error.message);
         }
 
+        this.inflight = null;
+        itemDone();
+
         // Process next item
         setImmediate(() => this.processQueue());
     }
 
+    /**
+     * Hold the queue (messages keep accumulating) and wait for the message being sent
+     */
+    async pause() {
+        this.paused = true;
+        if (this.inflight) await this.inflight;
+        console.log(`[MessageService] Queue paused (${this.messageQueue.length} waiting)`);
+    }
+
+    resume() {
+        this.paused = false;
+        console.log(`[MessageService] Queue resumed (${this.messageQueue.length} waiting)`);
+        if (!this.processing && this.messageQueue.length > 0) {
+            setImmediate(() => this.processQueue());
+        }
+    }
+
     /**
      * Format phone number to WhatsApp JID
      * Automatically converts Egyptian local numbers to international format
@@ -649,6 +649,7 @@ class SessionManager {
         this.healthCheckInterval = setInterval(async () => {
             try {
                 const { db } = require('../../database/db');
+                const writeBuffer = require('../../database/writeBuffer');
                 const sessions = await db.all('SELECT session_id, connected FROM whatsapp_sessions');
 
                 for (const session of sessions) {
@@ -663,13 +664,13 @@ class SessionManager {
                                 isNew: false,
                                 onConnected: async () => {
                                     console.log(`✅ [SessionManager-Health] Session ${session.session_id} revived`);
-                                    await db.run('UPDATE whatsapp_sessions SET connected = 1, last_connected = ? WHERE session_id = ?',
-                                        [new Date().toISOString(), session.session_id]);
+                                    writeBuffer.update('whatsapp_sessions', 'session_id', session.session_id,
+                                        { connected: 1, last_connected: new Date().toISOString() });
                                 }
                             }).catch(err => console.error(`[SessionManager-Health] Failed to revive ${session.session_id}:`, err.message));
                         } else {
                             console.log(`[SessionManager-Health] Session ${session.session_id} files missing. Marking as disconnected.`);
-                            await db.run('UPDATE whatsapp_sessions SET connected = 0 WHERE session_id = ?', [session.session_id]);
+                            writeBuffer.update('whatsapp_sessions', 'session_id', session.session_id, { connected: 0 });
                             await db.run('UPDATE islamic_reminders_config SET session_id = NULL WHERE session_id = ?', [session.session_id]);
                         }
                     }
@@ -686,6 +687,7 @@ class SessionManager {
     async restoreAllSessions() {
         try {
             const { db } = require('../../database/db');
+            const writeBuffer = require('../../database/writeBuffer');
             console.log('🔄 [SessionManager] Deep-restoring WhatsApp sessions from database...');
 
             const sessions = await db.all('SELECT * FROM whatsapp_sessions');
@@ -717,12 +719,12 @@ class SessionManager {
                     isNew: false,
                     onConnected: async (info) => {
                         console.log(`✅ [SessionManager] Session ${session.session_id} reconnected`);
-                        await db.run('UPDATE whatsapp_sessions SET connected = 1, last_connected = ? WHERE session_id = ?',
-                            [new Date().toISOString(), session.session_id]);
+                        writeBuffer.update('whatsapp_sessions', 'session_id', session.session_id,
+                            { connected: 1, last_connected: new Date().toISOString() });
                     },
                     onDisconnected: async (reason) => {
                         console.log(`⚠️ [SessionManager] Session ${session.session_id} offline`);
-                        await db.run('UPDATE whatsapp_sessions SET connected = 0 WHERE session_id = ?', [session.session_id]);
+                        writeBuffer.update('whatsapp_sessions', 'session_id', session.session_id, { connected: 0 });
                         // Note: Connection retry logic is inside createSession
                     }
                 }).catch(err => {
@@ -0,0 +1,243 @@
+const http = require('http');
+const https = require('https');
+const axios = require('axios');
+const CircuitBreaker = require('./CircuitBreaker');
+
+const TIMEOUT_MS = parseInt(process.env.HTTP_TIMEOUT_MS || '15000', 10);
+const MAX_PER_HOST = parseInt(process.env.HTTP_MAX_PER_HOST || '6', 10);
+const MAX_SOCKETS = parseInt(process.env.HTTP_MAX_SOCKETS || '64', 10);
+const MAX_RESPONSE_BYTES = parseInt(process.env.HTTP_MAX_RESPONSE_BYTES || String(20 * 1024 * 1024), 10);
+const MAX_REDIRECTS = 5;
+
+/**
+ * Shared outbound HTTP client for the external content services (hadith API,
+ * Wikimedia, Pexels/Pixabay, remote media).
+ *
+ * - keep-alive agents, so repeated calls to the same host reuse TLS connections
+ * - at most HTTP_MAX_PER_HOST requests in flight per host; the rest queue
+ * - one default timeout and response-size cap for every call
+ * - a circuit breaker per host: once an upstream keeps failing or stalling,
+ *   calls to it fail at once (error code ECIRCUITOPEN) and callers fall back
+ *   to cached content instead of waiting out the timeout
+ * - per-host request metrics for the admin API
+ */
+class HttpClient {
+    constructor() {
+        const agentOptions = {
+            keepAlive: true,
+            maxSockets: MAX_PER_HOST,
+            maxTotalSockets: MAX_SOCKETS,
+            maxFreeSockets: MAX_PER_HOST,
+            timeout: TIMEOUT_MS
+        };
+        this.httpAgent = new http.Agent(agentOptions);
+        this.httpsAgent = new https.Agent(agentOptions);
+        this.maxPerHost = MAX_PER_HOST;
+        this.hosts = new Map();
+        this.breakers = new Map();
+        this.since = new Date().toISOString();
+    }
+
+    static hostOf(url) {
+        try {
+            return new URL(url).host;
+        } catch (e) {
+            return 'invalid';
+        }
+    }
+
+    host(name) {
+        let entry = this.hosts.get(name);
+        if (!entry) {
+            entry = {
+                active: 0,
+                queue: [],
+                requests: 0,
+                errors: 0,
+                timeouts: 0,
+                bytes: 0,
+                totalMs: 0,
+                maxMs: 0,
+                waitMs: 0,
+                status: {},
+                lastError: null
+            };
+            this.hosts.set(name, entry);
+        }
+        return entry;
+    }
+
+    breaker(name) {
+        let breaker = this.breakers.get(name);
+        if (!breaker) {
+            breaker = new CircuitBreaker(name);
+            this.breakers.set(name, breaker);
+        }
+        return breaker;
+    }
+
+    /**
+     * Whether calls to the url's host are currently being rejected
+     */
+    isOpen(url) {
+        return this.breakers.get(HttpClient.hostOf(url))?.state === 'open';
+    }
+
+    isCircuitOpen(error) {
+        return error?.code === 'ECIRCUITOPEN';
+    }
+
+    /**
+     * Take one of the host's slots, waiting in FIFO order when all are busy
+     * @returns {Promise<Function>} release callback (safe to call more than once)
+     */
+    async acquire(name) {
+        const entry = this.host(name);
+        if (entry.active >= this.maxPerHost) {
+            await new Promise(resolve => entry.queue.push(resolve));
+        } else {
+            entry.active++;
+        }
+
+        let released = false;
+        return () => {
+            if (released) return;
+            released = true;
+            const next = entry.queue.shift();
+            // Hand the slot straight to the next waiter
+            if (next) next();
+            else entry.active--;
+        };
+    }
+
+    static responseBytes(res) {
+        const length = Number(res.headers?.['content-length']);
+        if (Number.isFinite(length) && length >= 0) return length;
+        if (res.data && typeof res.data.byteLength === 'number') return res.data.byteLength;
+        return 0;
+    }
+
+    record(name, { ms, waitMs, res = null, error = null }) {
+        const entry = this.host(name);
+        entry.requests++;
+        entry.totalMs += ms;
+        entry.maxMs = Math.max(entry.maxMs, ms);
+        entry.waitMs += waitMs;
+        if (res) {
+            entry.status[res.status] = (entry.status[res.status] || 0) + 1;
+            entry.bytes += HttpClient.responseBytes(res);
+        }
+        if (error) {
+            entry.errors++;
+            if (error.code === 'ECONNABORTED' || error.code === 'ETIMEDOUT') entry.timeouts++;
+            entry.lastError = { message: error.message, at: new Date().toISOString() };
+        }
+    }
+
+    /**
+     * axios request with the shared agents and defaults; per-call config wins
+     */
+    async request(config) {
+        const name = HttpClient.hostOf(config.url);
+        const breaker = this.breaker(name);
+        if (!breaker.canRequest()) {
+            const error = new Error(`Circuit open for ${name}`);
+            error.code = 'ECIRCUITOPEN';
+            throw error;
+        }
+
+        const queued = Date.now();
+        const release = await this.acquire(name);
+        const started = Date.now();
+
+        try {
+            const res = await axios.request({
+                timeout: TIMEOUT_MS,
+                maxContentLength: MAX_RESPONSE_BYTES,
+                maxBodyLength: MAX_RESPONSE_BYTES,
+                maxRedirects: MAX_REDIRECTS,
+                ...config,
+                httpAgent: this.httpAgent,
+                httpsAgent: this.httpsAgent
+            });
+            const ms = Date.now() - started;
+            this.record(name, { ms, waitMs: started - queued, res });
+            // Callers that accept every status still see 5xx as an upstream failure
+            if (res.status >= 500) breaker.onFailure(ms);
+            else breaker.onSuccess(ms);
+
+            // A streamed body keeps its connection busy until it has been read
+            if (config.responseType === 'stream' && res.data && typeof res.data.once === 'function') {
+                res.data.once('end', release);
+                res.data.once('close', release);
+                res.data.once('error', release);
+            } else {
+                release();
+            }
+            return res;
+        } catch (error) {
+            const ms = Date.now() - started;
+            this.record(name, { ms, waitMs: started - queued, res: error.response || null, error });
+            // A 4xx is the request's fault, not the upstream's
+            const status = error.response?.status;
+            if (status && status < 500) breaker.onSuccess(ms);
+            else breaker.onFailure(ms);
+            release();
+            throw error;
+        }
+    }
+
+    get(url, config = {}) {
+        return this.request({ ...config, method: 'get', url });
+    }
+
+    post(url, data, config = {}) {
+        return this.request({ ...config, method: 'post', url, data });
+    }
+
+    getBreakers() {
+        const breakers = {};
+        for (const [name, breaker] of this.breakers) breakers[name] = breaker.getState();
+        return breakers;
+    }
+
+    getStats() {
+        const hosts = {};
+        for (const [name, entry] of this.hosts) {
+            hosts[name] = {
+                active: entry.active,
+                queued: entry.queue.length,
+                requests: entry.requests,
+                errors: entry.errors,
+                timeouts: entry.timeouts,
+                bytes: entry.bytes,
+                avgMs: entry.requests ? Math.round(entry.totalMs / entry.requests) : 0,
+                maxMs: entry.maxMs,
+                avgWaitMs: entry.requests ? Math.round(entry.waitMs / entry.requests) : 0,
+                status: { ...entry.status },
+                lastError: entry.lastError
+            };
+        }
+        return {
+            since: this.since,
+            limits: { timeoutMs: TIMEOUT_MS, maxPerHost: this.maxPerHost, maxSockets: MAX_SOCKETS, maxResponseBytes: MAX_RESPONSE_BYTES },
+            hosts,
+            breakers: this.getBreakers()
+        };
+    }
+
+    resetStats() {
+        for (const [name, entry] of this.hosts) {
+            // Keep hosts with requests in flight so their slots stay accounted for
+            if (entry.active || entry.queue.length) {
+                Object.assign(entry, { requests: 0, errors: 0, timeouts: 0, bytes: 0, totalMs: 0, maxMs: 0, waitMs: 0, status: {}, lastError: null });
+            } else {
+                this.hosts.delete(name);
+            }
+        }
+        this.since = new Date().toISOString();
+    }
+}
+
+module.exports = new HttpClient();
+module.exports.HttpClient = HttpClient;
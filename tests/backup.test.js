@@ -0,0 +1,70 @@
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { backupTo } = require('../src/database/backup');
+
+// Minimal stand-in for a node-sqlite3 Backup handle
+const createConn = (stepResults) => {
+    const handle = {
+        completed: false,
+        failed: false,
+        remaining: 10,
+        pageCount: 10,
+        step: jest.fn((pages, cb) => {
+            const next = stepResults.shift();
+            if (next === 'busy') return setImmediate(() => cb(new Error('SQLITE_BUSY')));
+            if (next === 'fail') {
+                handle.failed = true;
+                return setImmediate(() => cb(new Error('SQLITE_CORRUPT')));
+            }
+            handle.remaining = Math.max(0, handle.remaining - pages);
+            handle.completed = handle.remaining === 0;
+            setImmediate(() => cb(null));
+        }),
+        finish: jest.fn(cb => setImmediate(cb))
+    };
+    return {
+        handle,
+        backup: jest.fn((dest, cb) => {
+            fs.writeFileSync(dest, 'snapshot');
+            setImmediate(() => cb(null));
+            return handle;
+        })
+    };
+};
+
+describe('backupTo', () => {
+    let dest;
+
+    beforeEach(() => {
+        dest = path.join(os.tmpdir(), `backup-test-${Date.now()}.sqlite`);
+    });
+
+    afterEach(() => {
+        fs.rmSync(dest, { force: true });
+    });
+
+    test('should copy in incremental steps and report progress', async () => {
+        const conn = createConn(['ok', 'ok', 'ok']);
+        const onProgress = jest.fn();
+
+        const result = await backupTo(conn, dest, { pagesPerStep: 4, onProgress });
+
+        expect(conn.handle.step).toHaveBeenCalledTimes(3);
+        expect(onProgress).toHaveBeenLastCalledWith({ remaining: 0, pageCount: 10 });
+        expect(conn.handle.finish).toHaveBeenCalled();
+        expect(result).toMatchObject({ path: dest, pages: 10, steps: 3, bytes: 8 });
+    });
+
+    test('should retry busy steps', async () => {
+        const conn = createConn(['busy', 'ok']);
+        await backupTo(conn, dest, { pagesPerStep: 10 });
+        expect(conn.handle.step).toHaveBeenCalledTimes(2);
+    });
+
+    test('should stop and finish the handle on a fatal error', async () => {
+        const conn = createConn(['ok', 'fail']);
+        await expect(backupTo(conn, dest, { pagesPerStep: 2 })).rejects.toThrow('SQLITE_CORRUPT');
+        expect(conn.handle.finish).toHaveBeenCalled();
+    });
+});
@@ -0,0 +1,53 @@
+const CircuitBreaker = require('../src/services/CircuitBreaker');
+
+describe('CircuitBreaker', () => {
+    const options = { windowSize: 10, minCalls: 4, failureRate: 0.5, slowCallMs: 1000, cooldownMs: 30000 };
+
+    beforeEach(() => {
+        jest.spyOn(console, 'log').mockImplementation(() => { });
+        jest.spyOn(console, 'warn').mockImplementation(() => { });
+    });
+
+    afterEach(() => {
+        jest.restoreAllMocks();
+    });
+
+    test('stays closed until the window has enough calls', () => {
+        const breaker = new CircuitBreaker('api', options);
+        breaker.onFailure(10);
+        breaker.onFailure(10);
+        breaker.onFailure(10);
+        expect(breaker.state).toBe('closed');
+        expect(breaker.canRequest()).toBe(true);
+    });
+
+    test('opens on the failure rate and counts slow calls as failures', () => {
+        const breaker = new CircuitBreaker('api', options);
+        breaker.onSuccess(50, 0);
+        breaker.onSuccess(50, 0);
+        breaker.onSuccess(5000, 0);
+        breaker.onFailure(50, 0);
+
+        expect(breaker.state).toBe('open');
+        expect(breaker.canRequest(1000)).toBe(false);
+        expect(breaker.getState(1000)).toMatchObject({ state: 'open', opens: 1, rejected: 1, retryInMs: 29000 });
+    });
+
+    test('lets one trial call through after the cooldown', () => {
+        const breaker = new CircuitBreaker('api', options);
+        breaker.open(0);
+
+        expect(breaker.canRequest(30000)).toBe(true);
+        expect(breaker.state).toBe('half_open');
+        // Only the trial call goes out
+        expect(breaker.canRequest(30001)).toBe(false);
+
+        breaker.onFailure(10, 30500);
+        expect(breaker.state).toBe('open');
+
+        expect(breaker.canRequest(61000)).toBe(true);
+        breaker.onSuccess(10, 61100);
+        expect(breaker.state).toBe('closed');
+        expect(breaker.getState().calls).toBe(0);
+    });
+});
@@ -44,6 +44,28 @@ describe('ContentService', () => {
             );
             expect(result).toEqual({ id: mockId, ...input });
         });
+
+        test('should store derived fields for hadith', async () => {
+            uuidv4.mockReturnValue('uuid-456');
+            db.run.mockResolvedValue({});
+            db.get.mockResolvedValue({ id: 'uuid-456' });
+
+            await ContentService.addContent({
+                type: 'hadith',
+                category: 'hadith',
+                content_ar: 'قال رسول الله ﷺ: "الدين النصيحة"',
+                source: 'صحيح مسلم'
+            });
+
+            const params = db.run.mock.calls[0][1];
+            expect(params.slice(6)).toEqual([
+                null,
+                'الدين النصيحة',
+                'الدين النصيحة',
+                `https://dorar.net/hadith/search?q=${encodeURIComponent('الدين النصيحة')}`,
+                'short'
+            ]);
+        });
     });
 
     describe('getContent', () => {
@@ -65,22 +87,86 @@ describe('ContentService', () => {
     });
 
     describe('updateContent', () => {
-        test('should update only provided fields', async () => {
+        test('should update only provided fields (plus the fields derived from the text)', async () => {
             const updateData = { content_ar: 'Updated Text' };
             db.run.mockResolvedValue({});
-            db.get.mockResolvedValue({ id: '1', ...updateData });
+            db.get.mockResolvedValue({ id: '1', type: 'adhkar', ...updateData });
 
             await ContentService.updateContent('1', updateData);
 
             expect(db.run).toHaveBeenCalledWith(
-                expect.stringContaining('UPDATE content_library SET content_ar = ?'),
-                ['Updated Text', '1']
+                expect.stringContaining('UPDATE content_library SET content_ar = ?, content_hash = ?, matn = ?, snippet = ?, source_url = ?, length_class = ?'),
+                ['Updated Text', null, null, null, null, 'short', '1']
             );
         });
 
+        test('should not touch derived fields when the text is unchanged', async () => {
+            db.run.mockResolvedValue({});
+            db.get.mockResolvedValue({ id: '1', active: 0 });
+
+            await ContentService.updateContent('1', { active: 0 });
+
+            expect(db.run).toHaveBeenCalledWith('UPDATE content_library SET active = ? WHERE id = ?', [0, '1']);
+        });
+
         test('should do nothing if no fields provided', async () => {
             await ContentService.updateContent('1', {});
             expect(db.run).not.toHaveBeenCalled();
         });
     });
+
+    describe('catalog', () => {
+        const rows = [
+            { id: 'a1', type: 'adhkar', category: 'morning', content_ar: 'ذكر 1', active: 1 },
+            { id: 'a2', type: 'adhkar', category: 'morning', content_ar: 'ذكر 2', active: 1 },
+            { id: 'a3', type: 'adhkar', category: 'evening', content_ar: 'ذكر 3', active: 1 },
+            { id: 'h1', type: 'hadith', category: 'hadith', content_ar: 'حديث', active: 1 }
+        ];
+
+        beforeEach(() => {
+            ContentService.invalidateCatalog();
+            db.all.mockResolvedValue(rows.map(r => ({ ...r })));
+        });
+
+        test('should serve grouped content from one snapshot', async () => {
+            const morning = await ContentService.getAllContent('adhkar', 'morning');
+            const allAdhkar = await ContentService.getAllContent('adhkar');
+            const again = await ContentService.getAllContent('adhkar', 'morning');
+
+            expect(morning.map(r => r.id)).toEqual(['a1', 'a2']);
+            expect(allAdhkar.map(r => r.id)).toEqual(['a1', 'a2', 'a3']);
+            expect(again).toBe(morning);
+            expect(Object.isFrozen(morning)).toBe(true);
+            expect(db.all).toHaveBeenCalledTimes(1);
+            expect(db.all.mock.calls[0][1]).toEqual(['hadith_cached']);
+            expect(await ContentService.getAllContent('adhkar', 'after_prayer')).toEqual([]);
+        });
+
+        test('should return pre-joined adhkar sets', async () => {
+            const full = await ContentService.getAdhkarSet('morning', 'full');
+            const plain = await ContentService.getAdhkarSet('morning', null);
+            const short = await ContentService.getAdhkarSet('morning', 'short');
+
+            expect(full.id).toBe('full_set_morning');
+            expect(full.content_ar).toContain('🌅 أذكار الصباح كاملة');
+            expect(full.content_ar).toContain('ذكر 1\n\n--------------------------------\n\nذكر 2');
+            expect(await ContentService.getAdhkarSet('morning', 'full')).toBe(full);
+            expect(plain.content_ar).toBe('ذكر 1\n\n--------------------------------\n\nذكر 2');
+            expect(short).toMatchObject({ id: 'short_set_morning', source: 'مقتطفات من الأذكار' });
+            expect(short.content_ar.split('--------------------------------')).toHaveLength(2);
+            expect(await ContentService.getAdhkarSet('after_prayer', 'full')).toBeNull();
+        });
+
+        test('should rebuild after content changes', async () => {
+            await ContentService.getAllContent('adhkar', 'morning');
+            db.run.mockResolvedValue({});
+            db.get.mockResolvedValue(null);
+
+            await ContentService.deleteContent('a2');
+            db.all.mockResolvedValue(rows.filter(r => r.id !== 'a2').map(r => ({ ...r })));
+
+            expect((await ContentService.getAllContent('adhkar', 'morning')).map(r => r.id)).toEqual(['a1']);
+            expect(db.all).toHaveBeenCalledTimes(2);
+        });
+    });
 });
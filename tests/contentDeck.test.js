@@ -0,0 +1,126 @@
+const { db } = require('../src/database/db');
+const writeBuffer = require('../src/database/writeBuffer');
+const ContentDeckService = require('../src/services/ContentDeckService');
+
+jest.mock('../src/database/db', () => ({
+    db: {
+        get: jest.fn(),
+        run: jest.fn(),
+        transaction: jest.fn()
+    }
+}));
+
+jest.mock('../src/database/writeBuffer', () => ({
+    update: jest.fn(),
+    flush: jest.fn(async () => { }),
+    sqliteNow: () => '2025-01-01 00:00:00'
+}));
+
+// Stored form of a deck: 4-byte little-endian rowids
+const packed = (rowids) => {
+    const buffer = Buffer.alloc(rowids.length * 4);
+    rowids.forEach((rowid, i) => buffer.writeUInt32LE(rowid, i * 4));
+    return buffer;
+};
+
+describe('ContentDeckService', () => {
+    const pool = [1, 2, 3, 4, 5];
+    let loadRowids;
+
+    beforeEach(() => {
+        jest.clearAllMocks();
+        ContentDeckService.clear();
+        db.get.mockResolvedValue(null);
+        db.run.mockResolvedValue({ changes: 1 });
+        db.transaction.mockImplementation(fn => fn({ run: db.run }));
+        loadRowids = jest.fn(async () => pool);
+    });
+
+    test('should not repeat until the whole pool has been drawn', async () => {
+        const drawn = [];
+        for (let i = 0; i < pool.length; i++) {
+            drawn.push(await ContentDeckService.draw('cfg-1', 'hadith:all', loadRowids));
+        }
+
+        expect(drawn.sort()).toEqual(pool);
+        expect(loadRowids).toHaveBeenCalledTimes(1);
+        expect(db.run).toHaveBeenCalledWith(expect.stringContaining('INTO content_decks'), expect.arrayContaining([expect.any(Buffer)]));
+        expect(db.run).toHaveBeenCalledWith(expect.stringContaining('INTO content_deck_cursors'), ['cfg-1:hadith:all']);
+        // A draw only touches the small cursor row
+        expect(writeBuffer.update).toHaveBeenCalledTimes(pool.length);
+        expect(writeBuffer.update).toHaveBeenLastCalledWith('content_deck_cursors', 'deck_key', 'cfg-1:hadith:all', expect.objectContaining({ cursor: 5 }));
+    });
+
+    test('should reshuffle when exhausted without repeating across the boundary', async () => {
+        let last = null;
+        for (let i = 0; i < pool.length * 20; i++) {
+            const rowid = await ContentDeckService.draw('cfg-1', 'hadith:all', loadRowids);
+            expect(rowid).not.toBe(last);
+            last = rowid;
+        }
+        expect(loadRowids).toHaveBeenCalledTimes(20);
+        expect(writeBuffer.update).toHaveBeenCalledWith('content_decks', 'deck_key', 'cfg-1:hadith:all', expect.objectContaining({ rowids: expect.any(Buffer) }));
+    });
+
+    test('should resume a stored deck at its cursor', async () => {
+        db.get.mockResolvedValue({ rowids: packed([7, 8, 9]), cursor: 1 });
+
+        expect(await ContentDeckService.draw('cfg-2', 'hadith:all', loadRowids)).toBe(8);
+        expect(await ContentDeckService.draw('cfg-2', 'hadith:all', loadRowids)).toBe(9);
+        expect(loadRowids).not.toHaveBeenCalled();
+    });
+
+    test('should flush buffered cursors before reading a deck back', async () => {
+        await ContentDeckService.draw('cfg-2', 'hadith:all', loadRowids);
+        ContentDeckService.decks.delete('cfg-2:hadith:all');
+        await ContentDeckService.draw('cfg-2', 'hadith:all', loadRowids);
+
+        expect(writeBuffer.flush).toHaveBeenCalledTimes(2);
+        expect(writeBuffer.flush.mock.invocationCallOrder[1]).toBeLessThan(db.get.mock.invocationCallOrder[1]);
+    });
+
+    test('should keep separate decks per config and load each once under concurrency', async () => {
+        const [a, b] = await Promise.all([
+            ContentDeckService.draw('cfg-1', 'hadith:all', loadRowids),
+            ContentDeckService.draw('cfg-1', 'hadith:all', loadRowids)
+        ]);
+        await ContentDeckService.draw('cfg-3', 'hadith:all', loadRowids);
+
+        expect(a).not.toBe(b);
+        expect(db.get).toHaveBeenCalledTimes(2);
+    });
+
+    test('should bound the deck cache by size, tracking reshuffled decks', async () => {
+        const big = Array.from({ length: 10000 }, (_, i) => i + 1);
+        loadRowids.mockResolvedValue(big);
+
+        await ContentDeckService.draw('cfg-1', 'hadith:bukhari', loadRowids);
+        const size = ContentDeckService.decks.calculatedSize;
+        expect(size).toBeGreaterThanOrEqual(big.length * 4);
+        expect(ContentDeckService.decks.maxSize).toBeGreaterThan(0);
+
+        // A stored, exhausted deck whose pool shrank: after the reshuffle the cache counts the smaller deck
+        db.get.mockResolvedValue({ rowids: packed(big), cursor: big.length });
+        ContentDeckService.clear();
+        await ContentDeckService.draw('cfg-1', 'hadith:bukhari', loadRowids.mockResolvedValue([1, 2]));
+        expect(ContentDeckService.decks.calculatedSize).toBeLessThan(size / 100);
+    });
+
+    test('should delete a config\'s decks', async () => {
+        await ContentDeckService.draw('cfg-1', 'hadith:all', loadRowids);
+        await ContentDeckService.draw('cfg-10', 'hadith:all', loadRowids);
+        db.run.mockClear();
+
+        await ContentDeckService.deleteConfigDecks('cfg-1');
+
+        expect(ContentDeckService.decks.has('cfg-1:hadith:all')).toBe(false);
+        expect(ContentDeckService.decks.has('cfg-10:hadith:all')).toBe(true);
+        expect(db.run).toHaveBeenCalledWith(expect.stringContaining('DELETE FROM content_deck_cursors'), ['cfg-1']);
+        expect(db.run).toHaveBeenCalledWith('DELETE FROM content_decks WHERE config_id = ?', ['cfg-1']);
+    });
+
+    test('should return null for an empty pool', async () => {
+        loadRowids.mockResolvedValue([]);
+        expect(await ContentDeckService.draw('cfg-1', 'hadith:muslim', loadRowids)).toBeNull();
+    });
+});
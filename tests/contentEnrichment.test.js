@@ -0,0 +1,45 @@
+const ContentEnrichmentService = require('../src/services/ContentEnrichmentService');
+const HadithService = require('../src/services/HadithService');
+
+jest.mock('../src/database/db', () => ({
+    db: {
+        get: jest.fn(),
+        all: jest.fn(),
+        run: jest.fn(),
+        insertMany: jest.fn()
+    }
+}));
+
+describe('Content enrichment', () => {
+    test('should derive matn, snippet, link, hash and length class for cached hadith', () => {
+        const fields = ContentEnrichmentService.derive({
+            type: 'hadith_cached',
+            content_ar: 'قال رسول الله ﷺ: "إنما الأعمال بالنيات، وإنما لكل امرئ ما نوى"'
+        });
+
+        expect(fields.matn).toBe('إنما الأعمال بالنيات، وإنما لكل امرئ ما نوى');
+        expect(fields.snippet).toBe('إنما الأعمال بالنيات وإنما لكل امرئ ما نوى');
+        expect(fields.source_url).toBe(`https://dorar.net/hadith/search?q=${encodeURIComponent(fields.snippet)}`);
+        expect(fields.content_hash).toMatch(/^[0-9a-f]{40}$/);
+        expect(fields.length_class).toBe('short');
+    });
+
+    test('should only classify length for non-hadith content', () => {
+        expect(ContentEnrichmentService.derive({ type: 'adhkar', content_ar: 'س'.repeat(700) })).toEqual({
+            content_hash: null, matn: null, snippet: null, source_url: null, length_class: 'long'
+        });
+    });
+
+    test('stripSanad should cut at the earliest marker', () => {
+        const text = 'حدثنا قتيبة عن أبي هريرة أن رسول الله صلى الله عليه وسلم قال من صام رمضان';
+        expect(HadithService.stripSanad(text)).toBe('قال رسول الله ﷺ: "من صام رمضان"');
+
+        // Two markers: the earlier one wins even if it is listed later
+        const twoMarkers = 'عن عمر سمعت النبي صلى الله عليه وسلم يقول الحديث أن رسول الله قال غيره';
+        expect(HadithService.stripSanad(twoMarkers)).toBe('قال رسول الله ﷺ: "الحديث أن رسول الله قال غيره"');
+    });
+
+    test('stripSanad should fall back to the ﷺ symbol when no marker is found', () => {
+        expect(HadithService.stripSanad('قال النبي صلى الله عليه وسلم كلمة')).toBe('قال النبي ﷺ كلمة');
+    });
+});
@@ -0,0 +1,97 @@
+// Runs against the real in-memory SQLite database with all migrations applied
+const { db, init } = require('../src/database/db');
+const ContentService = require('../src/services/ContentService');
+const ArabicTextService = require('../src/services/ArabicTextService');
+
+jest.setTimeout(30000);
+
+describe('Content full-text search', () => {
+    beforeAll(async () => {
+        jest.spyOn(console, 'log').mockImplementation(() => { });
+        await init();
+    });
+
+    afterAll(() => {
+        jest.restoreAllMocks();
+    });
+
+    beforeEach(async () => {
+        await db.run('DELETE FROM content_library');
+        await db.insertMany('content_library', [
+            { id: 'h1', type: 'hadith_cached', category: 'hadith', content_ar: 'قَالَ رَسُولُ اللَّهِ ﷺ: «إِنَّمَا الأَعْمَالُ بِالنِّيَّاتِ»', source: 'صحيح البخاري - 1' },
+            { id: 'h2', type: 'hadith_cached', category: 'hadith', content_ar: 'الدِّينُ النَّصِيحَةُ', source: 'صحيح مسلم - 55' },
+            { id: 'a1', type: 'adhkar', category: 'morning', content_ar: 'أصبحنا وأصبح الملك لله، وخير الأعمال أدومها', source: 'رواه مسلم' }
+        ]);
+    });
+
+    test('should normalize Arabic text in queries and documents', () => {
+        expect(ArabicTextService.normalize('إِنَّمَا الأَعْمَالُ')).toBe('انما الاعمال');
+        expect(ArabicTextService.ftsQuery('النصيحة!')).toBe('"النصيحه"*');
+        expect(ArabicTextService.ftsQuery('  ...  ')).toBeNull();
+    });
+
+    test('should match regardless of tashkeel, alef and ta marbuta forms', async () => {
+        const result = await ContentService.searchContent({ q: 'النصيحة' });
+        expect(result.items.map(i => i.id)).toEqual(['h2']);
+
+        const prefix = await ContentService.searchContent({ q: 'إنما الاعمال' });
+        expect(prefix.items.map(i => i.id)).toEqual(['h1']);
+    });
+
+    test('should filter, rank and paginate', async () => {
+        const all = await ContentService.searchContent({ q: 'الأعمال' });
+        expect(all.total).toBe(2);
+
+        const hadithOnly = await ContentService.searchContent({ q: 'الأعمال', type: 'hadith_cached' });
+        expect(hadithOnly.items.map(i => i.id)).toEqual(['h1']);
+
+        const bySource = await ContentService.searchContent({ q: 'مسلم', sourcePrefix: 'صحيح مسلم' });
+        expect(bySource.items.map(i => i.id)).toEqual(['h2']);
+
+        const page2 = await ContentService.searchContent({ q: 'الأعمال', limit: 1, offset: 1 });
+        expect(page2).toMatchObject({ total: 2, limit: 1, offset: 1 });
+        expect(page2.items).toHaveLength(1);
+
+        // page is counted in capped limits: ?limit=500&page=2 starts at row 100, not 500
+        const capped = await ContentService.searchContent({ q: 'الأعمال', limit: 500, page: 2 });
+        expect(capped).toMatchObject({ limit: 100, offset: 100 });
+    });
+
+    test('should index words carrying Quranic annotation marks as whole words', async () => {
+        // U+0656 (subscript alef) inside a word and U+06D6 (small high ligature) after one
+        await db.run(
+            "INSERT INTO content_library (id, type, category, content_ar, source) VALUES ('h3', 'hadith_cached', 'hadith', ?, 'صحيح مسلم - 804')",
+            ['اقرءوا كت\u0656اب الله\u06D6 فإنه يأتي شفيعا']
+        );
+
+        expect((await ContentService.searchContent({ q: 'كتاب' })).items.map(i => i.id)).toEqual(['h3']);
+        expect((await ContentService.searchContent({ q: 'الله فانه' })).items.map(i => i.id)).toEqual(['h3']);
+    });
+
+    test('should strip in SQL every mark that normalize() strips', async () => {
+        const marks = Array.from({ length: 0x06FF - 0x0600 }, (_, i) => String.fromCharCode(0x0600 + i))
+            .filter(c => ArabicTextService.normalize(`ب${c}ب`) === 'بب');
+        const text = `ب${marks.join('')}ب`;
+
+        const row = await db.get(`SELECT ${ArabicTextService.sqlNormalize('?')} AS folded`, [text]);
+        expect(row.folded).toBe('بب');
+    });
+
+    test('should stay in sync with updates and deletes', async () => {
+        await db.run("UPDATE content_library SET content_ar = 'من حسن إسلام المرء تركه ما لا يعنيه' WHERE id = 'h2'");
+        await db.run("DELETE FROM content_library WHERE id = 'h1'");
+
+        expect((await ContentService.searchContent({ q: 'النصيحة' })).total).toBe(0);
+        expect((await ContentService.searchContent({ q: 'اسلام' })).items.map(i => i.id)).toEqual(['h2']);
+        expect((await ContentService.searchContent({ q: 'الاعمال', type: 'hadith_cached' })).total).toBe(0);
+    });
+
+    test('should key index rows by the content rowid, also across INSERT OR REPLACE', async () => {
+        await db.run(
+            "INSERT OR REPLACE INTO content_library (id, type, category, content_ar, source) VALUES ('a1', 'adhkar', 'morning', 'سبحان الله وبحمده', 'رواه مسلم')"
+        );
+
+        expect((await ContentService.searchContent({ q: 'سبحان' })).items.map(i => i.id)).toEqual(['a1']);
+        expect((await ContentService.searchContent({ q: 'أصبحنا' })).total).toBe(0);
+    });
+});
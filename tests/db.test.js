@@ -0,0 +1,90 @@
+// Runs against the real in-memory SQLite database (NODE_ENV=test)
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const sqlite3 = require('sqlite3');
+const { db } = require('../src/database/db');
+
+describe('dbAsync wrapper', () => {
+    beforeAll(async () => {
+        await db.exec('CREATE TABLE IF NOT EXISTS wrapper_test (id INTEGER PRIMARY KEY, name TEXT UNIQUE)');
+    });
+
+    beforeEach(async () => {
+        await db.run('DELETE FROM wrapper_test');
+    });
+
+    test('insertMany should insert all rows in one call', async () => {
+        const count = await db.insertMany('wrapper_test', [
+            { id: 1, name: 'a' },
+            { id: 2, name: 'b' },
+            { id: 3, name: 'c' }
+        ]);
+
+        expect(count).toBe(3);
+        const row = await db.get('SELECT COUNT(*) as count FROM wrapper_test');
+        expect(row.count).toBe(3);
+    });
+
+    test('insertMany should skip duplicates with conflict IGNORE', async () => {
+        await db.insertMany('wrapper_test', [{ id: 1, name: 'a' }]);
+        const count = await db.insertMany('wrapper_test', [{ id: 2, name: 'a' }, { id: 3, name: 'b' }], { conflict: 'IGNORE' });
+        expect(count).toBe(1);
+    });
+
+    test('insertMany should reject unsafe identifiers', async () => {
+        await expect(db.insertMany('wrapper_test; DROP TABLE users', [{ id: 1 }])).rejects.toThrow('invalid table');
+    });
+
+    test('transaction should roll back every write on error', async () => {
+        await expect(db.transaction(async (tx) => {
+            await tx.run('INSERT INTO wrapper_test (id, name) VALUES (?, ?)', [1, 'a']);
+            throw new Error('abort');
+        })).rejects.toThrow('abort');
+
+        const row = await db.get('SELECT COUNT(*) as count FROM wrapper_test');
+        expect(row.count).toBe(0);
+    });
+
+    test('writes outside a transaction wait for it to commit', async () => {
+        const pending = db.transaction(async (tx) => {
+            await tx.run('INSERT INTO wrapper_test (id, name) VALUES (?, ?)', [1, 'a']);
+            await new Promise(resolve => setTimeout(resolve, 20));
+            await tx.run('INSERT INTO wrapper_test (id, name) VALUES (?, ?)', [2, 'b']);
+        });
+        const outside = db.run('INSERT INTO wrapper_test (id, name) VALUES (?, ?)', [3, 'c']);
+
+        await Promise.all([pending, outside]);
+        const rows = await db.all('SELECT id FROM wrapper_test ORDER BY id');
+        expect(rows.map(r => r.id)).toEqual([1, 2, 3]);
+    });
+
+    test('prepare should reuse compiled statements', async () => {
+        const first = await db.prepare('SELECT name FROM wrapper_test WHERE id = ?');
+        await db.run('INSERT INTO wrapper_test (id, name) VALUES (?, ?)', [1, 'a']);
+        const second = await db.prepare('SELECT name FROM wrapper_test WHERE id = ?');
+
+        expect(await first.get([1])).toEqual({ name: 'a' });
+        expect(await second.get([1])).toEqual({ name: 'a' });
+        expect(await second.all([2])).toEqual([]);
+    });
+
+    test('backup should produce a standalone copy of the live database', async () => {
+        await db.insertMany('wrapper_test', [{ id: 1, name: 'a' }, { id: 2, name: 'b' }]);
+        const dest = path.join(os.tmpdir(), `db-backup-${Date.now()}.sqlite`);
+
+        try {
+            const result = await db.backup(dest, { pagesPerStep: 1 });
+            expect(result.steps).toBeGreaterThan(0);
+
+            const copy = new sqlite3.Database(dest, sqlite3.OPEN_READONLY);
+            const row = await new Promise((resolve, reject) => {
+                copy.get('SELECT COUNT(*) as count FROM wrapper_test', (err, r) => (err ? reject(err) : resolve(r)));
+            });
+            await new Promise(resolve => copy.close(resolve));
+            expect(row.count).toBe(2);
+        } finally {
+            fs.rmSync(dest, { force: true });
+        }
+    });
+});
@@ -0,0 +1,82 @@
+// Runs against a temp-file WAL database: the read pool only exists off :memory:
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const sqlite3 = require('sqlite3');
+
+const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'read-pool-'));
+const env = { ...process.env };
+process.env.NODE_ENV = 'development';
+process.env.DATABASE_PATH = path.join(dir, 'app.db');
+process.env.SQLITE_READ_POOL_SIZE = '2';
+const { db, close, swapDatabase, readPoolStats, dbPath } = require('../src/database/db');
+
+const waitFor = async (check) => {
+    for (let i = 0; i < 200; i++) {
+        if (check()) return;
+        await new Promise(resolve => setTimeout(resolve, 10));
+    }
+    throw new Error('timed out');
+};
+const served = () => readPoolStats().reduce((sum, r) => sum + r.served, 0);
+
+describe('SQLite read pool', () => {
+    beforeAll(async () => {
+        jest.spyOn(console, 'log').mockImplementation(() => { });
+        await waitFor(() => readPoolStats().length === 2);
+        await db.exec('CREATE TABLE pool_test (id INTEGER PRIMARY KEY, name TEXT)');
+    });
+
+    afterAll(() => {
+        jest.restoreAllMocks();
+        process.env = env;
+        fs.rmSync(dir, { recursive: true, force: true });
+    });
+
+    test('get and all are served by the readers', async () => {
+        const before = served();
+        await db.get('SELECT 1 AS one');
+        await db.all('SELECT * FROM pool_test');
+        expect(served()).toBe(before + 2);
+    });
+
+    test('a write is visible to the next read', async () => {
+        await db.run('INSERT INTO pool_test (id, name) VALUES (1, ?)', ['first']);
+        expect(await db.get('SELECT name FROM pool_test WHERE id = 1')).toEqual({ name: 'first' });
+
+        await db.transaction(tx => tx.run('UPDATE pool_test SET name = ? WHERE id = 1', ['second']));
+        expect((await db.all('SELECT name FROM pool_test')).map(r => r.name)).toEqual(['second']);
+    });
+
+    test('concurrent reads go to the least busy reader', async () => {
+        const before = readPoolStats().map(r => r.served);
+        await Promise.all([1, 2, 3, 4].map(() => db.get('SELECT COUNT(*) AS count FROM pool_test')));
+        readPoolStats().forEach((r, i) => expect(r.served - before[i]).toBe(2));
+    });
+
+    test('a swap that cannot close a connection renames nothing and keeps serving', async () => {
+        jest.spyOn(console, 'warn').mockImplementation(() => { });
+        const closeSpy = jest.spyOn(sqlite3.Database.prototype, 'close').mockImplementationOnce(function (callback) {
+            callback(new Error('SQLITE_BUSY: unable to close due to unfinalized statements'));
+        });
+        const source = path.join(dir, 'restore.db');
+        fs.writeFileSync(source, 'staged');
+
+        await expect(swapDatabase(source)).rejects.toThrow('SQLITE_BUSY');
+        closeSpy.mockRestore();
+
+        expect(fs.existsSync(source)).toBe(true);
+        expect(fs.existsSync(`${dbPath}.bak`)).toBe(false);
+        await waitFor(() => readPoolStats().length === 2);
+        expect(await db.get('SELECT COUNT(*) AS count FROM pool_test')).toEqual({ count: 1 });
+    });
+
+    test('close() closes the readers and the writer', async () => {
+        const closeSpy = jest.spyOn(sqlite3.Database.prototype, 'close');
+        await close();
+
+        expect(closeSpy).toHaveBeenCalledTimes(3);
+        expect(readPoolStats()).toEqual([]);
+        await expect(db.run('INSERT INTO pool_test (id, name) VALUES (2, ?)', ['x'])).rejects.toThrow();
+    });
+});
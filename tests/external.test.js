@@ -1,19 +1,31 @@
 
 const ExternalContentService = require('../src/services/ExternalContentService');
 
-// Mock axios globally for this test file
-jest.mock('axios');
-const axios = require('axios');
+// Mock the shared HTTP client for this test file
+jest.mock('../src/services/httpClient', () => ({
+    get: jest.fn()
+}));
+const httpClient = require('../src/services/httpClient');
+jest.mock('../src/services/HadithService', () => ({
+    getRandomHadith: jest.fn().mockResolvedValue(null)
+}));
+const HadithService = require('../src/services/HadithService');
 
 describe('ExternalContentService', () => {
 
-    afterEach(() => {
+    beforeEach(() => {
+        ExternalContentService.hadithPool.clear();
+    });
+
+    afterEach(async () => {
+        // Let any background refill finish before the next test swaps the mocks
+        await ExternalContentService.hadithPool.filling;
         jest.clearAllMocks();
     });
 
     test('should fetch daily content with hadith and image', async () => {
         // Mock successful API response
-        axios.get.mockResolvedValue({
+        httpClient.get.mockResolvedValue({
             data: {
                 data: {
                     hadith_arabic: 'إنما الأعمال بالنيات',
@@ -21,6 +33,7 @@ describe('ExternalContentService', () => {
                 }
             }
         });
+        await ExternalContentService.hadithPool.refill();
 
         const content = await ExternalContentService.getDailyContent('image');
 
@@ -29,12 +42,12 @@ describe('ExternalContentService', () => {
         expect(content.content).toBe('إنما الأعمال بالنيات');
         expect(content.media_url).toMatch(/^https:\/\/images\.unsplash\.com/);
         expect(content.media_type).toBe('image');
-        expect(axios.get).toHaveBeenCalled();
+        expect(httpClient.get).toHaveBeenCalled();
     });
 
     test('should return fallback if API fails', async () => {
         // Mock API failure
-        axios.get.mockRejectedValue(new Error('Network Error'));
+        httpClient.get.mockRejectedValue(new Error('Network Error'));
 
         // Silence console.error for this test
         jest.spyOn(console, 'error').mockImplementation(() => { });
@@ -47,4 +60,27 @@ describe('ExternalContentService', () => {
         expect(content.content).toContain('سبحان الله');
         expect(content.media_url).toBeDefined();
     });
+
+    test('should serve a locally cached hadith when the API is down', async () => {
+        httpClient.get.mockRejectedValue(Object.assign(new Error('Circuit open'), { code: 'ECIRCUITOPEN' }));
+        HadithService.getRandomHadith.mockResolvedValueOnce({ content_ar: 'الدين النصيحة', source: 'صحيح البخاري - 57' });
+        jest.spyOn(console, 'error').mockImplementation(() => { });
+
+        const hadith = await ExternalContentService.getRandomHadith();
+
+        expect(hadith).toEqual({ text_ar: 'الدين النصيحة', source: 'صحيح البخاري - 57' });
+    });
+
+    test('should not wait on the API while the pool is cold', async () => {
+        httpClient.get.mockReturnValue(new Promise(() => { }));
+        HadithService.getRandomHadith.mockResolvedValueOnce({ content_ar: 'الدين النصيحة', source: 'صحيح البخاري - 57' });
+
+        const hadith = await ExternalContentService.getRandomHadith();
+
+        expect(hadith.text_ar).toBe('الدين النصيحة');
+        // The refill was started in the background
+        expect(httpClient.get).toHaveBeenCalledTimes(1);
+        expect(ExternalContentService.hadithPool.getState().filling).toBe(true);
+        ExternalContentService.hadithPool.clear();
+    });
 });
@@ -0,0 +1,93 @@
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const zlib = require('zlib');
+const { Readable } = require('stream');
+const { db } = require('../src/database/db');
+const HadithImportService = require('../src/services/HadithImportService');
+const { streamArrayItems } = HadithImportService;
+
+jest.mock('../src/database/db', () => ({
+    db: {
+        get: jest.fn(),
+        all: jest.fn(),
+        run: jest.fn(),
+        insertMany: jest.fn()
+    }
+}));
+
+const edition = (hadiths) => JSON.stringify({
+    metadata: { name: 'Sahih al Bukhari', sections: { 1: 'Revelation [1]' } },
+    hadiths
+});
+
+describe('HadithImportService', () => {
+    let dir;
+
+    beforeEach(() => {
+        jest.clearAllMocks();
+        jest.spyOn(console, 'log').mockImplementation(() => { });
+        dir = fs.mkdtempSync(path.join(os.tmpdir(), 'hadith-'));
+        db.insertMany.mockImplementation(async (table, rows) => rows.length);
+    });
+
+    afterEach(() => {
+        fs.rmSync(dir, { recursive: true, force: true });
+        jest.restoreAllMocks();
+    });
+
+    test('should stream array items across arbitrary chunk boundaries', async () => {
+        const doc = edition([
+            { hadithnumber: 1, text: 'نص فيه "اقتباس" و {أقواس} و [معقوفات]', grades: [] },
+            { hadithnumber: 2, text: 'حديث ثان' }
+        ]);
+        const bytes = Buffer.from(doc);
+
+        for (const size of [1, 5, 64]) {
+            const chunks = [];
+            for (let i = 0; i < bytes.length; i += size) chunks.push(bytes.subarray(i, i + size));
+            const stream = Readable.from(chunks, { objectMode: false });
+
+            const items = [];
+            for await (const item of streamArrayItems(stream, 'hadiths')) items.push(item);
+            expect(items.map(h => h.hadithnumber)).toEqual([1, 2]);
+            expect(items[0].text).toContain('"اقتباس"');
+        }
+    });
+
+    test('should import a local edition in batches and skip duplicate texts', async () => {
+        const text = (n) => `حدثنا فلان عن فلان أن رسول الله صلى الله عليه وسلم قال الحديث رقم ${n}`;
+        fs.writeFileSync(path.join(dir, 'ara-bukhari.json'), edition([
+            { hadithnumber: 1, text: text(1), grades: [{ grade: 'صحيح' }] },
+            { hadithnumber: 2, text: text(2) },
+            // Same text with diacritics: a duplicate once normalized
+            { hadithnumber: 3, text: text(1).replace('الحديث', 'الْحَدِيثُ') },
+            { hadithnumber: 4, text: 'قصير' },
+            { hadithnumber: 5, text: text(5) }
+        ]));
+        const progress = [];
+
+        const stats = await HadithImportService.importEdition('bukhari', { dir, batchSize: 2, onProgress: s => progress.push(s) });
+
+        expect(stats).toMatchObject({ parsed: 5, inserted: 3, duplicates: 1, skipped: 1 });
+        expect(db.insertMany).toHaveBeenCalledTimes(2);
+        const [table, rows, options] = db.insertMany.mock.calls[0];
+        expect(table).toBe('content_library');
+        expect(options).toEqual({ conflict: 'IGNORE' });
+        expect(rows[0]).toMatchObject({ type: 'hadith_cached', source: 'صحيح البخاري - 1', content_hash: expect.any(String) });
+        expect(rows[0].content_ar.startsWith('قال رسول الله ﷺ')).toBe(true);
+        expect(progress.map(p => p.inserted)).toEqual([2, 3]);
+    });
+
+    test('should count rows already in the library as duplicates', async () => {
+        fs.writeFileSync(path.join(dir, 'ara-muslim.json.gz'), zlib.gzipSync(edition([
+            { hadithnumber: 1, text: 'إنما الأعمال بالنيات وإنما لكل امرئ ما نوى' }
+        ])));
+        db.insertMany.mockResolvedValue(0);
+
+        const stats = await HadithImportService.importEdition('muslim', { dir });
+
+        expect(stats).toMatchObject({ parsed: 1, inserted: 0, duplicates: 1 });
+        expect(HadithImportService.localBooks(dir)).toEqual(['muslim']);
+    });
+});
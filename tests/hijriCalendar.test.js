@@ -0,0 +1,53 @@
+const HijriCalendarService = require('../src/services/HijriCalendarService');
+const FastingService = require('../src/services/FastingService');
+
+describe('HijriCalendarService', () => {
+    const reference = new Intl.DateTimeFormat('en-u-ca-islamic', {
+        day: 'numeric', month: 'numeric', year: 'numeric', timeZone: 'UTC'
+    });
+    const expected = (date) => {
+        const parts = reference.formatToParts(new Date(`${date}T12:00:00Z`));
+        const value = (type) => parseInt(parts.find(p => p.type === type).value, 10);
+        return { day: value('day'), month: value('month'), year: value('year') };
+    };
+
+    test('matches Intl across a year boundary', () => {
+        for (const date of ['2025-12-30', '2025-12-31', '2026-01-01', '2026-03-01', '2026-06-15']) {
+            expect(HijriCalendarService.toHijri(date)).toEqual(expected(date));
+        }
+    });
+
+    test('builds each Gregorian year once', () => {
+        HijriCalendarService.toHijri('2030-05-01');
+        const table = HijriCalendarService.years.get(2030);
+        HijriCalendarService.toHijri('2030-11-20');
+        expect(HijriCalendarService.years.get(2030)).toBe(table);
+    });
+
+    test('applies hijri_adjustment as a day offset', () => {
+        expect(HijriCalendarService.toHijri('2026-01-01', 1)).toEqual(expected('2026-01-02'));
+        expect(HijriCalendarService.toHijri('2026-01-01', -1)).toEqual(expected('2025-12-31'));
+    });
+
+    test('formats an Arabic label', () => {
+        expect(HijriCalendarService.getLabel('2026-01-01')).toMatch(/^[٠-٩]+ .+ [٠-٩]+ هـ$/);
+    });
+
+    test('computes fasting flags once per date and adjustment', () => {
+        const first = HijriCalendarService.getFastingFlags('2026-01-05', 0);
+        expect(first.isMonday).toBe(true);
+        expect(HijriCalendarService.getFastingFlags('2026-01-05', 0)).toBe(first);
+        expect(HijriCalendarService.getFastingFlags('2026-01-05', 1)).not.toBe(first);
+    });
+
+    test('FastingService detects white days through the shared table', () => {
+        // Find a date whose Hijri day (tomorrow) is 13
+        let today = new Date(2026, 0, 1, 12);
+        while (HijriCalendarService.toHijri(new Date(today.getTime() + 24 * 60 * 60 * 1000)).day !== 13) {
+            today = new Date(today.getTime() + 24 * 60 * 60 * 1000);
+        }
+        expect(FastingService.checkFastingDay(today).isWhiteDay).toBe(true);
+        // Three days of adjustment move tomorrow past the 15th
+        expect(FastingService.checkFastingDay(today, 3).isWhiteDay).toBe(false);
+    });
+});
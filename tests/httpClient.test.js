@@ -0,0 +1,82 @@
+jest.mock('axios', () => ({
+    request: jest.fn()
+}));
+const axios = require('axios');
+const { HttpClient } = require('../src/services/httpClient');
+
+describe('HttpClient', () => {
+    let client;
+
+    beforeEach(() => {
+        client = new HttpClient();
+        jest.clearAllMocks();
+    });
+
+    test('applies shared agents and defaults, letting the call override them', async () => {
+        axios.request.mockResolvedValue({ status: 200, headers: { 'content-length': '42' }, data: {} });
+
+        await client.get('https://example.com/a', { params: { q: 1 }, timeout: 500 });
+
+        const config = axios.request.mock.calls[0][0];
+        expect(config.method).toBe('get');
+        expect(config.url).toBe('https://example.com/a');
+        expect(config.params).toEqual({ q: 1 });
+        expect(config.timeout).toBe(500);
+        expect(config.maxContentLength).toBeGreaterThan(0);
+        expect(config.httpsAgent).toBe(client.httpsAgent);
+        expect(client.httpsAgent.keepAlive).toBe(true);
+
+        const stats = client.getStats().hosts['example.com'];
+        expect(stats.requests).toBe(1);
+        expect(stats.bytes).toBe(42);
+        expect(stats.status).toEqual({ 200: 1 });
+    });
+
+    test('caps requests in flight per host and queues the rest', async () => {
+        client.maxPerHost = 2;
+        const pending = [];
+        axios.request.mockImplementation(() => new Promise(resolve => pending.push(resolve)));
+
+        const calls = [1, 2, 3].map(i => client.get(`https://slow.example/${i}`));
+        const other = client.get('https://fast.example/');
+        await new Promise(setImmediate);
+
+        // Third call to the slow host waits; the other host is not blocked
+        expect(axios.request).toHaveBeenCalledTimes(3);
+        expect(client.getStats().hosts['slow.example']).toMatchObject({ active: 2, queued: 1 });
+
+        pending[0]({ status: 200, headers: {}, data: '' });
+        await new Promise(setImmediate);
+        expect(axios.request).toHaveBeenCalledTimes(4);
+
+        pending.slice(1).forEach(resolve => resolve({ status: 200, headers: {}, data: '' }));
+        await Promise.all([...calls, other]);
+        expect(client.getStats().hosts['slow.example']).toMatchObject({ active: 0, queued: 0, requests: 3 });
+    });
+
+    test('counts errors and timeouts and frees the slot', async () => {
+        const timeout = Object.assign(new Error('timeout of 15000ms exceeded'), { code: 'ECONNABORTED' });
+        axios.request.mockRejectedValueOnce(timeout);
+
+        await expect(client.get('https://down.example/')).rejects.toThrow('timeout');
+
+        const stats = client.getStats().hosts['down.example'];
+        expect(stats).toMatchObject({ active: 0, errors: 1, timeouts: 1 });
+        expect(stats.lastError.message).toMatch('timeout');
+    });
+
+    test('fails fast once a host keeps failing, without counting 4xx', async () => {
+        axios.request.mockRejectedValue(Object.assign(new Error('Not Found'), { response: { status: 404, headers: {} } }));
+        for (let i = 0; i < 5; i++) await expect(client.get('https://api.example/x')).rejects.toThrow('Not Found');
+        expect(client.getBreakers()['api.example'].state).toBe('closed');
+
+        axios.request.mockRejectedValue(Object.assign(new Error('socket hang up'), { code: 'ECONNRESET' }));
+        for (let i = 0; i < 5; i++) await expect(client.get('https://api.example/x')).rejects.toThrow('socket hang up');
+        expect(client.isOpen('https://api.example/y')).toBe(true);
+
+        axios.request.mockClear();
+        const error = await client.get('https://api.example/x').catch(e => e);
+        expect(client.isCircuitOpen(error)).toBe(true);
+        expect(axios.request).not.toHaveBeenCalled();
+    });
+});
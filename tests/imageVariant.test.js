@@ -0,0 +1,66 @@
+jest.mock('../src/services/RemoteMediaService', () => ({
+    fetchImageFile: jest.fn(),
+    fetchImageBuffer: jest.fn(),
+    probeImageUrl: jest.fn()
+}));
+const RemoteMediaService = require('../src/services/RemoteMediaService');
+const ImageVariantService = require('../src/services/ImageVariantService');
+
+const ORIGINAL = 'https://upload.wikimedia.org/wikipedia/commons/0/02/Preston_mosque.jpg';
+const LARGE_THUMB = 'https://upload.wikimedia.org/wikipedia/commons/thumb/6/69/MMIC_Mihrab.jpg/2048px-MMIC_Mihrab.jpg';
+
+describe('ImageVariantService', () => {
+    beforeEach(() => {
+        jest.clearAllMocks();
+        ImageVariantService.unavailable.clear();
+    });
+
+    test('builds resized Wikimedia URLs from originals and larger thumbnails', () => {
+        expect(ImageVariantService.variantUrl(ORIGINAL, 1280))
+            .toBe('https://upload.wikimedia.org/wikipedia/commons/thumb/0/02/Preston_mosque.jpg/1280px-Preston_mosque.jpg');
+        expect(ImageVariantService.variantUrl(LARGE_THUMB, 1280))
+            .toBe('https://upload.wikimedia.org/wikipedia/commons/thumb/6/69/MMIC_Mihrab.jpg/1280px-MMIC_Mihrab.jpg');
+
+        // Already small enough, not resizable, or another host
+        expect(ImageVariantService.variantUrl(LARGE_THUMB.replace('2048px', '960px'), 1280)).toBeNull();
+        expect(ImageVariantService.variantUrl('https://upload.wikimedia.org/wikipedia/commons/a/ab/Scan.pdf', 1280)).toBeNull();
+        expect(ImageVariantService.variantUrl('https://images.pexels.com/photos/1/a.jpg', 1280)).toBeNull();
+    });
+
+    test('sends the cached variant with a thumbnail', async () => {
+        RemoteMediaService.fetchImageFile.mockResolvedValue('/cache/variant.jpg');
+        RemoteMediaService.fetchImageBuffer.mockResolvedValue(Buffer.from('thumb'));
+
+        const media = await ImageVariantService.getMedia(LARGE_THUMB);
+
+        expect(media).toEqual({ mediaUrl: { url: '/cache/variant.jpg' }, jpegThumbnail: Buffer.from('thumb').toString('base64') });
+        expect(RemoteMediaService.fetchImageFile).toHaveBeenCalledWith(ImageVariantService.variantUrl(LARGE_THUMB, ImageVariantService.WIDTH));
+        expect(RemoteMediaService.fetchImageBuffer).toHaveBeenCalledWith(ImageVariantService.variantUrl(LARGE_THUMB, ImageVariantService.THUMB_WIDTH));
+    });
+
+    test('falls back to the original and stops asking for a refused variant', async () => {
+        RemoteMediaService.fetchImageFile.mockImplementation(async url => (url === ORIGINAL ? '/cache/original.jpg' : null));
+        RemoteMediaService.probeImageUrl.mockResolvedValue({ status: 400, contentType: 'text/html' });
+
+        expect(await ImageVariantService.getImageFile(ORIGINAL)).toBe('/cache/original.jpg');
+        expect(RemoteMediaService.fetchImageFile).toHaveBeenCalledTimes(2);
+
+        RemoteMediaService.fetchImageFile.mockClear();
+        expect(await ImageVariantService.getImageFile(ORIGINAL)).toBe('/cache/original.jpg');
+        expect(RemoteMediaService.fetchImageFile).toHaveBeenCalledTimes(1);
+    });
+
+    test('falls back once without remembering a transient failure', async () => {
+        RemoteMediaService.fetchImageFile.mockImplementation(async url => (url === ORIGINAL ? '/cache/original.jpg' : null));
+        const variant = ImageVariantService.variantUrl(ORIGINAL, ImageVariantService.WIDTH);
+
+        for (const probe of [null, { status: 503, contentType: 'text/html' }, { status: 429, contentType: 'text/html' }]) {
+            RemoteMediaService.fetchImageFile.mockClear();
+            RemoteMediaService.probeImageUrl.mockResolvedValueOnce(probe);
+
+            expect(await ImageVariantService.getImageFile(ORIGINAL)).toBe('/cache/original.jpg');
+            expect(RemoteMediaService.fetchImageFile.mock.calls).toEqual([[variant], [ORIGINAL]]);
+            expect(ImageVariantService.unavailable.has(variant)).toBe(false);
+        }
+    });
+});
@@ -7,7 +7,9 @@ jest.mock('../src/database/db', () => ({
     db: {
         get: jest.fn(),
         run: jest.fn(),
-        all: jest.fn()
+        all: jest.fn(),
+        transaction: jest.fn(),
+        insertMany: jest.fn()
     }
 }));
 
@@ -37,11 +39,13 @@ describe('IslamicRemindersService', () => {
 
             uuidv4.mockReturnValue('new-cfg');
             db.run.mockResolvedValue({});
+            db.transaction.mockImplementation(fn => fn(db));
 
             const result = await IslamicRemindersService.getOrCreateConfig('user-1');
 
-            // Verify inserts happen (config, 5 prayers, fasting, adhkar)
+            // Verify inserts happen (config, 5 prayers, fasting, adhkar) in one transaction
             // 1 config + 5 prayers + 1 fasting + 1 adhkar = 8
+            expect(db.transaction).toHaveBeenCalledTimes(1);
             expect(db.run).toHaveBeenCalledTimes(1 + 5 + 1 + 1);
             expect(db.run).toHaveBeenCalledWith(
                 expect.stringContaining('INSERT INTO islamic_reminders_config'),
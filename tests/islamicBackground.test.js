@@ -0,0 +1,76 @@
+jest.mock('node-cron', () => ({ schedule: jest.fn() }));
+jest.mock('../src/services/RemoteMediaService', () => ({
+    isImageUrlReachable: jest.fn()
+}));
+const RemoteMediaService = require('../src/services/RemoteMediaService');
+const IslamicBackgroundService = require('../src/services/IslamicBackgroundService');
+
+describe('IslamicBackgroundService', () => {
+    const urls = IslamicBackgroundService.catalog().map(x => x.url);
+    const [good, down, flaky] = urls;
+
+    beforeEach(() => {
+        jest.clearAllMocks();
+        IslamicBackgroundService.health.clear();
+        IslamicBackgroundService.healthy = new Map();
+        IslamicBackgroundService.lastProbe = null;
+    });
+
+    afterEach(() => {
+        clearTimeout(IslamicBackgroundService.retryTimer);
+        IslamicBackgroundService.retryTimer = null;
+    });
+
+    test('uses the unchecked catalog until the first probe has finished', async () => {
+        const bg = await IslamicBackgroundService.getBackground({ theme: 'mosques' });
+        expect(urls).toContain(bg.url);
+        expect(RemoteMediaService.isImageUrlReachable).not.toHaveBeenCalled();
+    });
+
+    test('picks only probed-healthy URLs, without network calls', async () => {
+        RemoteMediaService.isImageUrlReachable.mockImplementation(async url => url === good);
+
+        const probe = await IslamicBackgroundService.probeAll();
+        expect(probe).toMatchObject({ urls: urls.length, ok: 1 });
+        expect(RemoteMediaService.isImageUrlReachable).toHaveBeenCalledTimes(urls.length);
+
+        RemoteMediaService.isImageUrlReachable.mockClear();
+        for (let i = 0; i < 5; i++) {
+            expect((await IslamicBackgroundService.getBackground({ theme: 'mosques', excludeUrls: [good] })).url).toBe(good);
+        }
+        expect(RemoteMediaService.isImageUrlReachable).not.toHaveBeenCalled();
+        expect(IslamicBackgroundService.getStatus().healthy).toMatchObject({ mosques: 1, '*': 1 });
+    });
+
+    test('keeps the previous answer when a host cannot be asked, and shares concurrent probes', async () => {
+        RemoteMediaService.isImageUrlReachable.mockImplementation(async url => url !== down);
+        await IslamicBackgroundService.probeAll();
+
+        RemoteMediaService.isImageUrlReachable.mockImplementation(async url => (url === flaky ? null : url === good));
+        const [a, b] = [IslamicBackgroundService.probeAll(), IslamicBackgroundService.probeAll()];
+        expect(a).toBe(b);
+        await a;
+
+        expect(IslamicBackgroundService.health.get(flaky).ok).toBe(true);
+        expect(IslamicBackgroundService.health.get(down).ok).toBe(false);
+        const picked = await IslamicBackgroundService.getBackground({ excludeUrls: [good] });
+        expect(picked.url).toBe(flaky);
+    });
+
+    test('treats hosts that could not be asked on the first probe as unknown, not down', async () => {
+        RemoteMediaService.isImageUrlReachable.mockImplementation(async url => (url === down ? false : null));
+        const probe = await IslamicBackgroundService.probeAll();
+
+        expect(probe).toMatchObject({ ok: 0, unknown: urls.length - 1 });
+        expect(IslamicBackgroundService.retryTimer).not.toBeNull();
+        const picked = await IslamicBackgroundService.getBackground({ theme: 'mosques' });
+        expect(picked.url).not.toBe(down);
+        expect(urls).toContain(picked.url);
+    });
+
+    test('returns null when nothing answered the probe', async () => {
+        RemoteMediaService.isImageUrlReachable.mockResolvedValue(false);
+        await IslamicBackgroundService.probeAll();
+        expect(await IslamicBackgroundService.getBackground({ theme: 'mosques' })).toBeNull();
+    });
+});
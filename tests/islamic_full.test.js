@@ -78,6 +78,64 @@ describe('Islamic Full Audit', () => {
             expect(result).toBeDefined();
             expect(result.is_manual).toBe(true);
         });
+
+        test('should compute a whole month in one pass', () => {
+            const location = { latitude: 30.0444, longitude: 31.2357, method: 'Egypt', timezone: 'Africa/Cairo' };
+            const packed = PrayerTimesService.computeMonth(location, '2025-03');
+
+            expect(packed).toHaveLength(31 * 6);
+            for (let day = 0; day < 31; day++) {
+                const [fajr, sunrise, dhuhr, asr, maghrib, isha] = packed.slice(day * 6, day * 6 + 6);
+                expect(fajr < sunrise && sunrise < dhuhr && dhuhr < asr && asr < maghrib && maghrib < isha).toBe(true);
+            }
+        });
+
+        test('should give nearby coordinates the same location key', () => {
+            const a = PrayerTimesService.getLocation({ latitude: 30.04441, longitude: 31.23571 });
+            const b = PrayerTimesService.getLocation({ latitude: 30.04452, longitude: 31.23565 });
+            const far = PrayerTimesService.getLocation({ latitude: 30.0898, longitude: 31.3283 });
+
+            expect(PrayerTimesService.locationKey(a)).toBe(PrayerTimesService.locationKey(b));
+            expect(PrayerTimesService.locationKey(far)).not.toBe(PrayerTimesService.locationKey(a));
+        });
+
+        test('should snap to a known city in city mode', () => {
+            // A few hundred metres from Maadi
+            expect(PrayerTimesService.quantize(29.9612, 31.2561, 'city')).toEqual({ latitude: 29.9593, longitude: 31.2580 });
+            // Nowhere near a listed city: grid fallback
+            const remote = PrayerTimesService.quantize(-45.1234, 170.5678, 'city');
+            expect(remote.latitude).toBeCloseTo(-45.1234, 1);
+        });
+
+        test('should serve later days of a month from memory', async () => {
+            const config = { latitude: 21.4225, longitude: 39.8262, timezone: 'Asia/Riyadh', prayer_calculation_method: 'Makkah' };
+            db.get.mockResolvedValue(null);
+            const spy = jest.spyOn(PrayerTimesService, 'computeMonth');
+
+            const first = await PrayerTimesService.getTimesForDate(config, '2025-04-01');
+            const second = await PrayerTimesService.getTimesForDate(config, '2025-04-30');
+
+            expect(spy).toHaveBeenCalledTimes(1);
+            expect(first.prayer_date).toBe('2025-04-01');
+            expect(second.dhuhr).toMatch(/^12:\d{2}$/);
+            spy.mockRestore();
+        });
+
+        test('should share one load between concurrent misses and cache the day', async () => {
+            const config = { latitude: 31.2001, longitude: 29.9187, timezone: 'Africa/Cairo' };
+            db.get.mockClear();
+            db.get.mockResolvedValue(null);
+
+            const [a, b] = await Promise.all([
+                PrayerTimesService.getTimesForDate(config, '2025-05-10'),
+                PrayerTimesService.getTimesForDate({ ...config }, '2025-05-10')
+            ]);
+            const again = await PrayerTimesService.getTimesForDate(config, '2025-05-10');
+
+            expect(db.get).toHaveBeenCalledTimes(1);
+            expect(b).toBe(a);
+            expect(again).toBe(a);
+        });
     });
 
 });
@@ -0,0 +1,110 @@
+// Runs against the real in-memory SQLite database and a temporary cache directory
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { Readable } = require('stream');
+
+process.env.MEDIA_CACHE_DIR = fs.mkdtempSync(path.join(os.tmpdir(), 'media-cache-'));
+
+const { db, init } = require('../src/database/db');
+const httpClient = require('../src/services/httpClient');
+const MediaCacheService = require('../src/services/MediaCacheService');
+
+jest.mock('../src/services/httpClient', () => ({
+    get: jest.fn()
+}));
+
+jest.mock('../src/database/writeBuffer', () => ({
+    update: jest.fn()
+}));
+
+jest.setTimeout(30000);
+
+const image = (bytes, headers = {}) => ({
+    status: 200,
+    headers: { 'content-type': 'image/jpeg', ...headers },
+    data: Readable.from([Buffer.from(bytes)])
+});
+
+describe('MediaCacheService', () => {
+    beforeAll(async () => {
+        jest.spyOn(console, 'log').mockImplementation(() => { });
+        await init();
+    });
+
+    afterAll(() => {
+        jest.restoreAllMocks();
+        fs.rmSync(process.env.MEDIA_CACHE_DIR, { recursive: true, force: true });
+    });
+
+    beforeEach(async () => {
+        jest.clearAllMocks();
+        await db.run('DELETE FROM media_cache');
+    });
+
+    test('should download once and serve later calls from disk', async () => {
+        httpClient.get.mockResolvedValueOnce(image('page-1', { etag: '"v1"' }));
+
+        const first = await MediaCacheService.get('https://cdn.example/p1.jpg', { accept: 'image/' });
+        const second = await MediaCacheService.get('https://cdn.example/p1.jpg', { accept: 'image/' });
+
+        expect(first.status).toBe('stored');
+        expect(second.status).toBe('hit');
+        expect(second.path).toBe(first.path);
+        expect(fs.readFileSync(first.path, 'utf8')).toBe('page-1');
+        expect(httpClient.get).toHaveBeenCalledTimes(1);
+    });
+
+    test('should share one file between URLs with the same bytes', async () => {
+        httpClient.get
+            .mockResolvedValueOnce(image('same'))
+            .mockResolvedValueOnce(image('same'));
+
+        const a = await MediaCacheService.get('https://a.example/x.jpg');
+        const b = await MediaCacheService.get('https://b.example/y.jpg');
+
+        expect(a.path).toBe(b.path);
+        expect(await MediaCacheService.getStats()).toMatchObject({ urls: 2, files: 1, bytes: 4 });
+    });
+
+    test('should revalidate an old entry with its validators', async () => {
+        httpClient.get.mockResolvedValueOnce(image('v1', { etag: '"v1"' }));
+        const stored = await MediaCacheService.get('https://cdn.example/p2.jpg');
+        await db.run('UPDATE media_cache SET fetched_at = 0');
+
+        httpClient.get.mockResolvedValueOnce({ status: 304, headers: {}, data: Readable.from([]) });
+        const revalidated = await MediaCacheService.get('https://cdn.example/p2.jpg');
+
+        expect(httpClient.get.mock.calls[1][1].headers['If-None-Match']).toBe('"v1"');
+        expect(revalidated).toMatchObject({ status: 'revalidated', path: stored.path });
+    });
+
+    test('should fall back to the cached copy when the upstream fails', async () => {
+        httpClient.get.mockResolvedValueOnce(image('v1'));
+        const stored = await MediaCacheService.get('https://cdn.example/p3.jpg');
+        await db.run('UPDATE media_cache SET fetched_at = 0');
+
+        httpClient.get.mockRejectedValueOnce(Object.assign(new Error('Circuit open'), { code: 'ECIRCUITOPEN' }));
+        const stale = await MediaCacheService.get('https://cdn.example/p3.jpg');
+        expect(stale).toMatchObject({ status: 'stale', path: stored.path });
+
+        httpClient.get.mockResolvedValueOnce({ status: 200, headers: { 'content-type': 'text/html' }, data: Readable.from(['<html>']) });
+        expect(await MediaCacheService.get('https://cdn.example/not-an-image', { accept: 'image/' })).toBeNull();
+    });
+
+    test('should evict least recently used files but keep recently used ones', async () => {
+        httpClient.get
+            .mockResolvedValueOnce(image('old-file'))
+            .mockResolvedValueOnce(image('new-file'));
+        const old = await MediaCacheService.get('https://cdn.example/old.jpg');
+        const recent = await MediaCacheService.get('https://cdn.example/new.jpg');
+        await db.run('UPDATE media_cache SET used_at = 0 WHERE url = ?', ['https://cdn.example/old.jpg']);
+
+        expect(await MediaCacheService.evict(1)).toBe(1);
+
+        expect(fs.existsSync(old.path)).toBe(false);
+        expect(fs.existsSync(recent.path)).toBe(true);
+        const rows = await db.all('SELECT url FROM media_cache');
+        expect(rows.map(r => r.url)).toEqual(['https://cdn.example/new.jpg']);
+    });
+});
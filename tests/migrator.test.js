@@ -0,0 +1,89 @@
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { runMigrations, listMigrations } = require('../src/database/migrator');
+
+const createDb = (currentVersion) => ({
+    run: jest.fn().mockResolvedValue({}),
+    get: jest.fn().mockResolvedValue({ version: currentVersion }),
+    all: jest.fn().mockResolvedValue([]),
+    exec: jest.fn().mockResolvedValue()
+});
+
+describe('Migrator', () => {
+    let dir;
+
+    beforeEach(() => {
+        dir = fs.mkdtempSync(path.join(os.tmpdir(), 'migrations-'));
+        fs.writeFileSync(path.join(dir, '001_first.js'), "module.exports = { up: async (db) => { await db.run('CREATE TABLE a (id)'); } };");
+        fs.writeFileSync(path.join(dir, '002_second.js'), "module.exports = { up: async (db, schema) => { await schema.addColumn('a', 'b', 'TEXT'); } };");
+        fs.writeFileSync(path.join(dir, 'notes.txt'), 'ignored');
+        jest.spyOn(console, 'log').mockImplementation(() => { });
+        jest.spyOn(console, 'error').mockImplementation(() => { });
+    });
+
+    afterEach(() => {
+        fs.rmSync(dir, { recursive: true, force: true });
+        jest.restoreAllMocks();
+    });
+
+    test('should list numbered migrations in order', () => {
+        const migrations = listMigrations(dir);
+        expect(migrations.map(m => m.version)).toEqual([1, 2]);
+        expect(migrations.map(m => m.name)).toEqual(['first', 'second']);
+    });
+
+    test('should skip everything when schema is current', async () => {
+        const db = createDb(2);
+        const result = await runMigrations(db, { dir });
+
+        expect(result.applied).toEqual([]);
+        expect(db.exec).not.toHaveBeenCalled();
+        expect(db.run).toHaveBeenCalledTimes(1); // schema_version table only
+    });
+
+    test('should apply only pending migrations, each in its own transaction', async () => {
+        const db = createDb(1);
+        const result = await runMigrations(db, { dir });
+
+        expect(result).toMatchObject({ from: 1, to: 2 });
+        expect(result.applied.map(m => m.version)).toEqual([2]);
+        expect(db.exec.mock.calls.map(c => c[0])).toEqual(['BEGIN IMMEDIATE', 'COMMIT']);
+        expect(db.run).toHaveBeenCalledWith('ALTER TABLE a ADD COLUMN b TEXT');
+        expect(db.run).toHaveBeenCalledWith(expect.stringContaining('INSERT INTO schema_version'), [2, 'second']);
+    });
+
+    test('should not re-add existing columns', async () => {
+        const db = createDb(1);
+        db.all.mockResolvedValue([{ name: 'id' }, { name: 'b' }]);
+        await runMigrations(db, { dir });
+
+        expect(db.run).not.toHaveBeenCalledWith('ALTER TABLE a ADD COLUMN b TEXT');
+    });
+
+    test('should roll back and stop on failure', async () => {
+        const db = createDb(0);
+        db.run.mockImplementation(async (sql) => {
+            if (sql.startsWith('CREATE TABLE a')) throw new Error('boom');
+            return {};
+        });
+
+        await expect(runMigrations(db, { dir })).rejects.toThrow('boom');
+        expect(db.exec.mock.calls.map(c => c[0])).toEqual(['BEGIN IMMEDIATE', 'ROLLBACK']);
+    });
+
+    test('baseline migration adds every column the old ALTER cascade added to existing tables', async () => {
+        const baseline = require('../src/database/migrations/001_initial_schema');
+        const schema = { addColumns: jest.fn().mockResolvedValue(0) };
+        await baseline.up({ exec: jest.fn(), run: jest.fn() }, schema);
+
+        const added = Object.fromEntries(schema.addColumns.mock.calls.map(([table, columns]) => [table, Object.keys(columns)]));
+        expect(added.adhkar_settings).toEqual(expect.arrayContaining([
+            'content_enabled', 'content_time', 'content_type', 'media_preference', 'morning_source', 'evening_source', 'hadith_source'
+        ]));
+        expect(added.prayer_settings).toEqual(expect.arrayContaining(['post_prayer_adhkar_enabled', 'post_prayer_adhkar_delay']));
+        expect(added.fasting_settings).toEqual(expect.arrayContaining(['monday', 'thursday', 'reminder_time']));
+        expect(added.islamic_reminders_config).toEqual(expect.arrayContaining(['hijri_adjustment', 'friday_kahf']));
+        expect(added.whatsapp_sessions).toContain('phone_number');
+    });
+});
@@ -0,0 +1,58 @@
+const { QueryProfiler } = require('../src/database/profiler');
+
+describe('QueryProfiler', () => {
+    let profiler;
+
+    beforeEach(() => {
+        profiler = new QueryProfiler();
+        profiler.configure({ enabled: true, thresholdMs: 50 });
+        jest.spyOn(console, 'warn').mockImplementation(() => { });
+    });
+
+    afterEach(() => {
+        jest.restoreAllMocks();
+    });
+
+    test('normalize should group statements that differ only by literals', () => {
+        const a = QueryProfiler.normalize("SELECT * FROM t WHERE id = 5 AND type = 'x'");
+        const b = QueryProfiler.normalize("SELECT *   FROM t\n WHERE id = 12 AND type = 'y'");
+        expect(a).toBe(b);
+        expect(QueryProfiler.normalize('SELECT * FROM t WHERE id IN (?, ?, ?)')).toBe('SELECT * FROM t WHERE id IN (?+)');
+    });
+
+    test('paramShape should not expose parameter values', () => {
+        expect(QueryProfiler.paramShape(['secret', 3, null])).toEqual(['string', 'number', 'null']);
+        expect(QueryProfiler.paramShape({ $id: 'x' })).toEqual(['$id:string']);
+    });
+
+    test('percentile should pick the nearest rank', () => {
+        const samples = Array.from({ length: 100 }, (_, i) => i + 1);
+        expect(QueryProfiler.percentile(samples, 95)).toBe(95);
+        expect(QueryProfiler.percentile([], 95)).toBe(0);
+    });
+
+    test('track should be a pass-through when disabled', async () => {
+        profiler.configure({ enabled: false });
+        await expect(profiler.track('SELECT 1', [], async () => 'ok')).resolves.toBe('ok');
+        expect(profiler.getReport().queries).toEqual([]);
+    });
+
+    test('slow statements should be logged once with their plan', async () => {
+        profiler.setExplainer(jest.fn().mockResolvedValue([{ detail: 'SCAN t' }]));
+
+        profiler.record('SELECT * FROM t WHERE a = ?', ['x'], 10);
+        profiler.record('SELECT * FROM t WHERE a = ?', ['y'], 120);
+        profiler.record('SELECT * FROM t WHERE a = ?', ['z'], 130);
+        await new Promise(setImmediate);
+
+        const report = profiler.getReport();
+        expect(report.queries[0]).toMatchObject({ calls: 3, maxMs: 130, plan: ['SCAN t'] });
+        expect(report.slow).toHaveLength(2);
+        expect(profiler.explainer).toHaveBeenCalledTimes(1);
+    });
+
+    test('track should record failed statements too', async () => {
+        await expect(profiler.track('SELECT boom', [], async () => { throw new Error('boom'); })).rejects.toThrow('boom');
+        expect(profiler.getReport().queries[0].calls).toBe(1);
+    });
+});
@@ -0,0 +1,73 @@
+// Regression guard: every hot query must be served by an index, never a full table scan.
+// Runs against the real (in-memory) SQLite database with all migrations applied.
+const { db, init } = require('../src/database/db');
+
+jest.setTimeout(30000);
+
+const HOT_QUERIES = {
+    'scheduler tick configs': [`
+        SELECT c.*, f.reminder_time as fasting_time, a.morning_enabled, a.morning_time
+        FROM islamic_reminders_config c
+        LEFT JOIN fasting_settings f ON f.config_id = c.id
+        LEFT JOIN adhkar_settings a ON a.config_id = c.id
+        WHERE c.session_id IS NOT NULL AND c.enabled = 1
+    `, []],
+    'config by user': ['SELECT * FROM islamic_reminders_config WHERE user_id = ?', ['u1']],
+    'prayer settings': ['SELECT * FROM prayer_settings WHERE config_id = ? ORDER BY prayer_name', ['c1']],
+    'recipients': ['SELECT * FROM reminder_recipients WHERE config_id = ?', ['c1']],
+    'adhkar settings': ['SELECT * FROM adhkar_settings WHERE config_id = ?', ['c1']],
+    'fasting settings': ['SELECT * FROM fasting_settings WHERE config_id = ?', ['c1']],
+    'custom jobs': ['SELECT * FROM custom_schedule_jobs WHERE config_id = ? AND enabled = 1', ['c1']],
+    'prayer times cache': ['SELECT * FROM prayer_times_cache WHERE location_key = ? AND prayer_date = ?', ['k', '2025-01-01']],
+    'prayer months load': ['SELECT location_key, month, times FROM prayer_times_monthly WHERE month >= ?', ['2025-01']],
+    'prayer month row': ['SELECT times FROM prayer_times_monthly WHERE location_key = ? AND month = ?', ['k', '2025-01']],
+    'hadith log per day': ['SELECT send_time, hadith_hash, image_url FROM hadith_schedule_log WHERE config_id = ? AND date = ?', ['c1', '2025-01-01']],
+    'content deck': [`
+        SELECT d.rowids, c.cursor FROM content_decks d
+        LEFT JOIN content_deck_cursors c ON c.deck_key = d.deck_key
+        WHERE d.deck_key = ?
+    `, ['c1:hadith:all']],
+    'config decks': ['SELECT deck_key FROM content_decks WHERE config_id = ?', ['c1']],
+    'media cache entry': ['SELECT * FROM media_cache WHERE url = ?', ['https://cdn.example/p1.jpg']],
+    'media cache file refs': ['SELECT 1 AS used FROM media_cache WHERE hash = ? LIMIT 1', ['abc']],
+    'hadith deck pool': ["SELECT rowid FROM content_library WHERE type = 'hadith_cached' AND source LIKE ?", ['صحيح مسلم%']],
+    'random content': ['SELECT * FROM content_library WHERE type = ? AND active = 1 AND category = ? ORDER BY last_sent_at ASC NULLS FIRST, RANDOM() LIMIT 1', ['adhkar', 'morning']],
+    'cached hadith count': ["SELECT COUNT(*) as count FROM content_library WHERE type = 'hadith_cached'", []],
+    'expired subscriptions': ["SELECT id, user_id FROM subscriptions WHERE status = 'active' AND end_date < ?", ['2025-01-01']],
+    'dashboard subscription': [`
+        SELECT s.*, p.name as plan_name FROM subscriptions s
+        JOIN plans p ON s.plan_id = p.id
+        WHERE s.user_id = ? ORDER BY s.created_at DESC LIMIT 1
+    `, ['u1']],
+    'activity logs page': [`
+        SELECT l.*, u.name as user_name FROM activity_logs l
+        LEFT JOIN users u ON l.user_id = u.id
+        ORDER BY l.created_at DESC LIMIT ? OFFSET ?
+    `, [50, 0]],
+    'user notifications': ['SELECT * FROM notifications WHERE user_id = ? ORDER BY created_at DESC LIMIT 50', ['u1']],
+    'user sessions': ['SELECT * FROM whatsapp_sessions WHERE user_id = ?', ['u1']],
+    'retention hadith log': ['SELECT rowid FROM hadith_schedule_log WHERE date < ? LIMIT ?', ['2025-01-01', 500]],
+    'retention activity log': ['SELECT rowid FROM activity_logs WHERE created_at < ? LIMIT ?', ['2025-01-01', 500]],
+    'retention prayer cache': ['SELECT rowid FROM prayer_times_cache WHERE prayer_date < ? LIMIT ?', ['2025-01-01', 500]],
+    'retention notifications': ['SELECT rowid FROM notifications WHERE created_at < ? AND is_read = 1 LIMIT ?', ['2025-01-01', 500]]
+};
+
+// "SCAN t" without "USING ... INDEX" means every row of t is visited
+const isFullScan = (detail) => /^SCAN /.test(detail) && !/USING (COVERING )?INDEX/.test(detail);
+
+describe('Query plans for hot paths', () => {
+    beforeAll(async () => {
+        jest.spyOn(console, 'log').mockImplementation(() => { });
+        await init();
+    });
+
+    afterAll(() => {
+        jest.restoreAllMocks();
+    });
+
+    test.each(Object.entries(HOT_QUERIES))('%s uses an index', async (name, [sql, params]) => {
+        const plan = await db.all(`EXPLAIN QUERY PLAN ${sql}`, params);
+        const scans = plan.map(row => row.detail).filter(isFullScan);
+        expect(scans).toEqual([]);
+    });
+});
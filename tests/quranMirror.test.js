@@ -0,0 +1,106 @@
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const zlib = require('zlib');
+const httpClient = require('../src/services/httpClient');
+const QuranService = require('../src/services/QuranService');
+const QuranMirrorService = require('../src/services/QuranMirrorService');
+
+jest.mock('../src/services/httpClient', () => ({
+    get: jest.fn()
+}));
+
+// 4x4 grayscale PNG stored without compression, with a text chunk and a split IDAT
+const samplePng = () => {
+    const header = Buffer.alloc(13);
+    header.writeUInt32BE(4, 0);
+    header.writeUInt32BE(4, 4);
+    header[8] = 8;
+    const pixels = zlib.deflateSync(Buffer.alloc(20), { level: 0 });
+    return Buffer.concat([
+        Buffer.from([0x89, 0x50, 0x4e, 0x47, 0x0d, 0x0a, 0x1a, 0x0a]),
+        QuranMirrorService.pngChunk('IHDR', header),
+        QuranMirrorService.pngChunk('tEXt', Buffer.from('Comment\0page')),
+        QuranMirrorService.pngChunk('IDAT', pixels.subarray(0, 5)),
+        QuranMirrorService.pngChunk('IDAT', pixels.subarray(5)),
+        QuranMirrorService.pngChunk('IEND', Buffer.alloc(0))
+    ]);
+};
+
+describe('QuranMirrorService', () => {
+    let dir;
+
+    beforeEach(() => {
+        jest.clearAllMocks();
+        jest.spyOn(console, 'log').mockImplementation(() => { });
+        dir = fs.mkdtempSync(path.join(os.tmpdir(), 'quran-pages-'));
+        httpClient.get.mockImplementation(async () => ({ status: 200, data: samplePng() }));
+    });
+
+    afterEach(() => {
+        jest.restoreAllMocks();
+        fs.rmSync(dir, { recursive: true, force: true });
+    });
+
+    test('should detect truncated downloads', () => {
+        const png = samplePng();
+        expect(QuranMirrorService.isCompletePng(png)).toBe(true);
+        expect(QuranMirrorService.isCompletePng(png.subarray(0, png.length - 6))).toBe(false);
+        expect(QuranMirrorService.isCompletePng(Buffer.from('<html>rate limited</html>'))).toBe(false);
+    });
+
+    test('should recompress losslessly into a smaller file', () => {
+        const png = samplePng();
+        const optimized = QuranMirrorService.optimizePng(png);
+
+        expect(optimized.length).toBeLessThan(png.length);
+        expect(QuranMirrorService.isCompletePng(optimized)).toBe(true);
+        expect(optimized.includes(Buffer.from('tEXt'))).toBe(false);
+        const idat = optimized.indexOf(Buffer.from('IDAT'));
+        const length = optimized.readUInt32BE(idat - 4);
+        expect(zlib.inflateSync(optimized.subarray(idat + 4, idat + 4 + length))).toEqual(Buffer.alloc(20));
+    });
+
+    test('should downscale pages wider than the limit', () => {
+        // 8x2 RGB page, each pixel value = its column
+        const pixels = Buffer.alloc(8 * 2 * 3);
+        for (let i = 0; i < pixels.length; i++) pixels[i] = Math.floor(i / 3) % 8;
+        const png = QuranMirrorService.encodePng({ width: 8, height: 2, channels: 3, pixels });
+        expect(QuranMirrorService.decodePng(QuranMirrorService.readChunks(png)).pixels).toEqual(pixels);
+
+        const resized = QuranMirrorService.decodePng(QuranMirrorService.readChunks(QuranMirrorService.optimizePng(png, { maxWidth: 4 })));
+
+        expect(resized).toMatchObject({ width: 4, height: 1, channels: 3 });
+        // Neighbouring columns averaged: (0+1)/2, (2+3)/2, ...
+        expect([...resized.pixels.subarray(0, 12)]).toEqual([1, 1, 1, 3, 3, 3, 5, 5, 5, 7, 7, 7]);
+    });
+
+    test('should resume: verified pages are not downloaded again', async () => {
+        const first = await QuranMirrorService.mirror({ dir, pages: [1, 2, 3], concurrency: 2 });
+        expect(first).toMatchObject({ downloaded: 3, verified: 0, failed: [] });
+        expect(httpClient.get).toHaveBeenCalledWith(QuranService.pageUrl(2), expect.any(Object));
+
+        // Corrupt one page: only that one is fetched again
+        fs.writeFileSync(path.join(dir, '2.png'), 'broken');
+        httpClient.get.mockClear();
+        const second = await QuranMirrorService.mirror({ dir, pages: [1, 2, 3] });
+
+        expect(second).toMatchObject({ downloaded: 1, verified: 2 });
+        expect(httpClient.get).toHaveBeenCalledTimes(1);
+        expect(JSON.parse(fs.readFileSync(path.join(dir, 'manifest.json'), 'utf8'))['2'].size).toBe(samplePng().length);
+    });
+
+    test('should report pages that keep failing and write the optimized variant', async () => {
+        jest.spyOn(console, 'error').mockImplementation(() => { });
+        httpClient.get.mockImplementation(async (url) => (
+            url === QuranService.pageUrl(5) ? { status: 200, data: Buffer.from('not a png') } : { status: 200, data: samplePng() }
+        ));
+
+        const stats = await QuranMirrorService.mirror({ dir, pages: [4, 5], optimize: true });
+
+        expect(stats.failed).toEqual([5]);
+        expect(stats.optimized).toBe(1);
+        expect(fs.existsSync(path.join(dir, '4.opt.png'))).toBe(true);
+        expect(fs.existsSync(path.join(dir, '5.png'))).toBe(false);
+    });
+});
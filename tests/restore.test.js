@@ -0,0 +1,68 @@
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const zlib = require('zlib');
+const sqlite3 = require('sqlite3');
+const { stageBackup, validateBackup } = require('../src/database/restore');
+const { getLatestVersion } = require('../src/database/migrator');
+
+jest.setTimeout(30000);
+
+const createDatabase = (filePath, sql) => new Promise((resolve, reject) => {
+    const conn = new sqlite3.Database(filePath, (err) => {
+        if (err) return reject(err);
+        conn.exec(sql, (execErr) => conn.close(() => (execErr ? reject(execErr) : resolve())));
+    });
+});
+
+describe('Restore validation', () => {
+    let dir;
+
+    beforeEach(() => {
+        dir = fs.mkdtempSync(path.join(os.tmpdir(), 'restore-'));
+        jest.spyOn(console, 'log').mockImplementation(() => { });
+    });
+
+    afterEach(() => {
+        fs.rmSync(dir, { recursive: true, force: true });
+        jest.restoreAllMocks();
+    });
+
+    test('stageBackup should decompress gzip uploads', async () => {
+        const upload = path.join(dir, 'upload.gz');
+        fs.writeFileSync(upload, zlib.gzipSync(Buffer.from('payload')));
+
+        await stageBackup(upload, path.join(dir, 'staged'));
+        expect(fs.readFileSync(path.join(dir, 'staged'), 'utf8')).toBe('payload');
+    });
+
+    test('should reject files that are not SQLite databases', async () => {
+        const file = path.join(dir, 'bad.sqlite');
+        fs.writeFileSync(file, 'definitely not a database');
+        await expect(validateBackup(file)).rejects.toThrow('not a SQLite database');
+    });
+
+    test('should reject databases without the application schema', async () => {
+        const file = path.join(dir, 'other.sqlite');
+        await createDatabase(file, 'CREATE TABLE something (id INTEGER)');
+        await expect(validateBackup(file)).rejects.toThrow('application schema');
+    });
+
+    test('should reject backups from a newer schema', async () => {
+        const file = path.join(dir, 'newer.sqlite');
+        await createDatabase(file, `
+            CREATE TABLE users (id TEXT PRIMARY KEY);
+            CREATE TABLE schema_version (version INTEGER PRIMARY KEY, name TEXT, applied_at DATETIME);
+            INSERT INTO schema_version (version, name) VALUES (${getLatestVersion() + 1}, 'future');
+        `);
+        await expect(validateBackup(file)).rejects.toThrow('newer than this server');
+    });
+
+    test('should migrate older backups up to the current version', async () => {
+        const file = path.join(dir, 'legacy.sqlite');
+        await createDatabase(file, 'CREATE TABLE users (id TEXT PRIMARY KEY, email TEXT, password TEXT, name TEXT)');
+
+        const result = await validateBackup(file);
+        expect(result).toEqual({ schemaVersion: 0, migratedTo: getLatestVersion() });
+    });
+});
@@ -0,0 +1,67 @@
+// Runs against the real in-memory SQLite database with all migrations applied
+const { db, init } = require('../src/database/db');
+const RetentionService = require('../src/services/RetentionService');
+
+jest.setTimeout(30000);
+
+const policyFor = (table) => RetentionService.getPolicies().find(p => p.table === table);
+
+describe('RetentionService', () => {
+    const now = new Date('2025-06-30T12:00:00Z');
+
+    beforeAll(async () => {
+        jest.spyOn(console, 'log').mockImplementation(() => { });
+        await init();
+    });
+
+    afterAll(() => {
+        jest.restoreAllMocks();
+    });
+
+    beforeEach(async () => {
+        await db.run('DELETE FROM activity_logs');
+        await db.run('DELETE FROM notifications');
+        await db.run('DELETE FROM log_daily_rollups');
+    });
+
+    test('should delete expired rows in batches and keep daily rollups', async () => {
+        const rows = [];
+        for (let i = 0; i < 7; i++) {
+            rows.push({ action: i % 2 ? 'LOGIN' : 'BACKUP', details: 'old', created_at: `2024-01-0${(i % 3) + 1} 10:00:00` });
+        }
+        rows.push({ action: 'LOGIN', details: 'recent', created_at: '2025-06-29 10:00:00' });
+        await db.insertMany('activity_logs', rows);
+
+        const result = await RetentionService.purge(policyFor('activity_logs'), { now, batchSize: 3 });
+
+        expect(result).toMatchObject({ deleted: 7, batches: 3 });
+        const remaining = await db.all('SELECT details FROM activity_logs');
+        expect(remaining).toEqual([{ details: 'recent' }]);
+
+        const rollups = await db.all("SELECT SUM(total) AS total FROM log_daily_rollups WHERE source = 'activity_logs'");
+        expect(rollups[0].total).toBe(7);
+        const day = await db.get("SELECT total FROM log_daily_rollups WHERE day = '2024-01-01' AND dimension = 'BACKUP'");
+        expect(day.total).toBe(2);
+    });
+
+    test('should only remove notifications that match the extra condition', async () => {
+        await db.run('INSERT OR IGNORE INTO users (id, name, phone, email, password_hash) VALUES (?, ?, ?, ?, ?)', ['u-ret', 'R', '201000000099', 'ret@example.com', 'x']);
+        await db.insertMany('notifications', [
+            { user_id: 'u-ret', title: 't', message: 'read', is_read: 1, created_at: '2024-01-01 00:00:00' },
+            { user_id: 'u-ret', title: 't', message: 'unread', is_read: 0, created_at: '2024-01-01 00:00:00' }
+        ]);
+
+        const result = await RetentionService.purge(policyFor('notifications'), { now });
+
+        expect(result.deleted).toBe(1);
+        const remaining = await db.all('SELECT message FROM notifications');
+        expect(remaining).toEqual([{ message: 'unread' }]);
+    });
+
+    test('run should report every table and the compaction step', async () => {
+        const report = await RetentionService.run({ now });
+
+        expect(Object.keys(report.tables)).toEqual(expect.arrayContaining(['hadith_schedule_log', 'prayer_times_cache']));
+        expect(report.compaction).toHaveProperty('freePagesAfter');
+    });
+});
@@ -0,0 +1,57 @@
+const WarmPool = require('../src/services/WarmPool');
+
+describe('WarmPool', () => {
+    test('takes candidates without repeats and refills below the low-water mark', async () => {
+        const fill = jest.fn().mockResolvedValue(['a', 'b', 'c', 'a']);
+        const pool = new WarmPool('test:letters', { fill, capacity: 5, lowWater: 2 });
+
+        expect(await pool.refill()).toBe(3);
+        expect(pool.size).toBe(3);
+
+        const first = pool.take();
+        expect(fill).toHaveBeenCalledTimes(1);
+        const second = pool.take();
+        // One left: a background refill has started
+        expect(fill).toHaveBeenCalledTimes(2);
+        expect(first).not.toBe(second);
+        await pool.filling;
+    });
+
+    test('returns null when empty and shares one refill between callers', async () => {
+        let resolve;
+        const fill = jest.fn(() => new Promise(r => { resolve = r; }));
+        const pool = new WarmPool('test:slow', { fill, keyOf: v => v.url, capacity: 3, lowWater: 1 });
+
+        expect(pool.take()).toBeNull();
+        expect(pool.take()).toBeNull();
+        expect(fill).toHaveBeenCalledTimes(1);
+
+        resolve([{ url: 'x' }, { url: 'x' }]);
+        await pool.filling;
+        expect(pool.size).toBe(1);
+        expect(pool.getState()).toMatchObject({ misses: 2, taken: 0 });
+    });
+
+    test('backs off after a failed refill', async () => {
+        jest.spyOn(console, 'error').mockImplementation(() => { });
+        const fill = jest.fn().mockRejectedValue(new Error('down'));
+        const pool = new WarmPool('test:down', { fill, lowWater: 1, retryMs: 60000 });
+
+        await pool.refill();
+        pool.take();
+        pool.take();
+
+        expect(fill).toHaveBeenCalledTimes(1);
+        expect(pool.getState().lastError.message).toBe('down');
+        expect(WarmPool.getStats()['test:down']).toBeDefined();
+    });
+
+    test('drops candidates older than the ttl', () => {
+        const pool = new WarmPool('test:ttl', { fill: async () => [], ttlMs: 1000, lowWater: 0 });
+        pool.add(['old']);
+        pool.items[0].at -= 5000;
+
+        expect(pool.take()).toBeNull();
+        expect(pool.size).toBe(0);
+    });
+});
@@ -0,0 +1,153 @@
+const { db } = require('../src/database/db');
+const { WriteBuffer } = require('../src/database/writeBuffer');
+
+jest.mock('../src/database/db', () => ({
+    db: {
+        transaction: jest.fn()
+    }
+}));
+
+describe('WriteBuffer', () => {
+    let statements;
+
+    beforeEach(() => {
+        jest.clearAllMocks();
+        statements = [];
+        // Statements are committed only when the whole transaction succeeds; 'bad' values fail
+        db.transaction.mockImplementation(async (fn) => {
+            const pending = [];
+            const tx = {
+                prepare: jest.fn(async (sql) => ({
+                    run: jest.fn(async (params) => {
+                        if (params.includes('bad')) throw new Error('SQLITE_CONSTRAINT');
+                        pending.push([sql, params]);
+                        return { changes: 1 };
+                    })
+                }))
+            };
+            const result = await fn(tx);
+            statements.push(...pending);
+            return result;
+        });
+        jest.spyOn(console, 'error').mockImplementation(() => { });
+    });
+
+    afterEach(() => {
+        jest.restoreAllMocks();
+    });
+
+    test('should merge updates to the same row, latest value wins', async () => {
+        const buffer = new WriteBuffer({ flushInterval: 10000, maxItems: 100 });
+
+        buffer.update('whatsapp_sessions', 'session_id', 's1', { connected: 1, last_connected: 't1' });
+        buffer.update('whatsapp_sessions', 'session_id', 's1', { connected: 0 });
+        buffer.update('whatsapp_sessions', 'session_id', 's2', { connected: 1 });
+        await buffer.flush();
+
+        expect(db.transaction).toHaveBeenCalledTimes(1);
+        expect(statements).toEqual([
+            ['UPDATE whatsapp_sessions SET connected = ?, last_connected = ? WHERE session_id = ?', [0, 't1', 's1']],
+            ['UPDATE whatsapp_sessions SET connected = ? WHERE session_id = ?', [1, 's2']]
+        ]);
+        expect(buffer.stats).toMatchObject({ requested: 3, coalesced: 1, written: 2, flushes: 1 });
+    });
+
+    test('should drop pending columns that are about to be written directly', async () => {
+        const buffer = new WriteBuffer({ flushInterval: 10000, maxItems: 100 });
+
+        buffer.update('whatsapp_sessions', 'session_id', 's1', { connected: 0, last_disconnected: 't1' });
+        buffer.update('whatsapp_sessions', 'session_id', 's2', { connected: 0 });
+        buffer.discard('whatsapp_sessions', 'session_id', 's1', ['connected']);
+        buffer.discard('whatsapp_sessions', 'session_id', 's2', ['connected', 'phone_number']);
+        await buffer.flush();
+
+        expect(statements).toEqual([
+            ['UPDATE whatsapp_sessions SET last_disconnected = ? WHERE session_id = ?', ['t1', 's1']]
+        ]);
+    });
+
+    test('should keep inserts in order', async () => {
+        const buffer = new WriteBuffer({ flushInterval: 10000, maxItems: 100 });
+
+        buffer.insert('activity_logs', { user_id: 'u1', action: 'LOGIN' });
+        buffer.insert('activity_logs', { user_id: 'u1', action: 'LOGOUT' });
+        await buffer.flush();
+
+        expect(statements.map(s => s[1])).toEqual([['u1', 'LOGIN'], ['u1', 'LOGOUT']]);
+    });
+
+    test('should flush on its own once maxItems is reached', async () => {
+        const buffer = new WriteBuffer({ flushInterval: 10000, maxItems: 2 });
+
+        buffer.update('content_library', 'id', 'c1', { last_sent_at: 'now' });
+        expect(db.transaction).not.toHaveBeenCalled();
+        buffer.update('content_library', 'id', 'c2', { last_sent_at: 'now' });
+        await buffer.flushing;
+
+        expect(db.transaction).toHaveBeenCalledTimes(1);
+        expect(buffer.size).toBe(0);
+    });
+
+    test('should flush after the interval', async () => {
+        jest.useFakeTimers();
+        const buffer = new WriteBuffer({ flushInterval: 500, maxItems: 100 });
+
+        buffer.update('content_library', 'id', 'c1', { last_sent_at: 'now' });
+        jest.advanceTimersByTime(500);
+        jest.useRealTimers();
+        await buffer.flushing;
+
+        expect(db.transaction).toHaveBeenCalledTimes(1);
+    });
+
+    test('should write the rest of a failed batch one by one', async () => {
+        const buffer = new WriteBuffer({ flushInterval: 10000, maxItems: 100 });
+
+        buffer.insert('activity_logs', { user_id: 'u1', action: 'LOGIN' });
+        buffer.update('content_library', 'id', 'c1', { last_sent_at: 'bad' });
+        buffer.update('content_library', 'id', 'c2', { last_sent_at: 'now' });
+        await buffer.flush();
+
+        expect(buffer.stats).toMatchObject({ failures: 1, written: 2 });
+        expect(statements.map(s => s[1])).toEqual([['u1', 'LOGIN'], ['now', 'c2']]);
+        expect(buffer.size).toBe(1);
+    });
+
+    test('should retry a failed write once, without dropping newer values for the row', async () => {
+        const buffer = new WriteBuffer({ flushInterval: 10000, maxItems: 100 });
+
+        buffer.update('content_deck_cursors', 'deck_key', 'd1', { cursor: 'bad', updated_at: 't1' });
+        await buffer.flush();
+        buffer.update('content_deck_cursors', 'deck_key', 'd1', { cursor: 7 });
+        await buffer.flush();
+        await buffer.flush();
+
+        // The failed cursor was overwritten by the newer one; updated_at is retried (and written)
+        expect(statements).toEqual([
+            ['UPDATE content_deck_cursors SET updated_at = ? WHERE deck_key = ?', ['t1', 'd1']],
+            ['UPDATE content_deck_cursors SET cursor = ? WHERE deck_key = ?', [7, 'd1']]
+        ]);
+        expect(buffer.size).toBe(0);
+    });
+
+    test('should drop a write that fails twice, and only that one', async () => {
+        const buffer = new WriteBuffer({ flushInterval: 10000, maxItems: 100 });
+
+        buffer.update('whatsapp_sessions', 'session_id', 's1', { phone_number: 'bad' });
+        await buffer.flush();
+        buffer.update('whatsapp_sessions', 'session_id', 's1', { connected: 'bad' });
+        await buffer.flush();
+
+        // The second value was never tried before this flush: it keeps its retry
+        expect(buffer.stats.dropped).toBe(1);
+        expect(buffer.retries).toEqual([expect.objectContaining({ values: { connected: 'bad' }, retried: true })]);
+        await buffer.flush();
+        expect(buffer.stats.dropped).toBe(2);
+        expect(buffer.size).toBe(0);
+    });
+
+    test('should reject unsafe identifiers', () => {
+        const buffer = new WriteBuffer();
+        expect(() => buffer.update('users; DROP TABLE users', 'id', 1, { a: 1 })).toThrow('invalid identifier');
+    });
+});